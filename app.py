@@ -12,10 +12,14 @@ st.set_page_config(
 )
 
 from src.utils.theme import apply_theme
+from src.utils.resources import warm_up
 
 # Apply custom theme
 apply_theme()
 
+# Load shared models and clients in the background (once per server process)
+warm_up()
+
 # Initialize session state
 if 'role' not in st.session_state:
     st.session_state['role'] = None
@@ -0,0 +1,149 @@
+"""
+Benchmark quantized vector index storage.
+Compares float16 and int8 flat indexes (with and without exact float32
+re-scoring) against the unquantized index: memory footprint, recall@k and
+query latency, on the knowledge base chunks.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from src.rag.chunker import MarkdownChunker
+from src.rag.flat_index import FlatIndexBackend
+from populate_knowledge_base import find_curriculum_files
+
+
+def load_chunks(max_chunks: int = None):
+    """Chunk every knowledge base file; returns (ids, texts, section titles)."""
+    chunker = MarkdownChunker()
+    ids, texts, sections = [], [], []
+    for filepath in find_curriculum_files():
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+        for chunk in chunker.chunk_document(content, {}, os.path.basename(filepath)):
+            ids.append(chunk['id'])
+            texts.append(chunk['content'])
+            sections.append(chunk['metadata']['section'])
+    if max_chunks:
+        ids, texts, sections = ids[:max_chunks], texts[:max_chunks], sections[:max_chunks]
+    return ids, texts, sections
+
+
+def synthetic_embeddings(num_rows: int, num_queries: int, dimension: int = 384, seed: int = 0):
+    """Clustered random unit vectors, for benchmarking without the model."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(num_rows // 50, 1), dimension))
+    rows = centers[rng.integers(len(centers), size=num_rows)] + 0.5 * rng.standard_normal((num_rows, dimension))
+    queries = centers[rng.integers(len(centers), size=num_queries)] + 0.5 * rng.standard_normal((num_queries, dimension))
+    return rows.astype(np.float32), queries.astype(np.float32)
+
+
+def run_benchmark(ids, embeddings, queries, k: int = 10, rescore_factor: int = 4):
+    """
+    Measure every quantization setting against the exact baseline.
+
+    Returns:
+        List of result dicts (one per setting)
+    """
+    settings = [("none", False), ("float16", False), ("float16", True), ("int8", False), ("int8", True)]
+    documents = [""] * len(ids)
+    metadatas = [{} for _ in ids]
+    baseline = None
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # One shared float32 file; each setting only changes the search path
+        index = FlatIndexBackend(tmp)
+        index.add(ids, documents, embeddings, metadatas)
+
+        for quantization, rescore in settings:
+            index.quantization = quantization
+            index.rescore = rescore
+            index.rescore_factor = rescore_factor
+            index.query(queries[:1], k)  # build the quantized copy outside the timing
+
+            start = time.perf_counter()
+            latencies = []
+            hits = []
+            for query in queries:
+                query_start = time.perf_counter()
+                hits.append([r['id'] for r in index.query(query.reshape(1, -1), k)[0]])
+                latencies.append((time.perf_counter() - query_start) * 1000)
+            elapsed = time.perf_counter() - start
+
+            if baseline is None:
+                baseline = hits
+            recall = np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(hits, baseline) if b])
+
+            footprint = index.memory_footprint()
+            results.append({
+                'quantization': quantization,
+                'rescore': rescore,
+                'search_bytes': footprint['search_bytes'],
+                'float32_bytes': footprint['float32_bytes'],
+                'compression': footprint['float32_bytes'] / max(footprint['search_bytes'], 1),
+                f'recall@{k}': float(recall),
+                'p50_latency_ms': float(np.percentile(latencies, 50)),
+                'p95_latency_ms': float(np.percentile(latencies, 95)),
+                'queries_per_second': len(queries) / elapsed
+            })
+
+    return results
+
+
+def main():
+    """Run the quantization benchmark and print a table (or JSON)."""
+    parser = argparse.ArgumentParser(description="Benchmark quantized vector index storage")
+    parser.add_argument("--k", type=int, default=10, help="Results per query (recall@k)")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--rescore-factor", type=int, default=4, help="Shortlist size per result")
+    parser.add_argument("--max-chunks", type=int, default=None, help="Limit the number of chunks")
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=None,
+        metavar="ROWS",
+        help="Use clustered random vectors instead of the knowledge base (no model needed)"
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        embeddings, queries = synthetic_embeddings(args.synthetic, args.queries)
+        ids = [f"row_{i}" for i in range(len(embeddings))]
+        source = f"synthetic ({args.synthetic} rows)"
+    else:
+        from src.rag.embeddings import EmbeddingService
+
+        ids, texts, sections = load_chunks(args.max_chunks)
+        embedder = EmbeddingService()
+        embeddings = embedder.embed_batch(texts, show_progress_bar=True)
+        # Section titles make realistic short queries
+        random.seed(0)
+        query_texts = random.sample(sorted(set(sections) - {""}), min(args.queries, len(set(sections)) - 1))
+        queries = embedder.embed_batch(query_texts)
+        source = f"knowledge base ({len(ids)} chunks)"
+
+    results = run_benchmark(ids, embeddings, queries, k=args.k, rescore_factor=args.rescore_factor)
+
+    if args.json:
+        print(json.dumps({'source': source, 'k': args.k, 'results': results}, indent=2))
+        return
+
+    print(f"Quantization benchmark: {source}, {len(queries)} queries, k={args.k}")
+    print("=" * 78)
+    print(f"{'storage':<10}{'rescore':<9}{'memory':>12}{'ratio':>8}{'recall':>9}{'p50 ms':>9}{'p95 ms':>9}{'qps':>10}")
+    for r in results:
+        print(
+            f"{r['quantization']:<10}{str(r['rescore']):<9}"
+            f"{r['search_bytes'] / 1024:>10.0f}KB{r['compression']:>7.1f}x"
+            f"{r[f'recall@{args.k}']:>9.3f}{r['p50_latency_ms']:>9.2f}{r['p95_latency_ms']:>9.2f}"
+            f"{r['queries_per_second']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
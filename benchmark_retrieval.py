@@ -0,0 +1,223 @@
+"""
+Retrieval quality and latency benchmark.
+Ingests data/knowledge_base into a fresh store, runs a labelled query set
+(data/benchmarks/retrieval_queries.json) through CurriculumRetriever and
+writes recall@k, MRR, query latency, ingest throughput and index memory as
+JSON, so chunking, caching and backend changes can be compared across commits.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import tempfile
+import time
+import numpy as np
+from src.rag.chunker import MarkdownChunker
+from src.rag.manifest import IngestionManifest
+from src.rag.retriever import CurriculumRetriever
+from src.rag.vector_store import CurriculumVectorStore
+from populate_knowledge_base import KNOWLEDGE_BASE_PATH, find_curriculum_files, sync_knowledge_base
+
+
+QUERIES_PATH = "data/benchmarks/retrieval_queries.json"
+RESULTS_DIRECTORY = "data/benchmarks/results"
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit ("unknown" outside git)."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def directory_size(path: str) -> int:
+    """Total bytes of all files below path."""
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else None
+
+
+def evaluate_query(query, results, ks):
+    """Rank-based metrics of one query's results against its labels."""
+    files = [os.path.basename(r.get('metadata', {}).get('filename', '')) for r in results]
+    sections = [r.get('metadata', {}).get('section', '').lower() for r in results]
+    expected = set(query['expected_files'])
+
+    first_hit = next((rank for rank, name in enumerate(files, 1) if name in expected), None)
+    metrics = {
+        'retrieved_files': files,
+        'reciprocal_rank': 1.0 / first_hit if first_hit else 0.0
+    }
+    for k in ks:
+        metrics[f'recall@{k}'] = len(expected & set(files[:k])) / len(expected)
+        if query.get('expected_sections'):
+            terms = [term.lower() for term in query['expected_sections']]
+            metrics[f'section_hit@{k}'] = float(any(t in s for s in sections[:k] for t in terms))
+    return metrics
+
+
+def run_benchmark(args):
+    """Ingest, query and collect every metric into one result dict."""
+    with open(args.queries, 'r', encoding='utf-8') as f:
+        queries = json.load(f)['queries']
+    ks = sorted(set(args.k))
+
+    embedder = None
+    if args.no_embedding_cache:
+        from src.rag.embeddings import EmbeddingService
+        embedder = EmbeddingService(cache_dir=None)
+
+    chunker = MarkdownChunker(max_chars=args.max_chars, overlap_chars=args.overlap_chars)
+    source_files = find_curriculum_files(args.knowledge_base)
+    source_bytes = sum(os.path.getsize(path) for path in source_files)
+
+    with tempfile.TemporaryDirectory() as store_directory:
+        vector_store = CurriculumVectorStore(store_directory, embedder=embedder, backend=args.backend)
+        manifest = IngestionManifest(vector_store.manifest_path)
+
+        start = time.perf_counter()
+        stats = sync_knowledge_base(
+            vector_store, manifest, chunker=chunker,
+            knowledge_base_path=args.knowledge_base, workers=args.workers
+        )
+        ingest_seconds = time.perf_counter() - start
+
+        index = {
+            'documents': vector_store.get_count(),
+            'disk_bytes': directory_size(store_directory),
+            'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        }
+        if hasattr(vector_store.backend, 'memory_footprint'):
+            index.update(vector_store.backend.memory_footprint())
+
+        retriever = CurriculumRetriever(
+            vector_store,
+            mode=args.mode,
+            mmr_lambda=None if args.mmr_lambda < 0 else args.mmr_lambda
+        )
+
+        per_query = []
+        uncached_ms = []
+        cached_ms = []
+        for query in queries:
+            kwargs = dict(
+                skill=query['skill'],
+                level=query['level'],
+                k=max(ks),
+                focus_areas=query.get('focus_areas')
+            )
+            retriever.result_cache.clear()
+            start = time.perf_counter()
+            results = retriever.retrieve_similar_curricula(**kwargs)
+            uncached_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            retriever.retrieve_similar_curricula(**kwargs)
+            cached_ms.append((time.perf_counter() - start) * 1000)
+
+            per_query.append({
+                'skill': query['skill'],
+                'level': query['level'],
+                'expected_files': query['expected_files'],
+                'latency_ms': uncached_ms[-1],
+                **evaluate_query(query, results, ks)
+            })
+
+    quality = {'mrr': float(np.mean([q['reciprocal_rank'] for q in per_query]))}
+    for k in ks:
+        quality[f'recall@{k}'] = float(np.mean([q[f'recall@{k}'] for q in per_query]))
+        section_hits = [q[f'section_hit@{k}'] for q in per_query if f'section_hit@{k}' in q]
+        if section_hits:
+            quality[f'section_hit@{k}'] = float(np.mean(section_hits))
+
+    return {
+        'commit': git_commit(),
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        'config': {
+            'backend': vector_store.backend.name,
+            'mode': args.mode,
+            'mmr_lambda': retriever.mmr_lambda,
+            'k': ks,
+            'chunker': {'max_chars': chunker.max_chars, 'overlap_chars': chunker.overlap_chars},
+            'embedding_cache': not args.no_embedding_cache,
+            'queries': len(queries)
+        },
+        'ingest': {
+            'files': len(source_files),
+            'chunks': stats['chunks_upserted'],
+            'source_bytes': source_bytes,
+            'seconds': ingest_seconds,
+            'docs_per_second': len(source_files) / ingest_seconds if ingest_seconds else None,
+            'chunks_per_second': stats['chunks_upserted'] / ingest_seconds if ingest_seconds else None,
+            'mb_per_second': source_bytes / 1e6 / ingest_seconds if ingest_seconds else None,
+            'workers': args.workers,
+            'pipeline': stats.get('pipeline')
+        },
+        'index': index,
+        'quality': quality,
+        'latency_ms': {
+            'p50': percentile(uncached_ms, 50),
+            'p95': percentile(uncached_ms, 95),
+            'mean': float(np.mean(uncached_ms)) if uncached_ms else None,
+            'cached_p50': percentile(cached_ms, 50),
+            'cached_p95': percentile(cached_ms, 95)
+        },
+        'per_query': per_query
+    }
+
+
+def main():
+    """Run the benchmark, write JSON and print a summary."""
+    parser = argparse.ArgumentParser(description="Benchmark retrieval quality and latency")
+    parser.add_argument("--backend", choices=["chroma", "flat"], default=None,
+                        help="Vector store backend (default: VECTOR_BACKEND env var, else chroma)")
+    parser.add_argument("--mode", choices=["dense", "hybrid"], default="dense", help="Retrieval mode")
+    parser.add_argument("--mmr-lambda", type=float, default=-1.0,
+                        help="MMR lambda, e.g. 0.7 (default: negative, MMR disabled)")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5], help="Cut-offs for recall@k")
+    parser.add_argument("--max-chars", type=int, default=1200, help="Chunk size")
+    parser.add_argument("--overlap-chars", type=int, default=150, help="Chunk overlap")
+    parser.add_argument("--no-embedding-cache", action="store_true",
+                        help="Embed everything from scratch (true ingest throughput)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parse processes of the ingestion pipeline (1 = serial ingest)")
+    parser.add_argument("--queries", default=QUERIES_PATH, help="Labelled query set")
+    parser.add_argument("--knowledge-base", default=KNOWLEDGE_BASE_PATH, help="Folder to ingest")
+    parser.add_argument("--output", default=None,
+                        help=f"Result file (default: {RESULTS_DIRECTORY}/retrieval-<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+
+    output = args.output or os.path.join(
+        RESULTS_DIRECTORY, f"retrieval-{report['commit']}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 60)
+    print(f"Retrieval benchmark ({report['config']['backend']}, {report['config']['mode']}, commit {report['commit']})")
+    for name, value in report['quality'].items():
+        print(f"   {name}: {value:.3f}")
+    latency = report['latency_ms']
+    print(f"   latency: p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms (cached p50 {latency['cached_p50']:.2f} ms)")
+    ingest = report['ingest']
+    print(f"   ingest: {ingest['docs_per_second']:.2f} docs/s, {ingest['mb_per_second']:.2f} MB/s ({ingest['chunks']} chunks)")
+    print(f"   index: {report['index']['disk_bytes'] / 1e6:.1f} MB on disk")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
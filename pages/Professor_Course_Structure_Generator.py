@@ -3,7 +3,8 @@ Course Structure Generator - Professor Tool
 """
 import streamlit as st
 import json
-from src.llm.client import GeminiClient  
+from src.utils.resources import get_llm_client
+from src.utils.generation_ui import stream_response
 from src.llm.scenario_prompts import get_course_structure_prompt
 from src.pdf.simple_generator import generate_pdf
 
@@ -53,30 +54,32 @@ if submitted and course_name:
     if additional_notes:
         prompt += f"\n\nAdditional Requirements: {additional_notes}"
     
-    with st.spinner(f"Generating comprehensive structure for {course_name}..."):
-        try:
-            llm_client = GeminiClient()
-            response = llm_client.generate_with_retry(prompt=prompt, temperature=0.4)
-            
-            # Parse JSON
-            json_str = response.strip()
-            if "```json" in json_str:
-                json_str = json_str.split("```json")[1].split("```")[0].strip()
-            elif "```" in json_str:
-                parts = json_str.split("```")
-                if len(parts) >= 2:
-                    json_str = parts[1].strip()
-            
-            if "{" in json_str and "}" in json_str:
-                start = json_str.find("{")
-                end = json_str.rfind("}") + 1
-                json_str = json_str[start:end]
-            
-            course_structure = json.loads(json_str)
-            st.session_state['course_structure'] = course_structure
-            st.success("Course structure generated successfully!")
-        except Exception as e:
-            st.error(f"Generation failed: {str(e)}")
+    try:
+        llm_client = get_llm_client()
+        response = stream_response(
+            llm_client, prompt, spinner_text=f"Generating comprehensive structure for {course_name}...",
+            temperature=0.4, scenario="course_structure"
+        )
+        
+        # Parse JSON
+        json_str = response.strip()
+        if "```json" in json_str:
+            json_str = json_str.split("```json")[1].split("```")[0].strip()
+        elif "```" in json_str:
+            parts = json_str.split("```")
+            if len(parts) >= 2:
+                json_str = parts[1].strip()
+        
+        if "{" in json_str and "}" in json_str:
+            start = json_str.find("{")
+            end = json_str.rfind("}") + 1
+            json_str = json_str[start:end]
+        
+        course_structure = json.loads(json_str)
+        st.session_state['course_structure'] = course_structure
+        st.success("Course structure generated successfully!")
+    except Exception as e:
+        st.error(f"Generation failed: {str(e)}")
 
 # Display results
 if 'course_structure' in st.session_state:
@@ -3,7 +3,8 @@ Industry Alignment Analysis - Professor Tool
 """
 import streamlit as st
 import json
-from src.llm.client import GeminiClient
+from src.utils.resources import get_llm_client
+from src.utils.generation_ui import stream_response
 from src.llm.scenario_prompts import get_industry_alignment_prompt
 from src.pdf.simple_generator import generate_pdf
 
@@ -73,30 +74,32 @@ if submitted and program_name and core_courses:
         geographic_region=geographic_region
     )
     
-    with st.spinner("Analyzing industry alignment..."):
-        try:
-            llm_client = GeminiClient()
-            response = llm_client.generate_with_retry(prompt=prompt, temperature=0.4)
-            
-            # Parse JSON
-            json_str = response.strip()
-            if "```json" in json_str:
-                json_str = json_str.split("```json")[1].split("```")[0].strip()
-            elif "```" in json_str:
-                parts = json_str.split("```")
-                if len(parts) >= 2:
-                    json_str = parts[1].strip()
-            
-            if "{" in json_str and "}" in json_str:
-                start = json_str.find("{")
-                end = json_str.rfind("}") + 1
-                json_str = json_str[start:end]
-            
-            analysis = json.loads(json_str)
-            st.session_state['industry_analysis'] = analysis
-            st.success("Industry alignment analysis complete!")
-        except Exception as e:
-            st.error(f"Analysis failed: {str(e)}")
+    try:
+        llm_client = get_llm_client()
+        response = stream_response(
+            llm_client, prompt, spinner_text="Analyzing industry alignment...",
+            temperature=0.4, scenario="industry_alignment"
+        )
+        
+        # Parse JSON
+        json_str = response.strip()
+        if "```json" in json_str:
+            json_str = json_str.split("```json")[1].split("```")[0].strip()
+        elif "```" in json_str:
+            parts = json_str.split("```")
+            if len(parts) >= 2:
+                json_str = parts[1].strip()
+        
+        if "{" in json_str and "}" in json_str:
+            start = json_str.find("{")
+            end = json_str.rfind("}") + 1
+            json_str = json_str[start:end]
+        
+        analysis = json.loads(json_str)
+        st.session_state['industry_analysis'] = analysis
+        st.success("Industry alignment analysis complete!")
+    except Exception as e:
+        st.error(f"Analysis failed: {str(e)}")
 
 # Display Results
 if 'industry_analysis' in st.session_state:
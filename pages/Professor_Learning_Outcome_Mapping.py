@@ -3,7 +3,8 @@ Learning Outcome Mapping - Professor Tool
 """
 import streamlit as st
 import json
-from src.llm.client import GeminiClient
+from src.utils.resources import get_llm_client
+from src.utils.generation_ui import stream_response
 from src.llm.scenario_prompts import get_learning_outcome_mapping_prompt
 from src.pdf.simple_generator import generate_pdf
 
@@ -73,30 +74,32 @@ if submitted and course_name and topics_covered:
         existing_outcomes=existing_outcomes if existing_outcomes else None
     )
     
-    with st.spinner("Mapping learning outcomes to topics and standards..."):
-        try:
-            llm_client = GeminiClient()
-            response = llm_client.generate_with_retry(prompt=prompt, temperature=0.4)
-            
-            # Parse JSON
-            json_str = response.strip()
-            if "```json" in json_str:
-                json_str = json_str.split("```json")[1].split("```")[0].strip()
-            elif "```" in json_str:
-                parts = json_str.split("```")
-                if len(parts) >= 2:
-                    json_str = parts[1].strip()
-            
-            if "{" in json_str and "}" in json_str:
-                start = json_str.find("{")
-                end = json_str.rfind("}") + 1
-                json_str = json_str[start:end]
-            
-            mapping = json.loads(json_str)
-            st.session_state['outcome_mapping'] = mapping
-            st.success("Learning outcome mapping generated!")
-        except Exception as e:
-            st.error(f"Generation failed: {str(e)}")
+    try:
+        llm_client = get_llm_client()
+        response = stream_response(
+            llm_client, prompt, spinner_text="Mapping learning outcomes to topics and standards...",
+            temperature=0.4, scenario="learning_outcome_mapping"
+        )
+        
+        # Parse JSON
+        json_str = response.strip()
+        if "```json" in json_str:
+            json_str = json_str.split("```json")[1].split("```")[0].strip()
+        elif "```" in json_str:
+            parts = json_str.split("```")
+            if len(parts) >= 2:
+                json_str = parts[1].strip()
+        
+        if "{" in json_str and "}" in json_str:
+            start = json_str.find("{")
+            end = json_str.rfind("}") + 1
+            json_str = json_str[start:end]
+        
+        mapping = json.loads(json_str)
+        st.session_state['outcome_mapping'] = mapping
+        st.success("Learning outcome mapping generated!")
+    except Exception as e:
+        st.error(f"Generation failed: {str(e)}")
 
 # Display Results
 if 'outcome_mapping' in st.session_state:
@@ -3,7 +3,8 @@ Topic Recommendations - Professor Tool
 """
 import streamlit as st
 import json
-from src.llm.client import GeminiClient
+from src.utils.resources import get_llm_client
+from src.utils.generation_ui import stream_response
 from src.llm.scenario_prompts import get_topic_recommendations_prompt
 from src.pdf.simple_generator import generate_pdf
 
@@ -71,29 +72,31 @@ if submitted and course_name and current_topics:
         update_goals=", ".join(update_goals)
     )
     
-    with st.spinner("Generating topic recommendations..."):
-        try:
-            llm_client = GeminiClient()
-            response = llm_client.generate_with_retry(prompt=prompt, temperature=0.5)
-            
-            json_str = response.strip()
-            if "```json" in json_str:
-                json_str = json_str.split("```json")[1].split("```")[0].strip()
-            elif "```" in json_str:
-                parts = json_str.split("```")
-                if len(parts) >= 2:
-                    json_str = parts[1].strip()
-            
-            if "{" in json_str and "}" in json_str:
-                start = json_str.find("{")
-                end = json_str.rfind("}") + 1
-                json_str = json_str[start:end]
-            
-            recommendations = json.loads(json_str)
-            st.session_state['topic_recommendations'] = recommendations
-            st.success("Topic recommendations generated!")
-        except Exception as e:
-            st.error(f"Recommendation generation failed: {str(e)}")
+    try:
+        llm_client = get_llm_client()
+        response = stream_response(
+            llm_client, prompt, spinner_text="Generating topic recommendations...",
+            temperature=0.5, scenario="topic_recommendations"
+        )
+        
+        json_str = response.strip()
+        if "```json" in json_str:
+            json_str = json_str.split("```json")[1].split("```")[0].strip()
+        elif "```" in json_str:
+            parts = json_str.split("```")
+            if len(parts) >= 2:
+                json_str = parts[1].strip()
+        
+        if "{" in json_str and "}" in json_str:
+            start = json_str.find("{")
+            end = json_str.rfind("}") + 1
+            json_str = json_str[start:end]
+        
+        recommendations = json.loads(json_str)
+        st.session_state['topic_recommendations'] = recommendations
+        st.success("Topic recommendations generated!")
+    except Exception as e:
+        st.error(f"Recommendation generation failed: {str(e)}")
 
 if 'topic_recommendations' in st.session_state:
     recommendations = st.session_state['topic_recommendations']
@@ -3,7 +3,9 @@ Career Path Planner - Student Tool
 """
 import streamlit as st
 import json
-from src.llm.client import GeminiClient
+from src.utils.resources import get_llm_client
+from src.utils.generation_ui import stream_response
+from src.llm.semantic_cache import user_inputs_text
 from src.llm.scenario_prompts import get_career_path_planner_prompt
 from src.pdf.simple_generator import generate_pdf
 
@@ -65,7 +67,7 @@ with st.form("career_path_form"):
     submitted = st.form_submit_button("Generate Career Path", use_container_width=True)
 
 if submitted and target_role and field_of_study:
-    prompt = get_career_path_planner_prompt(
+    user_inputs = dict(
         current_education=current_education,
         field_of_study=field_of_study,
         current_skills=current_skills if current_skills else "None specified",
@@ -74,31 +76,35 @@ if submitted and target_role and field_of_study:
         timeline=timeline,
         interests=interests if interests else None
     )
-    
-    with st.spinner("Creating your personalized career roadmap..."):
-        try:
-            llm_client = GeminiClient()
-            response = llm_client.generate_with_retry(prompt=prompt, temperature=0.5)
-            
-            # Parse JSON
-            json_str = response.strip()
-            if "```json" in json_str:
-                json_str = json_str.split("```json")[1].split("```")[0].strip()
-            elif "```" in json_str:
-                parts = json_str.split("```")
-                if len(parts) >= 2:
-                    json_str = parts[1].strip()
-            
-            if "{" in json_str and "}" in json_str:
-                start = json_str.find("{")
-                end = json_str.rfind("}") + 1
-                json_str = json_str[start:end]
-            
-            career_path = json.loads(json_str)
-            st.session_state['career_path'] = career_path
-            st.success("Career path generated!")
-        except Exception as e:
-            st.error(f"Generation failed: {str(e)}")
+    prompt = get_career_path_planner_prompt(**user_inputs)
+    
+    try:
+        llm_client = get_llm_client()
+        response = stream_response(
+            llm_client, prompt, spinner_text="Creating your personalized career roadmap...",
+            temperature=0.5, scenario="career_path_planner",
+            semantic_text=user_inputs_text(user_inputs)
+        )
+        
+        # Parse JSON
+        json_str = response.strip()
+        if "```json" in json_str:
+            json_str = json_str.split("```json")[1].split("```")[0].strip()
+        elif "```" in json_str:
+            parts = json_str.split("```")
+            if len(parts) >= 2:
+                json_str = parts[1].strip()
+        
+        if "{" in json_str and "}" in json_str:
+            start = json_str.find("{")
+            end = json_str.rfind("}") + 1
+            json_str = json_str[start:end]
+        
+        career_path = json.loads(json_str)
+        st.session_state['career_path'] = career_path
+        st.success("Career path generated!")
+    except Exception as e:
+        st.error(f"Generation failed: {str(e)}")
 
 # Display Results
 if 'career_path' in st.session_state:
@@ -3,7 +3,9 @@ Job Opportunities - Student Tool
 """
 import streamlit as st
 import json
-from src.llm.client import GeminiClient
+from src.utils.resources import get_llm_client
+from src.utils.generation_ui import stream_response
+from src.llm.semantic_cache import user_inputs_text
 from src.llm.scenario_prompts import get_job_opportunities_prompt
 from src.pdf.simple_generator import generate_pdf
 
@@ -67,7 +69,7 @@ with st.form("job_opportunities_form"):
     submitted = st.form_submit_button("Find Job Opportunities", use_container_width=True)
 
 if submitted and field_of_study and skills:
-    prompt = get_job_opportunities_prompt(
+    user_inputs = dict(
         skills=skills,
         interests=interests,
         experience_level=experience_years,
@@ -77,30 +79,34 @@ if submitted and field_of_study and skills:
         job_types=", ".join(job_types),
         preferred_industries=", ".join(preferred_industries)
     )
-    
-    with st.spinner("Finding matching job opportunities..."):
-        try:
-            llm_client = GeminiClient()
-            response = llm_client.generate_with_retry(prompt=prompt, temperature=0.5)
-            
-            json_str = response.strip()
-            if "```json" in json_str:
-                json_str = json_str.split("```json")[1].split("```")[0].strip()
-            elif "```" in json_str:
-                parts = json_str.split("```")
-                if len(parts) >= 2:
-                    json_str = parts[1].strip()
-            
-            if "{" in json_str and "}" in json_str:
-                start = json_str.find("{")
-                end = json_str.rfind("}") + 1
-                json_str = json_str[start:end]
-            
-            opportunities = json.loads(json_str)
-            st.session_state['job_opportunities'] = opportunities
-            st.success("Job opportunities found!")
-        except Exception as e:
-            st.error(f"Search failed: {str(e)}")
+    prompt = get_job_opportunities_prompt(**user_inputs)
+    
+    try:
+        llm_client = get_llm_client()
+        response = stream_response(
+            llm_client, prompt, spinner_text="Finding matching job opportunities...",
+            temperature=0.5, scenario="job_opportunities",
+            semantic_text=user_inputs_text(user_inputs)
+        )
+        
+        json_str = response.strip()
+        if "```json" in json_str:
+            json_str = json_str.split("```json")[1].split("```")[0].strip()
+        elif "```" in json_str:
+            parts = json_str.split("```")
+            if len(parts) >= 2:
+                json_str = parts[1].strip()
+        
+        if "{" in json_str and "}" in json_str:
+            start = json_str.find("{")
+            end = json_str.rfind("}") + 1
+            json_str = json_str[start:end]
+        
+        opportunities = json.loads(json_str)
+        st.session_state['job_opportunities'] = opportunities
+        st.success("Job opportunities found!")
+    except Exception as e:
+        st.error(f"Search failed: {str(e)}")
 
 if 'job_opportunities' in st.session_state:
     opportunities = st.session_state['job_opportunities']
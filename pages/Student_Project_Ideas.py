@@ -3,7 +3,9 @@ Project Ideas - Student Tool
 """
 import streamlit as st
 import json
-from src.llm.client import GeminiClient
+from src.utils.resources import get_llm_client
+from src.utils.generation_ui import stream_response
+from src.llm.semantic_cache import user_inputs_text
 from src.llm.scenario_prompts import get_project_ideas_prompt
 from src.pdf.simple_generator import generate_pdf
 
@@ -64,7 +66,7 @@ with st.form("project_ideas_form"):
     submitted = st.form_submit_button("Generate Project Ideas", use_container_width=True)
 
 if submitted and current_skills and interests:
-    prompt = get_project_ideas_prompt(
+    user_inputs = dict(
         skill_level=skill_level,
         current_skills=current_skills,
         interests=interests,
@@ -73,30 +75,34 @@ if submitted and current_skills and interests:
         timeline=timeline,
         skills_to_learn=skills_to_learn if skills_to_learn else None
     )
+    prompt = get_project_ideas_prompt(**user_inputs)
     
-    with st.spinner("Generating personalized project ideas..."):
-        try:
-            llm_client = GeminiClient()
-            response = llm_client.generate_with_retry(prompt=prompt, temperature=0.6)
-            
-            json_str = response.strip()
-            if "```json" in json_str:
-                json_str = json_str.split("```json")[1].split("```")[0].strip()
-            elif "```" in json_str:
-                parts = json_str.split("```")
-                if len(parts) >= 2:
-                    json_str = parts[1].strip()
-            
-            if "{" in json_str and "}" in json_str:
-                start = json_str.find("{")
-                end = json_str.rfind("}") + 1
-                json_str = json_str[start:end]
-            
-            projects = json.loads(json_str)
-            st.session_state['project_ideas'] = projects
-            st.success("Project ideas generated!")
-        except Exception as e:
-            st.error(f"Generation failed: {str(e)}")
+    try:
+        llm_client = get_llm_client()
+        response = stream_response(
+            llm_client, prompt, spinner_text="Generating personalized project ideas...",
+            temperature=0.6, scenario="project_ideas",
+            semantic_text=user_inputs_text(user_inputs)
+        )
+        
+        json_str = response.strip()
+        if "```json" in json_str:
+            json_str = json_str.split("```json")[1].split("```")[0].strip()
+        elif "```" in json_str:
+            parts = json_str.split("```")
+            if len(parts) >= 2:
+                json_str = parts[1].strip()
+        
+        if "{" in json_str and "}" in json_str:
+            start = json_str.find("{")
+            end = json_str.rfind("}") + 1
+            json_str = json_str[start:end]
+        
+        projects = json.loads(json_str)
+        st.session_state['project_ideas'] = projects
+        st.success("Project ideas generated!")
+    except Exception as e:
+        st.error(f"Generation failed: {str(e)}")
 
 if 'project_ideas' in st.session_state:
     projects = st.session_state['project_ideas']
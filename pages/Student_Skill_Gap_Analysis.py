@@ -3,7 +3,9 @@ Skill Gap Analysis - Student Tool
 """
 import streamlit as st
 import json
-from src.llm.client import GeminiClient
+from src.utils.resources import get_llm_client
+from src.utils.generation_ui import stream_response
+from src.llm.semantic_cache import user_inputs_text
 from src.llm.scenario_prompts import get_skill_gap_analysis_prompt
 from src.pdf.simple_generator import generate_pdf
 
@@ -43,36 +45,40 @@ with st.form("skill_gap_form"):
     submitted = st.form_submit_button("Analyze Skill Gaps", use_container_width=True)
 
 if submitted and resume_text:
-    prompt = get_skill_gap_analysis_prompt(
+    user_inputs = dict(
         resume_text=resume_text,
         target_role=target_role if target_role else None,
         job_description=job_description if job_description else None
     )
+    prompt = get_skill_gap_analysis_prompt(**user_inputs)
     
-    with st.spinner("Analyzing your skills and identifying gaps..."):
-        try:
-            llm_client = GeminiClient()
-            response = llm_client.generate_with_retry(prompt=prompt, temperature=0.5)
-            
-            # Parse JSON
-            json_str = response.strip()
-            if "```json" in json_str:
-                json_str = json_str.split("```json")[1].split("```")[0].strip()
-            elif "```" in json_str:
-                parts = json_str.split("```")
-                if len(parts) >= 2:
-                    json_str = parts[1].strip()
-            
-            if "{" in json_str and "}" in json_str:
-                start = json_str.find("{")
-                end = json_str.rfind("}") + 1
-                json_str = json_str[start:end]
-            
-            analysis = json.loads(json_str)
-            st.session_state['skill_analysis'] = analysis
-            st.success("Skill analysis complete!")
-        except Exception as e:
-            st.error(f"Analysis failed: {str(e)}")
+    try:
+        llm_client = get_llm_client()
+        response = stream_response(
+            llm_client, prompt, spinner_text="Analyzing your skills and identifying gaps...",
+            temperature=0.5, scenario="skill_gap_analysis",
+            semantic_text=user_inputs_text(user_inputs)
+        )
+        
+        # Parse JSON
+        json_str = response.strip()
+        if "```json" in json_str:
+            json_str = json_str.split("```json")[1].split("```")[0].strip()
+        elif "```" in json_str:
+            parts = json_str.split("```")
+            if len(parts) >= 2:
+                json_str = parts[1].strip()
+        
+        if "{" in json_str and "}" in json_str:
+            start = json_str.find("{")
+            end = json_str.rfind("}") + 1
+            json_str = json_str[start:end]
+        
+        analysis = json.loads(json_str)
+        st.session_state['skill_analysis'] = analysis
+        st.success("Skill analysis complete!")
+    except Exception as e:
+        st.error(f"Analysis failed: {str(e)}")
 
 # Display Results
 if 'skill_analysis' in st.session_state:
@@ -1,15 +1,29 @@
 """
 Populate ChromaDB vector store with curriculum examples.
-Run this once to initialize the knowledge base.
+Run this once to initialize the knowledge base, and again after adding files.
 
 Automatically scans ALL folders under data/knowledge_base/
-Just create folders and drop your .md files - it works automatically!
+Just create folders and drop your .md, .pdf or .docx files - it works automatically!
+PDF and DOCX syllabi are streamed page by page, so large files are never
+held in memory whole.
+
+Re-runs are incremental: a manifest of file and chunk hashes decides what
+to add, update or delete. Use --rebuild to re-embed everything, and --watch
+to keep running and sync every change to the folder as it happens.
 """
 import os
 import glob
 import re
+import argparse
+import itertools
 from pathlib import Path
 from src.rag.vector_store import CurriculumVectorStore
+from src.rag.chunker import MarkdownChunker
+from src.rag.loaders import SUPPORTED_EXTENSIONS, iter_document_blocks, iter_text_windows
+from src.rag.manifest import IngestionManifest, hash_chunk, hash_file, hash_text
+from src.rag.metadata import normalize_level, infer_level
+from src.rag.pipeline import IngestionPipeline, merge_stats
+from src.rag.watcher import KnowledgeBaseWatcher
 
 
 def extract_metadata_from_content(content, filepath):
@@ -47,118 +61,635 @@ def extract_metadata_from_content(content, filepath):
     return metadata
 
 
-def load_curriculum_documents():
+KNOWLEDGE_BASE_PATH = "data/knowledge_base"
+
+# Chunks embedded and upserted per batch while ingesting a file
+INGEST_BATCH_SIZE = 64
+
+# Characters of a streamed PDF/DOCX handed to the chunker at a time
+STREAM_WINDOW_CHARS = 20000
+
+
+def find_curriculum_files(knowledge_base_path=KNOWLEDGE_BASE_PATH):
+    """Find all .md, .pdf and .docx files recursively, sorted for stable ordering."""
+    return sorted(
+        path
+        for extension in SUPPORTED_EXTENSIONS
+        for path in glob.glob(f"{knowledge_base_path}/**/*{extension}", recursive=True)
+    )
+
+
+def is_markdown(filepath):
+    return filepath.lower().endswith('.md')
+
+
+def document_metadata(filepath, content):
+    """
+    Build the metadata shared by every chunk of one file.
+    
+    Args:
+        filepath: Source path
+        content: The file's text, or its opening window for streamed files
+        
+    Returns:
+        Tuple of (metadata dict, document id)
+    """
+    # Extract category from folder name (last part of path)
+    folder_name = os.path.basename(os.path.dirname(filepath))
+    category = folder_name.replace('_', ' ').title()
+    
+    # Extract metadata from content
+    content_metadata = extract_metadata_from_content(content, filepath)
+    
+    # Build metadata dictionary
+    filename = os.path.basename(filepath)
+    if is_markdown(filepath):
+        file_id = filename.replace('.md', '').replace(' ', '_')
+    else:
+        # syllabus.pdf and syllabus.docx next to each other must not share ids
+        stem, extension = os.path.splitext(filename)
+        file_id = f"{stem}_{extension[1:].lower()}".replace(' ', '_')
+        if 'title' not in content_metadata:
+            # PDF text has no markdown headings; the first line is usually the title
+            first_line = next((line.strip() for line in content.split('\n') if line.strip()), '')
+            if first_line:
+                content_metadata['title'] = first_line[:200]
+    
+    metadata = {
+        'source': filepath,
+        'category': category,
+        'folder': folder_name,
+        'filename': filename,
+        **content_metadata  # Merge extracted metadata
+    }
+    
+    # Canonical level used by the retriever to rank level matches first
+    if 'level' in metadata:
+        metadata['level_key'] = normalize_level(metadata['level'])
+    else:
+        metadata['level_key'] = infer_level(content)
+    
+    return metadata, f"{folder_name}_{file_id}"
+
+
+def chunk_curriculum_file(filepath, content, chunker):
+    """
+    Build metadata for one file and split it into chunks.
+    
+    Returns:
+        List of chunks with 'id', 'content' and 'metadata'
     """
-    Load ALL curriculum documents from knowledge base.
-    Automatically scans any folder structure under data/knowledge_base/
+    metadata, doc_id = document_metadata(filepath, content)
+    return chunker.chunk_document(content, metadata=metadata, doc_id=doc_id)
+
+
+def iter_curriculum_chunks(filepath, chunker, content=None, window_chars=STREAM_WINDOW_CHARS):
     """
-    documents = []
-    metadatas = []
-    ids = []
+    Yield the chunks of one knowledge base file.
+    
+    Markdown files are chunked whole. PDF and DOCX files are streamed:
+    pages/blocks are grouped into windows of window_chars and chunked one
+    window at a time, with metadata taken from the opening window.
+    
+    Args:
+        filepath: Source path
+        chunker: MarkdownChunker
+        content: Already-read text of a markdown file (read if None)
+        window_chars: Window size for streamed files
+    """
+    if is_markdown(filepath):
+        if content is None:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
+        yield from chunk_curriculum_file(filepath, content, chunker)
+        return
+    
+    windows = iter_text_windows(iter_document_blocks(filepath), window_chars)
+    first = next(windows, None)
+    if first is None:
+        return
+    metadata, doc_id = document_metadata(filepath, first)
+    yield from chunker.chunk_stream(itertools.chain([first], windows), metadata=metadata, doc_id=doc_id)
+
+
+def parse_curriculum_file(filepath, chunker_settings, content=None):
+    """Process-pool task of the ingestion pipeline: all chunks of one file."""
+    return list(iter_curriculum_chunks(filepath, MarkdownChunker(**chunker_settings), content=content))
+
+
+def iter_batches(items, batch_size):
+    """Consecutive lists of up to batch_size items from any iterable."""
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def chunker_config(chunker):
+    """Chunker settings recorded in the manifest; a change forces re-chunking."""
+    return {
+        'max_chars': chunker.max_chars,
+        'overlap_chars': chunker.overlap_chars,
+        'min_chars': chunker.min_chars
+    }
+
+
+def split_near_duplicates(filepath, chunks, recorded, dedup):
+    """
+    Separate a batch of a file's chunks into chunks to store and near-duplicates.
+    
+    Unchanged chunks that are already stored stay stored. Every other chunk
+    is looked up in the MinHash/LSH index: a near-duplicate of a stored
+    chunk is only recorded as a reference to it, anything else is stored.
+    
+    Args:
+        filepath: Source path of the chunks
+        chunks: Batch of chunks
+        recorded: Chunk hashes the manifest recorded for the file
+        dedup: NearDuplicateIndex
+    
+    Returns:
+        Tuple of (chunks to store, number of duplicates, sources whose
+        duplicates lost their stored copy and must be re-synced)
+    """
+    stored = []
+    duplicates = 0
+    orphaned = set()
+    for chunk in chunks:
+        chunk_id = chunk['id']
+        if recorded.get(chunk_id) == hash_chunk(chunk['content'], chunk['metadata']) and dedup.is_stored(chunk_id):
+            stored.append(chunk)
+            continue
+        
+        # Changed content: duplicates of the old text no longer have a copy
+        orphaned.update(dedup.remove(chunk_id))
+        signature = dedup.signature(chunk['content'])
+        canonical_id = dedup.find(signature, exclude=[chunk_id])
+        if canonical_id is None:
+            dedup.add(chunk_id, signature)
+            stored.append(chunk)
+        else:
+            dedup.add_duplicate(chunk_id, canonical_id, filepath)
+            duplicates += 1
+    
+    return stored, duplicates, orphaned
+
+
+def ingest_file(
+    vector_store,
+    manifest,
+    filepath,
+    file_hash,
+    chunks,
+    duplicate_index=None,
+    batch_size=INGEST_BATCH_SIZE
+):
+    """
+    Upsert one file's chunks in bounded batches and record it in the manifest.
+    
+    chunks may be a generator (streamed PDF/DOCX): at most batch_size chunks
+    are held at a time, plus the ids and hashes of the file's chunks. Only
+    chunks whose hash differs from the manifest are embedded; chunks no
+    longer produced are deleted once the whole file has been read. If
+    reading fails part-way, chunks first written by this call are removed
+    again and the error is re-raised.
+    
+    Returns:
+        Dict with 'total', 'upserted', 'deleted' and 'duplicates' counts and
+        'orphaned' (sources to re-sync because their stored copy went away)
+    """
+    recorded = manifest.files.get(filepath, {}).get('chunks', {})
+    if duplicate_index is not None:
+        duplicate_index.remove_source(filepath)
+    
+    result = {'total': 0, 'upserted': 0, 'deleted': 0, 'duplicates': 0, 'orphaned': set()}
+    seen_ids = set()
+    stored_hashes = {}
+    written_ids = []
+    try:
+        for batch in iter_batches(chunks, batch_size):
+            seen_ids.update(chunk['id'] for chunk in batch)
+            if duplicate_index is not None:
+                batch, duplicates, orphaned = split_near_duplicates(filepath, batch, recorded, duplicate_index)
+                result['duplicates'] += duplicates
+                result['orphaned'] |= orphaned
+            
+            hashes = {chunk['id']: hash_chunk(chunk['content'], chunk['metadata']) for chunk in batch}
+            upsert = [chunk for chunk in batch if recorded.get(chunk['id']) != hashes[chunk['id']]]
+            vector_store.upsert_documents(
+                documents=[c['content'] for c in upsert],
+                metadatas=[c['metadata'] for c in upsert],
+                ids=[c['id'] for c in upsert]
+            )
+            written_ids.extend(c['id'] for c in upsert if c['id'] not in recorded)
+            stored_hashes.update(hashes)
+            result['upserted'] += len(upsert)
+    except Exception:
+        vector_store.delete_documents(written_ids)
+        if duplicate_index is not None:
+            duplicate_index.remove_source(filepath)
+            for chunk_id in written_ids:
+                duplicate_index.remove(chunk_id)
+        raise
     
-    knowledge_base_path = "data/knowledge_base"
+    # Recorded chunks that are no longer stored: gone from the file, or now duplicates
+    stale_ids = sorted(chunk_id for chunk_id in recorded if chunk_id not in stored_hashes)
+    vector_store.delete_documents(stale_ids)
+    if duplicate_index is not None:
+        for chunk_id in recorded:
+            if chunk_id not in seen_ids:
+                result['orphaned'] |= set(duplicate_index.remove(chunk_id))
     
-    # Find all .md files recursively
-    all_md_files = glob.glob(f"{knowledge_base_path}/**/*.md", recursive=True)
+    manifest.record_chunk_hashes(filepath, file_hash, stored_hashes)
+    result['total'] = len(seen_ids)
+    result['deleted'] = len(stale_ids)
+    return result
+
+
+def ingest_files_pipelined(
+    vector_store,
+    manifest,
+    filepaths,
+    file_hashes,
+    contents,
+    chunker,
+    duplicate_index,
+    on_file_done,
+    workers=None,
+    batch_size=INGEST_BATCH_SIZE
+):
+    """
+    Ingest files through the staged pipeline (see src/rag/pipeline.py).
     
-    if not all_md_files:
-        print(f"⚠️  No .md files found in {knowledge_base_path}")
-        print("   Create folders and add .md files to get started!")
-        return documents, metadatas, ids
+    Files are chunked in worker processes. Near-duplicate detection and the
+    manifest diff run on this thread in file order, so results match the
+    serial path; embedding and writing overlap with parsing the next files.
+    Each worker returns a whole file's chunks, so only Markdown files (read
+    into memory anyway) should be passed; sync_knowledge_base streams
+    PDF/DOCX serially.
     
-    print(f"\n📁 Scanning {knowledge_base_path}...")
-    print(f"   Found {len(all_md_files)} markdown files\n")
+    Args:
+        on_file_done: Called with (filepath, result) once a file is written,
+                      result as returned by ingest_file
     
-    # Group files by folder for better display
-    files_by_folder = {}
-    for filepath in all_md_files:
-        folder = os.path.dirname(filepath)
-        if folder not in files_by_folder:
-            files_by_folder[folder] = []
-        files_by_folder[folder].append(filepath)
+    Returns:
+        Per-stage pipeline stats
+    """
+    settings = chunker_config(chunker)
+    prepared = {}
     
-    # Process each file
-    for folder, files in sorted(files_by_folder.items()):
-        # Extract category from folder name (last part of path)
-        folder_name = os.path.basename(folder)
-        category = folder_name.replace('_', ' ').title()
+    def prepare(filepath, chunks):
+        recorded = manifest.files.get(filepath, {}).get('chunks', {})
+        result = {'total': len(chunks), 'duplicates': 0, 'orphaned': set()}
+        stored = chunks
+        if duplicate_index is not None:
+            duplicate_index.remove_source(filepath)
+            stored, result['duplicates'], result['orphaned'] = split_near_duplicates(
+                filepath, chunks, recorded, duplicate_index
+            )
+            current_ids = {chunk['id'] for chunk in chunks}
+            for chunk_id in recorded:
+                if chunk_id not in current_ids:
+                    result['orphaned'] |= set(duplicate_index.remove(chunk_id))
         
-        print(f"📂 {folder_name}/ ({len(files)} files)")
+        hashes = {chunk['id']: hash_chunk(chunk['content'], chunk['metadata']) for chunk in stored}
+        upsert = [chunk for chunk in stored if recorded.get(chunk['id']) != hashes[chunk['id']]]
+        result['hashes'] = hashes
+        result['stale'] = sorted(chunk_id for chunk_id in recorded if chunk_id not in hashes)
+        result['upserted'] = len(upsert)
+        prepared[filepath] = result
+        return upsert
+    
+    def finish(filepath):
+        result = prepared.pop(filepath)
+        vector_store.delete_documents(result['stale'])
+        manifest.record_chunk_hashes(filepath, file_hashes[filepath], result.pop('hashes'))
+        result['deleted'] = len(result.pop('stale'))
+        on_file_done(filepath, result)
+    
+    def report_error(filepath, error):
+        print(f"   ❌ Error ingesting {filepath}: {error}")
+    
+    pipeline = IngestionPipeline(vector_store, workers=workers, batch_size=batch_size)
+    tasks = [(filepath, settings, contents.get(filepath)) for filepath in filepaths]
+    return pipeline.run(tasks, parse_curriculum_file, prepare, finish, on_error=report_error)
+
+
+def sync_knowledge_base(
+    vector_store,
+    manifest,
+    chunker=None,
+    knowledge_base_path=KNOWLEDGE_BASE_PATH,
+    dedup=True,
+    batch_size=INGEST_BATCH_SIZE,
+    workers=1
+):
+    """
+    Incrementally sync the knowledge base folder into the vector store.
+    
+    New files are added, changed files have only their changed chunks
+    upserted (stale chunks deleted), removed files are deleted and
+    unchanged files are skipped without re-embedding anything.
+    
+    With dedup, near-duplicate chunks (e.g. the regulations and common
+    courses repeated across the AR22 curricula) are stored once; the
+    repeats are recorded in the store's duplicate index as references.
+    
+    Args:
+        vector_store: Vector store to update
+        manifest: IngestionManifest describing the current store contents
+        chunker: MarkdownChunker (default settings if None)
+        knowledge_base_path: Folder to scan
+        dedup: Detect and skip near-duplicate chunks
+        batch_size: Chunks embedded and upserted at a time
+        workers: Parse processes; above 1 Markdown files go through the
+                 staged pipeline (parse/chunk in parallel, embed and write
+                 in batches on their own threads); PDF/DOCX are always
+                 streamed one by one, so memory stays bounded
         
-        for filepath in sorted(files):
-            try:
+    Returns:
+        Dict of counts: files added/changed/removed/unchanged, chunks
+        upserted/deleted/deduplicated, plus 'pipeline' stage stats when
+        workers > 1
+    """
+    chunker = chunker or MarkdownChunker()
+    duplicate_index = vector_store.duplicate_index if dedup else None
+    config = {'chunker': chunker_config(chunker)}
+    if duplicate_index is not None:
+        config['dedup'] = {'threshold': duplicate_index.threshold, 'num_perm': duplicate_index.hasher.num_perm}
+    elif len(vector_store.duplicate_index):
+        # Dedup switched off: every chunk gets stored again
+        vector_store.duplicate_index.clear()
+        vector_store.duplicate_index.save()
+    
+    # Chunking settings changed: every file must be re-chunked
+    if manifest.config != config:
+        for entry in manifest.files.values():
+            entry['hash'] = None
+        manifest.config = config
+    
+    # Markdown is small and read once; PDF/DOCX are hashed in blocks and
+    # only parsed (streamed) if they changed
+    contents = {}
+    file_hashes = {}
+    unreadable = set()
+    for filepath in find_curriculum_files(knowledge_base_path):
+        try:
+            if is_markdown(filepath):
                 with open(filepath, 'r', encoding='utf-8') as f:
                     content = f.read()
-                
                 if not content.strip():
-                    print(f"   ⚠️  Skipped (empty): {os.path.basename(filepath)}")
                     continue
-                
-                # Extract metadata from content
-                content_metadata = extract_metadata_from_content(content, filepath)
-                
-                # Build metadata dictionary
-                filename = os.path.basename(filepath)
-                file_id = filename.replace('.md', '').replace(' ', '_')
-                
-                metadata = {
-                    'source': filepath,
-                    'category': category,
-                    'folder': folder_name,
-                    'filename': filename,
-                    **content_metadata  # Merge extracted metadata
-                }
-                
-                # Add to collections
-                documents.append(content)
-                metadatas.append(metadata)
-                ids.append(f"{folder_name}_{file_id}")
-                
-                print(f"   ✅ {filename}")
-                
+                contents[filepath] = content
+                file_hashes[filepath] = hash_text(content)
+            elif os.path.getsize(filepath) > 0:
+                file_hashes[filepath] = hash_file(filepath)
+        except Exception as e:
+            print(f"   ❌ Error reading {filepath}: {e}")
+            # Still there, just unreadable right now (permissions, a lock):
+            # keep what is stored instead of treating the file as removed
+            if filepath in manifest.files:
+                unreadable.add(filepath)
+                file_hashes[filepath] = manifest.files[filepath].get('hash')
+    
+    diff = manifest.diff_files(file_hashes)
+    stats = {
+        'files_added': len(diff['added']),
+        'files_changed': len(diff['changed']),
+        'files_removed': len(diff['removed']),
+        'files_unchanged': len(diff['unchanged']),
+        'chunks_upserted': 0,
+        'chunks_deleted': 0,
+        'chunks_deduplicated': 0
+    }
+    
+    # Files whose duplicate chunks lost their stored copy are synced again
+    pending = diff['added'] + diff['changed']
+    
+    def requeue(sources):
+        for source in sorted(sources):
+            if source in file_hashes and source not in unreadable and source not in pending:
+                pending.append(source)
+    
+    def file_done(filepath, result):
+        requeue(result['orphaned'] - {filepath})
+        stats['chunks_upserted'] += result['upserted']
+        stats['chunks_deleted'] += result['deleted']
+        stats['chunks_deduplicated'] += result['duplicates']
+        status = "Added" if filepath in diff['added'] else "Updated"
+        print(f"   ✅ {status}: {filepath} "
+              f"({result['upserted']}/{result['total']} chunks embedded, "
+              f"{result['duplicates']} near-duplicates, {result['deleted']} deleted)")
+    
+    # One commit for the whole sync (the flat index would otherwise rewrite
+    # its files per batch); the manifest is saved after it, so a crash
+    # mid-sync leaves both at the previous state
+    with vector_store.bulk_write():
+        for filepath in diff['removed']:
+            stale_ids = manifest.remove_file(filepath)
+            vector_store.delete_documents(stale_ids)
+            if duplicate_index is not None:
+                duplicate_index.remove_source(filepath)
+                for chunk_id in stale_ids:
+                    requeue(duplicate_index.remove(chunk_id))
+            stats['chunks_deleted'] += len(stale_ids)
+            print(f"   🗑️  Removed: {filepath} ({len(stale_ids)} chunks)")
+    
+        while workers > 1 and any(is_markdown(filepath) for filepath in pending):
+            # Requeued files wait for the next round, after this one is written.
+            # Workers return whole files, so PDF/DOCX are left to the
+            # streaming loop below
+            round_files = [filepath for filepath in pending if is_markdown(filepath)]
+            pending[:] = [filepath for filepath in pending if not is_markdown(filepath)]
+            round_stats = ingest_files_pipelined(
+                vector_store, manifest, round_files, file_hashes, contents, chunker,
+                duplicate_index, file_done, workers=workers, batch_size=batch_size
+            )
+            stats['pipeline'] = merge_stats(stats['pipeline'], round_stats) if 'pipeline' in stats else round_stats
+    
+        while pending:
+            filepath = pending.pop(0)
+            chunks = iter_curriculum_chunks(filepath, chunker, content=contents.get(filepath))
+            try:
+                result = ingest_file(
+                    vector_store, manifest, filepath, file_hashes[filepath], chunks,
+                    duplicate_index=duplicate_index, batch_size=batch_size
+                )
             except Exception as e:
-                print(f"   ❌ Error reading {filepath}: {e}")
+                print(f"   ❌ Error ingesting {filepath}: {e}")
+                continue
+            file_done(filepath, result)
     
-    print(f"\n{'='*60}")
-    print(f"📊 Summary: Loaded {len(documents)} documents successfully")
-    print(f"{'='*60}")
+    manifest.save()
+    if duplicate_index is not None:
+        duplicate_index.save()
+    return stats
+
+
+def create_watcher(
+    vector_store,
+    manifest,
+    knowledge_base_path=KNOWLEDGE_BASE_PATH,
+    interval=2.0,
+    debounce=3.0,
+    **sync_options
+):
+    """
+    Watcher that incrementally syncs the knowledge base whenever it changes.
     
-    return documents, metadatas, ids
+    Each sync re-reads the manifest first (another process may have synced
+    in between) and, like any sync, only chunks and embeds changed files.
+    Readers of the same store are not blocked: backends swap in new data
+    atomically and the version bump invalidates retriever caches.
+    
+    Args:
+        vector_store: Live vector store to update
+        manifest: IngestionManifest of the store
+        knowledge_base_path: Folder to watch
+        interval: Seconds between polls
+        debounce: Seconds the folder must be quiet before syncing
+        **sync_options: Passed to sync_knowledge_base (chunker, dedup, workers, ...)
+    """
+    def on_change(changed):
+        print(f"\n🔄 {len(changed)} file(s) changed, syncing...")
+        manifest.load()
+        stats = sync_knowledge_base(vector_store, manifest, knowledge_base_path=knowledge_base_path, **sync_options)
+        print(f"   Synced: {stats['chunks_upserted']} chunks embedded, {stats['chunks_deleted']} deleted "
+              f"({vector_store.get_count()} documents)")
+    
+    return KnowledgeBaseWatcher(
+        knowledge_base_path,
+        on_change,
+        extensions=SUPPORTED_EXTENSIONS,
+        interval=interval,
+        debounce=debounce
+    )
+
+
+def print_pipeline_stats(pipeline_stats):
+    """Per-stage throughput of a pipelined sync."""
+    print(f"   Pipeline ({pipeline_stats['workers']} parse workers, {pipeline_stats['wall_seconds']:.1f}s wall):")
+    for name in ('parse', 'embed', 'write'):
+        stage = pipeline_stats[name]
+        rate = f"{stage['chunks_per_second']:.0f} chunks/s" if stage['chunks_per_second'] else "idle"
+        print(f"      {name:<6} {stage['chunks']:>6} chunks, {stage['busy_seconds']:.1f}s busy "
+              f"({rate}), {stage['wait_seconds']:.1f}s blocked on the next stage")
 
 
 def main():
-    """Initialize vector store with curriculum examples."""
+    """Initialize or incrementally update the vector store with curriculum examples."""
+    parser = argparse.ArgumentParser(description="Populate the curriculum knowledge base")
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Clear the vector store and re-embed every document"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["chroma", "flat"],
+        default=None,
+        help="Vector store backend (default: VECTOR_BACKEND env var, else chroma)"
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Store near-duplicate chunks separately instead of once"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help="Parse processes for Markdown files (1 = stream every file one by one; "
+             "PDF/DOCX are always streamed)"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and sync changes to the knowledge base folder as they happen"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=2.0,
+        help="Watch mode: seconds between checks of the folder"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=3.0,
+        help="Watch mode: seconds the folder must be unchanged before syncing"
+    )
+    parser.add_argument(
+        "--import-snapshot",
+        metavar="PATH",
+        help="Load a knowledge base snapshot first (only changed files are embedded afterwards)"
+    )
+    parser.add_argument(
+        "--export-snapshot",
+        metavar="PATH",
+        help="Write the synced knowledge base to a single-file snapshot"
+    )
+    args = parser.parse_args()
+    
     print("Initializing Curriculum Knowledge Base...")
     print("=" * 60)
     
     # Initialize vector store
-    vector_store = CurriculumVectorStore()
+    vector_store = CurriculumVectorStore(backend=args.backend)
+    if args.import_snapshot:
+        vector_store.import_snapshot(args.import_snapshot)
+    manifest = IngestionManifest(vector_store.manifest_path)
+    
+    # Without a manifest we cannot tell what the existing documents are
+    if vector_store.get_count() > 0 and not manifest.exists():
+        print(f"\nFound {vector_store.get_count()} existing documents but no ingestion manifest")
+        print("Rebuilding the knowledge base from scratch")
+        args.rebuild = True
     
-    # Clear existing data (optional - comment out to keep existing data)
-    if vector_store.get_count() > 0:
-        print(f"\nFound {vector_store.get_count()} existing documents")
-        response = input("Clear existing data? (y/n): ")
-        if response.lower() == 'y':
+    if args.rebuild:
+        if vector_store.get_count() > 0:
             vector_store.clear()
-            print("Cleared existing data")
-    
-    # Load documents
-    print("\nLoading curriculum documents...")
-    documents, metadatas, ids = load_curriculum_documents()
-    print(f"Loaded {len(documents)} documents")
-    
-    # Add to vector store
-    print("\nAdding documents to vector store...")
-    vector_store.add_documents(
-        documents=documents,
-        metadatas=metadatas,
-        ids=ids
-    )
+        manifest.reset()
+    
+    print(f"\nSyncing {KNOWLEDGE_BASE_PATH} into vector store...")
+    stats = sync_knowledge_base(vector_store, manifest, dedup=not args.no_dedup, workers=args.workers)
+    
+    # Stores populated before the lexical index existed need a one-off build
+    if vector_store.get_count() > 0 and len(vector_store.lexical_index) == 0:
+        vector_store.rebuild_lexical_index()
+    
+    if args.export_snapshot:
+        vector_store.export_snapshot(args.export_snapshot, parameters={'chunker': manifest.config})
     
     print("\n" + "=" * 60)
-    print("Knowledge base initialized successfully!")
+    print("Knowledge base is up to date!")
+    print(f"   Files: {stats['files_added']} added, {stats['files_changed']} changed, "
+          f"{stats['files_removed']} removed, {stats['files_unchanged']} unchanged")
+    print(f"   Chunks: {stats['chunks_upserted']} embedded, {stats['chunks_deleted']} deleted, "
+          f"{stats['chunks_deduplicated']} near-duplicates stored once")
+    if 'pipeline' in stats:
+        print_pipeline_stats(stats['pipeline'])
     print(f"   Total documents: {vector_store.get_count()}")
     print(f"   Storage location: {vector_store.persist_directory}")
+    
+    if args.watch:
+        watcher = create_watcher(
+            vector_store,
+            manifest,
+            interval=args.interval,
+            debounce=args.debounce,
+            dedup=not args.no_dedup,
+            workers=args.workers
+        )
+        print(f"\n👀 Watching {KNOWLEDGE_BASE_PATH} for changes (Ctrl+C to stop)...")
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            print(f"\nStopped watching ({watcher.syncs} syncs)")
+        return
+    
     print("\nYou can now run the Streamlit app: streamlit run app.py")
 
 
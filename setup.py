@@ -102,9 +102,8 @@ This will:
     print(f"\n{'='*70}")
     print("📋 Populating ChromaDB vector database")
     print(f"{'='*70}")
-    print("⚠️  You'll be asked if you want to clear existing data")
-    print("    - Press 'y' to start fresh")
-    print("    - Press 'n' to keep existing data\n")
+    print("ℹ️  Only new or changed files are embedded on re-runs")
+    print("    - Run 'python populate_knowledge_base.py --rebuild' to start fresh\n")
     
     result = subprocess.run(f'"{python_exe}" populate_knowledge_base.py', shell=True)
     if result.returncode != 0:
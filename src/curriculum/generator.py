@@ -17,7 +17,8 @@ class CurriculumGenerator:
     def __init__(
         self,
         vector_store: CurriculumVectorStore,
-        llm_client: GeminiClient
+        llm_client: GeminiClient,
+        retriever: Optional[CurriculumRetriever] = None
     ):
         """
         Initialize curriculum generator.
@@ -25,10 +26,12 @@ class CurriculumGenerator:
         Args:
             vector_store: ChromaDB vector store
             llm_client: Gemini LLM client
+            retriever: Configured retriever (e.g. with a cross-encoder
+                       re-ranker); a default one is created if None
         """
         self.vector_store = vector_store
         self.llm_client = llm_client
-        self.retriever = CurriculumRetriever(vector_store)
+        self.retriever = retriever or CurriculumRetriever(vector_store)
     
     def generate(
         self,
@@ -54,10 +57,20 @@ class CurriculumGenerator:
             similar_curricula = self.retriever.retrieve_similar_curricula(
                 skill=request.skill,
                 level=request.level,
-                k=3
+                k=3,
+                focus_areas=request.focus_areas,
+                scenario="curriculum"
             )
             context = self.retriever.format_context_for_llm(similar_curricula)
             print(f"Retrieved {len(similar_curricula)} similar examples")
+            if self.retriever.last_rerank_latency_ms:
+                print(f"Re-ranking added {self.retriever.last_rerank_latency_ms:.1f} ms")
+            report = self.retriever.last_context_report
+            if report['trimmed'] or report['dropped']:
+                print(
+                    f"Context packed to ~{report['used_tokens']}/{report['token_budget']} tokens "
+                    f"({len(report['trimmed'])} trimmed, {len(report['dropped'])} dropped)"
+                )
         
         # Step 2: Generate prompt
         prompt = get_curriculum_generation_prompt(
@@ -73,7 +86,8 @@ class CurriculumGenerator:
         print("Generating curriculum with Gemini...")
         response = self.llm_client.generate_with_retry(
             prompt=prompt,
-            temperature=0.5  # Lower temperature for more consistent JSON
+            temperature=0.5,  # Lower temperature for more consistent JSON
+            scenario="curriculum"
         )
         
         # Step 4: Parse JSON response
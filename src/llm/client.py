@@ -2,21 +2,42 @@
 Google Gemini client for curriculum generation.
 Uses free tier: 15 requests/min, 1500 requests/day.
 """
+import asyncio
 import os
-from typing import Optional
+import time
+import weakref
+from typing import Callable, Iterator, Optional, Tuple
 from google import genai
 from dotenv import load_dotenv
 
+from src.llm.rate_limiter import RateLimiter, RateLimitExceeded, estimate_tokens, format_wait
+from src.llm.response_cache import ResponseCache, request_key
+from src.llm.semantic_cache import SemanticResponseCache, partition_key
+
 
 class GeminiClient:
     """Google Gemini LLM client wrapper."""
     
-    def __init__(self, model_name: str = "models/gemini-2.5-flash"):
+    def __init__(
+        self,
+        model_name: str = "models/gemini-2.5-flash",
+        response_cache: Optional[ResponseCache] = None,
+        semantic_cache: Optional[SemanticResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_concurrency: int = 4
+    ):
         """
         Initialize Gemini client.
         
         Args:
             model_name: Gemini model to use (default: models/gemini-2.5-flash)
+            response_cache: Cache answering repeated requests of opted-in
+                            scenarios without an API call (default: none)
+            semantic_cache: Also answer prompts similar to cached ones
+                            (default: none)
+            rate_limiter: Queues requests that would exceed the API quota
+                          instead of letting them fail (default: none)
+            max_concurrency: Async requests in flight at once per event loop
         """
         load_dotenv()
         
@@ -30,6 +51,12 @@ class GeminiClient:
         
         self.client = genai.Client(api_key=api_key)
         self.model_name = model_name
+        self.response_cache = response_cache
+        self.semantic_cache = semantic_cache
+        self.rate_limiter = rate_limiter
+        self.max_concurrency = max_concurrency
+        # asyncio primitives belong to one event loop; keep a semaphore per loop
+        self._semaphores = weakref.WeakKeyDictionary()
         
         print(f"OK Gemini client initialized: {model_name}")
         print(f"  Free tier: 15 requests/min, 1500 requests/day")
@@ -38,7 +65,10 @@ class GeminiClient:
         self,
         prompt: str,
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        scenario: Optional[str] = None,
+        on_wait: Optional[Callable[[float, str], None]] = None,
+        semantic_text: Optional[str] = None
     ) -> str:
         """
         Generate text using Gemini.
@@ -47,38 +77,40 @@ class GeminiClient:
             prompt: Input prompt
             temperature: Sampling temperature (0.0-1.0)
             max_tokens: Maximum tokens to generate
+            scenario: Calling scenario (e.g. "project_ideas"); repeated
+                      requests of scenarios opted in to the response
+                      cache are answered from it
+            on_wait: Called with (expected seconds, limiting budget) when the
+                     request is queued by the rate limiter (default: print)
+            semantic_text: The user-entered part of the prompt (see
+                           semantic_cache.user_inputs_text); the semantic
+                           cache compares only this, and is skipped without it
             
         Returns:
             Generated text
+            
+        Raises:
+            RateLimitExceeded: If the quota frees up too late to wait for
         """
+        cached, cache_key, partition = self._lookup_cache(
+            prompt, temperature, max_tokens, scenario, semantic_text
+        )
+        if cached is not None:
+            return cached
+        
+        estimated_tokens = self._acquire(prompt, on_wait)
         try:
             response = self.client.models.generate_content(
                 model=self.model_name,
                 contents=prompt,
-                config={
-                    "temperature": temperature,
-                    "max_output_tokens": max_tokens if max_tokens else 8192
-                }
+                config=self._config(temperature, max_tokens)
             )
-            return response.text
-        
         except Exception as e:
-            # Print detailed error for debugging
-            error_str = str(e)
-            print(f"ERROR Gemini API Error: {type(e).__name__}")
-            print(f"   Error details: {error_str}")
-            
-            # Provide helpful messages for common errors
-            if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                print("\n⚠️  QUOTA EXCEEDED: You've hit your API rate limit.")
-                print("   Free tier limits: 15 requests/min, 1500 requests/day")
-                print("   Wait a few minutes and try again.")
-                print("   Check quota: https://aistudio.google.com/apikey")
-            elif "404" in error_str or "not found" in error_str.lower():
-                print(f"\n⚠️  MODEL NOT FOUND: {self.model_name}")
-                print("   Try using: models/gemini-2.5-flash or models/gemini-2.5-pro")
-            
-            raise Exception(f"Gemini generation failed: {error_str}")
+            raise self._api_error(e)
+        
+        self._record_usage(getattr(response, "usage_metadata", None), estimated_tokens)
+        self._store(cache_key, partition, semantic_text, scenario, response.text)
+        return response.text
     
     def generate_with_retry(
         self,
@@ -92,16 +124,17 @@ class GeminiClient:
         Args:
             prompt: Input prompt
             max_retries: Maximum retry attempts
-            **kwargs: Additional generation parameters
+            **kwargs: Additional generation parameters (including scenario)
             
         Returns:
             Generated text
         """
-        import time
-        
         for attempt in range(max_retries):
             try:
                 return self.generate(prompt, **kwargs)
+            except RateLimitExceeded:
+                # Retrying sooner than the limiter's estimate cannot succeed
+                raise
             except Exception as e:
                 if attempt < max_retries - 1:
                     wait_time = 2 ** attempt  # Exponential backoff
@@ -112,3 +145,267 @@ class GeminiClient:
                     print(f"ERROR All {max_retries} attempts failed!")
                     print(f"   Final error: {str(e)}")
                     raise e
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        scenario: Optional[str] = None,
+        on_wait: Optional[Callable[[float, str], None]] = None,
+        max_retries: int = 3,
+        semantic_text: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Generate text using Gemini, yielding it in chunks as it is produced.
+        
+        Cached responses are yielded as one chunk. Failures before the first
+        chunk are retried with exponential backoff; once text has been
+        yielded a failure is raised, since the caller already showed it.
+        
+        Args:
+            prompt: Input prompt
+            temperature: Sampling temperature (0.0-1.0)
+            max_tokens: Maximum tokens to generate
+            scenario: Calling scenario (see generate)
+            on_wait: Called when queued by the rate limiter (see generate)
+            max_retries: Maximum attempts before the first chunk
+            semantic_text: User-entered part of the prompt (see generate)
+            
+        Yields:
+            Text chunks; joined they form the full response
+        """
+        cached, cache_key, partition = self._lookup_cache(
+            prompt, temperature, max_tokens, scenario, semantic_text
+        )
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        usage = None
+        for attempt in range(max_retries):
+            estimated_tokens = self._acquire(prompt, on_wait)
+            try:
+                for chunk in self.client.models.generate_content_stream(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=self._config(temperature, max_tokens)
+                ):
+                    # Token counts arrive with the last chunks
+                    usage = getattr(chunk, "usage_metadata", None) or usage
+                    if chunk.text:
+                        parts.append(chunk.text)
+                        yield chunk.text
+                break
+            except Exception as e:
+                error = self._api_error(e)
+                if parts or attempt == max_retries - 1:
+                    raise error
+                wait_time = 2 ** attempt  # Exponential backoff
+                print(f"WARNING Attempt {attempt + 1} failed: {str(e)[:100]}")
+                print(f"  Retrying in {wait_time}s...")
+                time.sleep(wait_time)
+        
+        self._record_usage(usage, estimated_tokens)
+        self._store(cache_key, partition, semantic_text, scenario, "".join(parts))
+    
+    async def agenerate(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        scenario: Optional[str] = None,
+        on_wait: Optional[Callable[[float, str], None]] = None,
+        semantic_text: Optional[str] = None
+    ) -> str:
+        """
+        Generate text using Gemini's async API (see generate).
+        
+        At most max_concurrency requests of this client run at once per
+        event loop. Cache lookups and rate limiter waits run in worker
+        threads, so the event loop is never blocked; on_wait is called
+        from such a thread.
+        
+        Args:
+            prompt: Input prompt
+            temperature: Sampling temperature (0.0-1.0)
+            max_tokens: Maximum tokens to generate
+            scenario: Calling scenario (see generate)
+            on_wait: Called when queued by the rate limiter (see generate)
+            semantic_text: User-entered part of the prompt (see generate)
+            
+        Returns:
+            Generated text
+        """
+        async with self._semaphore():
+            cached, cache_key, partition = await asyncio.to_thread(
+                self._lookup_cache, prompt, temperature, max_tokens, scenario, semantic_text
+            )
+            if cached is not None:
+                return cached
+            
+            estimated_tokens = await asyncio.to_thread(self._acquire, prompt, on_wait)
+            try:
+                response = await self.client.aio.models.generate_content(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=self._config(temperature, max_tokens)
+                )
+            except Exception as e:
+                raise self._api_error(e)
+        
+        await asyncio.to_thread(self._record_usage, getattr(response, "usage_metadata", None), estimated_tokens)
+        await asyncio.to_thread(self._store, cache_key, partition, semantic_text, scenario, response.text)
+        return response.text
+    
+    async def agenerate_with_retry(
+        self,
+        prompt: str,
+        max_retries: int = 3,
+        **kwargs
+    ) -> str:
+        """
+        Async generate with automatic retry on failure.
+        
+        Backoff waits with asyncio.sleep and releases its concurrency slot,
+        so other requests keep running meanwhile.
+        
+        Args:
+            prompt: Input prompt
+            max_retries: Maximum retry attempts
+            **kwargs: Additional generation parameters (including scenario)
+            
+        Returns:
+            Generated text
+        """
+        for attempt in range(max_retries):
+            try:
+                return await self.agenerate(prompt, **kwargs)
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    wait_time = 2 ** attempt  # Exponential backoff
+                    print(f"WARNING Attempt {attempt + 1} failed: {str(e)[:100]}")
+                    print(f"  Retrying in {wait_time}s...")
+                    await asyncio.sleep(wait_time)
+                else:
+                    print(f"ERROR All {max_retries} attempts failed!")
+                    print(f"   Final error: {str(e)}")
+                    raise e
+    
+    def expected_wait(self, prompt: str = "") -> float:
+        """
+        Seconds a request would currently be queued by the rate limiter.
+        
+        Args:
+            prompt: Prompt to send (only matters with a tokens-per-minute budget)
+            
+        Returns:
+            Expected wait (0.0 without a rate limiter or when a slot is free)
+        """
+        if self.rate_limiter is None:
+            return 0.0
+        return self.rate_limiter.expected_wait(tokens=estimate_tokens(prompt))
+    
+    @staticmethod
+    def _print_wait(wait: float, limit: str):
+        print(f"WARNING Gemini {limit} budget in use, request queued for ~{format_wait(wait)}")
+    
+    def _lookup_cache(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        scenario: Optional[str],
+        semantic_text: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """
+        Check the response caches for a request.
+        
+        The exact cache is keyed by the full prompt; the semantic cache
+        only compares semantic_text, if given.
+        
+        Returns:
+            (cached response or None, cache key, semantic partition); the
+            key and partition are None when the scenario is not cached
+        """
+        if self.response_cache is None or not self.response_cache.enabled_for(scenario):
+            return None, None, None
+        
+        cache_key = request_key(self.model_name, prompt, temperature, max_tokens)
+        cached = self.response_cache.get(cache_key, scenario)
+        if cached is not None:
+            return cached, cache_key, None
+        
+        partition = None
+        if semantic_text and self.semantic_cache is not None and self.semantic_cache.enabled_for(scenario):
+            partition = partition_key(scenario, self.model_name, temperature, max_tokens)
+            cached = self.semantic_cache.get(semantic_text, scenario, partition)
+        return cached, cache_key, partition
+    
+    def _store(
+        self,
+        cache_key: Optional[str],
+        partition: Optional[str],
+        semantic_text: Optional[str],
+        scenario: Optional[str],
+        text: str
+    ):
+        """Cache a fresh response (no-op for scenarios that are not cached)."""
+        if cache_key is None:
+            return
+        try:
+            self.response_cache.put(cache_key, scenario, self.model_name, text)
+            if partition is not None:
+                self.semantic_cache.put(cache_key, semantic_text, partition)
+        except Exception as e:
+            # The answer is already paid for; a cache failure must not lose it
+            print(f"WARNING Could not cache response: {e}")
+    
+    def _acquire(self, prompt: str, on_wait: Optional[Callable[[float, str], None]]) -> int:
+        """Wait for the rate limiter (if any); returns the estimated input tokens."""
+        estimated_tokens = estimate_tokens(prompt)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(tokens=estimated_tokens, on_wait=on_wait or self._print_wait)
+        return estimated_tokens
+    
+    def _record_usage(self, usage, estimated_tokens: int):
+        """Correct the rate limiter's token estimate with the reported usage."""
+        if self.rate_limiter is not None and getattr(usage, "prompt_token_count", None):
+            self.rate_limiter.record_tokens(usage.prompt_token_count - estimated_tokens)
+    
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limit of the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+    
+    @staticmethod
+    def _config(temperature: float, max_tokens: Optional[int]) -> dict:
+        return {
+            "temperature": temperature,
+            "max_output_tokens": max_tokens if max_tokens else 8192
+        }
+    
+    def _api_error(self, e: Exception) -> Exception:
+        """Print help for an API error and return the exception to raise."""
+        # Print detailed error for debugging
+        error_str = str(e)
+        print(f"ERROR Gemini API Error: {type(e).__name__}")
+        print(f"   Error details: {error_str}")
+        
+        # Provide helpful messages for common errors
+        if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
+            print("\n⚠️  QUOTA EXCEEDED: You've hit your API rate limit.")
+            print("   Free tier limits: 15 requests/min, 1500 requests/day")
+            print("   Wait a few minutes and try again.")
+            print("   Check quota: https://aistudio.google.com/apikey")
+        elif "404" in error_str or "not found" in error_str.lower():
+            print(f"\n⚠️  MODEL NOT FOUND: {self.model_name}")
+            print("   Try using: models/gemini-2.5-flash or models/gemini-2.5-pro")
+        
+        return Exception(f"Gemini generation failed: {error_str}")
@@ -0,0 +1,246 @@
+"""
+Client-side rate limiter matching the Gemini quotas.
+Requests per minute, requests per day and (optionally) input tokens per
+minute are enforced over sliding windows kept in a SQLite file, so every
+Streamlit worker process draws from the same budget. Callers over budget
+are queued until their slot comes up instead of hitting 429 errors.
+"""
+import os
+import random
+import sqlite3
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+DEFAULT_LIMITS_PATH = "./data/llm_cache/rate_limits.sqlite3"
+
+MINUTE = 60.0
+DAY = 86400.0
+
+
+class RateLimitExceeded(Exception):
+    """The next free slot is further away than the caller is willing to wait."""
+
+    def __init__(self, wait: float, limit: str):
+        self.wait = wait
+        self.limit = limit
+        super().__init__(
+            f"Gemini {limit} budget exhausted: next request possible in ~{format_wait(wait)}"
+        )
+
+
+def format_wait(seconds: float) -> str:
+    """Human-readable wait time ("45s", "12 min", "3.5 h")."""
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 5400:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+class RateLimiter:
+    """
+    Cross-process request budgets over sliding windows.
+
+    Every admitted request is logged with its timestamp and input tokens;
+    a request may start when each window still has room for it. SQLite's
+    write lock makes check-and-log atomic across processes.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_LIMITS_PATH,
+        requests_per_minute: Optional[int] = 15,
+        requests_per_day: Optional[int] = 1500,
+        tokens_per_minute: Optional[int] = None,
+        max_wait: float = 300.0
+    ):
+        """
+        Initialize limiter.
+
+        Args:
+            path: SQLite file shared by every process using the same API key
+            requests_per_minute: RPM budget (None disables it)
+            requests_per_day: RPD budget over any 24 hours (None disables it)
+            tokens_per_minute: Input TPM budget (None disables it)
+            max_wait: Callers whose slot is further away than this many
+                      seconds get RateLimitExceeded instead of waiting
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_wait = max_wait
+        # Limit name -> (budget, window seconds)
+        self.limits: Dict[str, Tuple[int, float]] = {}
+        if requests_per_minute:
+            self.limits['requests/minute'] = (requests_per_minute, MINUTE)
+        if requests_per_day:
+            self.limits['requests/day'] = (requests_per_day, DAY)
+        if tokens_per_minute:
+            self.limits['tokens/minute'] = (tokens_per_minute, MINUTE)
+        self.waits = 0
+        self.waited_seconds = 0.0
+
+        db = self._connect()
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            # request is 0 for token corrections logged by record_tokens()
+            db.execute("CREATE TABLE IF NOT EXISTS requests (ts REAL, request INTEGER, tokens INTEGER)")
+            db.execute("CREATE INDEX IF NOT EXISTS requests_ts ON requests (ts)")
+        finally:
+            db.close()
+
+    @classmethod
+    def from_env(cls) -> Optional['RateLimiter']:
+        """
+        Limiter configured by environment variables, or None if disabled.
+
+        LLM_RATE_LIMIT=0 disables it; LLM_RPM, LLM_RPD and LLM_TPM set the
+        budgets (default 15, 1500 and none, the free tier), and
+        LLM_RATE_LIMIT_MAX_WAIT the longest queueing time in seconds.
+        """
+        if os.getenv("LLM_RATE_LIMIT", "1").lower() in ("0", "false", "no"):
+            return None
+
+        tokens_per_minute = os.getenv("LLM_TPM")
+        return cls(
+            path=os.getenv("LLM_RATE_LIMIT_PATH", DEFAULT_LIMITS_PATH),
+            requests_per_minute=int(os.getenv("LLM_RPM", "15")),
+            requests_per_day=int(os.getenv("LLM_RPD", "1500")),
+            tokens_per_minute=int(tokens_per_minute) if tokens_per_minute else None,
+            max_wait=float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT", "300"))
+        )
+
+    def acquire(self, tokens: int = 0, on_wait: Optional[Callable[[float, str], None]] = None) -> float:
+        """
+        Admit one request (with its input tokens), waiting for a slot if needed.
+
+        Args:
+            tokens: Estimated input tokens (only counted with a TPM budget)
+            on_wait: Called with (expected seconds, limiting budget) once
+                     before the caller starts waiting
+
+        Returns:
+            Seconds spent queued (0.0 if admitted at once)
+
+        Raises:
+            RateLimitExceeded: If the wait would exceed max_wait
+        """
+        started = time.monotonic()
+        queued = False
+        while True:
+            wait, limit = self._admit(tokens, commit=True)
+            waited = time.monotonic() - started
+            if wait == 0.0:
+                if not queued:
+                    return 0.0
+                self.waits += 1
+                self.waited_seconds += waited
+                return waited
+            if waited + wait > self.max_wait:
+                raise RateLimitExceeded(wait, limit)
+            if on_wait is not None and not queued:
+                on_wait(wait, limit)
+            queued = True
+            # Jitter so queued processes do not all retry in the same instant
+            time.sleep(wait + random.uniform(0.0, 0.05))
+
+    def expected_wait(self, tokens: int = 0) -> float:
+        """Seconds until a request could start (0.0 if it would run at once)."""
+        return self._admit(tokens, commit=False)[0]
+
+    def record_tokens(self, extra_tokens: int):
+        """
+        Correct the token budget once the real input token count is known.
+
+        Args:
+            extra_tokens: Actual minus estimated tokens (negative refunds)
+        """
+        if 'tokens/minute' not in self.limits or not extra_tokens:
+            return
+        db = self._connect()
+        try:
+            db.execute("INSERT INTO requests VALUES (?, 0, ?)", (time.time(), int(extra_tokens)))
+        finally:
+            db.close()
+
+    def stats(self) -> Dict:
+        """Budget used in each current window plus this process's queueing totals."""
+        now = time.time()
+        db = self._connect()
+        try:
+            used = {}
+            for name, (budget, window) in self.limits.items():
+                column = 'tokens' if name == 'tokens/minute' else 'request'
+                total = db.execute(
+                    f"SELECT COALESCE(SUM({column}), 0) FROM requests WHERE ts > ?", (now - window,)
+                ).fetchone()[0]
+                used[name] = {'used': total, 'budget': budget}
+        finally:
+            db.close()
+        return {'limits': used, 'waits': self.waits, 'waited_seconds': self.waited_seconds}
+
+    def _admit(self, tokens: int, commit: bool) -> Tuple[float, Optional[str]]:
+        """
+        Check every window and, if all have room and commit is set, log the request.
+
+        Returns:
+            (0.0, None) if admitted (or admissible), else (seconds until
+            every window has room, the budget needing longest)
+        """
+        db = self._connect()
+        try:
+            # Take the write lock up front: check and log must be atomic across processes
+            db.execute("BEGIN IMMEDIATE" if commit else "BEGIN")
+            now = time.time()
+            wait, limit = 0.0, None
+            for name, (budget, window) in self.limits.items():
+                if name == 'tokens/minute':
+                    seconds = self._token_wait(db, now, budget, window, tokens)
+                else:
+                    # The budget-th most recent request must leave the window first
+                    row = db.execute(
+                        "SELECT ts FROM requests WHERE request = 1 AND ts > ? ORDER BY ts DESC LIMIT 1 OFFSET ?",
+                        (now - window, budget - 1)
+                    ).fetchone()
+                    seconds = row[0] + window - now if row else 0.0
+                if seconds > wait:
+                    wait, limit = seconds, name
+
+            if commit and wait == 0.0:
+                db.execute("INSERT INTO requests VALUES (?, 1, ?)", (now, int(tokens)))
+                db.execute("DELETE FROM requests WHERE ts < ?", (now - DAY,))
+            db.execute("COMMIT")
+            return wait, limit
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _token_wait(db: sqlite3.Connection, now: float, budget: int, window: float, tokens: int) -> float:
+        """Seconds until enough tokens have left the window for this request."""
+        rows = db.execute(
+            "SELECT ts, tokens FROM requests WHERE ts > ? ORDER BY ts", (now - window,)
+        ).fetchall()
+        # A prompt larger than the whole budget still runs once the window is empty
+        excess = sum(used for _, used in rows) + min(tokens, budget) - budget
+        if excess <= 0:
+            return 0.0
+        for ts, used in rows:
+            excess -= used
+            if excess <= 0:
+                return ts + window - now
+        return window
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; _admit manages its own transaction
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
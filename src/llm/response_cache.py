@@ -0,0 +1,184 @@
+"""
+Persistent response cache for Gemini calls.
+Identical requests (same model, prompt, temperature and max_tokens) are
+answered from a local SQLite file instead of spending API quota. Caching
+is opt-in per scenario, each with its own time-to-live; the file is kept
+under a size bound by evicting least recently used responses.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Scenarios whose responses are cached, with their time-to-live in seconds.
+# Callers pass the scenario name; anything not listed is never cached.
+# Job market answers go stale faster than course structures.
+SCENARIO_TTLS = {
+    'curriculum': 7 * DAY,
+    'course_structure': 7 * DAY,
+    'learning_outcome_mapping': 7 * DAY,
+    'industry_alignment': DAY,
+    'topic_recommendations': DAY,
+    'skill_gap_analysis': DAY,
+    'career_path_planner': DAY,
+    'project_ideas': DAY,
+    'job_opportunities': 6 * HOUR,
+}
+
+DEFAULT_CACHE_PATH = "./data/llm_cache/responses.sqlite3"
+
+
+def request_key(model: str, prompt: str, temperature: float, max_tokens: Optional[int]) -> str:
+    """Cache key of one request: (model, prompt hash, temperature, max_tokens)."""
+    prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    payload = json.dumps([model, prompt_hash, round(float(temperature), 4), max_tokens])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed LLM response cache with per-scenario TTLs and LRU eviction."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_bytes: int = 50 * 1024 * 1024,
+        max_entries: int = 5000,
+        scenario_ttls: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            path: SQLite file (shared by every process using it)
+            max_bytes: Total response size kept before evicting
+            max_entries: Number of responses kept before evicting
+            scenario_ttls: Scenario -> time-to-live in seconds (default:
+                           SCENARIO_TTLS); only these scenarios are cached
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.scenario_ttls = dict(SCENARIO_TTLS if scenario_ttls is None else scenario_ttls)
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, scenario TEXT, model TEXT, response TEXT,"
+                " size INTEGER, created_at REAL, expires_at REAL, last_access REAL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    @classmethod
+    def from_env(cls) -> Optional['ResponseCache']:
+        """
+        Cache configured by environment variables, or None if disabled.
+
+        LLM_RESPONSE_CACHE=0 disables it, LLM_CACHE_PATH moves the file,
+        LLM_CACHE_TTL_HOURS overrides every scenario's TTL and
+        LLM_CACHE_MAX_MB bounds its size.
+        """
+        if os.getenv("LLM_RESPONSE_CACHE", "1").lower() in ("0", "false", "no"):
+            return None
+
+        scenario_ttls = None
+        if os.getenv("LLM_CACHE_TTL_HOURS"):
+            ttl = float(os.getenv("LLM_CACHE_TTL_HOURS")) * HOUR
+            scenario_ttls = {scenario: ttl for scenario in SCENARIO_TTLS}
+        return cls(
+            path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+            max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "50")) * 1024 * 1024),
+            scenario_ttls=scenario_ttls
+        )
+
+    def enabled_for(self, scenario: Optional[str]) -> bool:
+        """Check whether a scenario opted in to caching."""
+        return scenario is not None and scenario in self.scenario_ttls
+
+    def get(self, key: str, scenario: str) -> Optional[str]:
+        """
+        Cached response for a request key, or None if missing or expired.
+
+        Args:
+            key: request_key() of the request
+            scenario: Scenario name (for hit/miss statistics)
+        """
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] < now:
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+
+        with self._lock:
+            counter = self._misses if row is None else self._hits
+            counter[scenario] = counter.get(scenario, 0) + 1
+        return None if row is None else row[0]
+
+    def put(self, key: str, scenario: str, model: str, response: str):
+        """Store a response under the scenario's TTL and evict if over the bounds."""
+        ttl = self.scenario_ttls.get(scenario)
+        if ttl is None or not response:
+            return
+
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, scenario, model, response, len(response.encode('utf-8')), now, now + ttl, now)
+            )
+            self._evict(db, now)
+
+    def clear(self):
+        """Remove every cached response."""
+        with self._connect() as db:
+            db.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict:
+        """Stored entries and bytes, plus per-scenario hits and misses of this process."""
+        with self._connect() as db:
+            entries, total_bytes = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        with self._lock:
+            scenarios = {
+                scenario: {'hits': self._hits.get(scenario, 0), 'misses': self._misses.get(scenario, 0)}
+                for scenario in sorted(self._hits.keys() | self._misses.keys())
+            }
+        return {'entries': entries, 'bytes': total_bytes, 'scenarios': scenarios}
+
+    def _evict(self, db: sqlite3.Connection, now: float):
+        """Drop expired responses, then least recently used ones until within bounds."""
+        db.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+        entries, total_bytes = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if entries <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        doomed = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if entries <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            doomed.append((key,))
+            entries -= 1
+            total_bytes -= size
+        db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Short-lived connection (safe across threads; SQLite locks across processes)."""
+        return sqlite3.connect(self.path, timeout=10)
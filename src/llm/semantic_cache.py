@@ -0,0 +1,243 @@
+"""
+Semantic layer over the LLM response cache.
+Requests whose form inputs differ only slightly ("Data Scientist" vs "data
+scientist role") are answered with the cached response of a previous request
+of the same scenario when the embeddings of those inputs are similar enough. Every lookup logs its
+best similarity so the per-scenario thresholds can be tuned.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from src.llm.response_cache import ResponseCache
+
+
+# Scenarios answered from similar prompts, with their cosine similarity
+# threshold. Only free-text student forms are listed: professor scenarios
+# differ in course details where a near miss is a wrong answer.
+SEMANTIC_THRESHOLDS = {
+    'career_path_planner': 0.95,
+    'job_opportunities': 0.95,
+    'skill_gap_analysis': 0.95,
+    'project_ideas': 0.95,
+}
+
+# Misses within this distance of the threshold are counted as near misses
+NEAR_MISS_MARGIN = 0.05
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase and collapse whitespace."""
+    return " ".join(prompt.lower().split())
+
+
+def prompt_numbers(normalized: str) -> str:
+    """
+    Numbers in a prompt, which must match exactly for a semantic hit.
+
+    Embeddings barely separate "6 months" from "5 years" or "12 weeks"
+    from "16 weeks", but the answers differ.
+    """
+    return " ".join(re.findall(r"\d+(?:\.\d+)?", normalized))
+
+
+def user_inputs_text(fields: Dict[str, Any]) -> str:
+    """
+    Text compared by the semantic cache: the user-entered fields of a request.
+
+    The full prompt is mostly the scenario's template, which would dominate
+    its embedding (and push the inputs past the model's truncation), so
+    different users' prompts would look alike.
+
+    Args:
+        fields: Field name -> value, as passed to the prompt builder
+
+    Returns:
+        One "name: value" line per field, in the given order
+    """
+    return "\n".join(f"{name}: {'' if value is None else value}" for name, value in fields.items())
+
+
+def partition_key(scenario: str, model: str, temperature: float, max_tokens: Optional[int]) -> str:
+    """Prompts are only compared within the same scenario and generation settings."""
+    return f"{scenario}|{model}|{round(float(temperature), 4)}|{max_tokens}"
+
+
+class SemanticResponseCache:
+    """Nearest-prompt lookup stored next to a ResponseCache (same SQLite file)."""
+
+    def __init__(
+        self,
+        response_cache: ResponseCache,
+        embedder,
+        thresholds: Optional[Dict[str, float]] = None,
+        log: bool = True
+    ):
+        """
+        Initialize semantic cache.
+
+        Args:
+            response_cache: Exact cache holding the responses (and their TTLs)
+            embedder: EmbeddingService (or anything with embed_text)
+            thresholds: Scenario -> cosine similarity threshold (default:
+                        SEMANTIC_THRESHOLDS); other scenarios are skipped
+            log: Print every lookup's similarity and the scenario's hit rate
+        """
+        self.response_cache = response_cache
+        self.embedder = embedder
+        self.thresholds = dict(SEMANTIC_THRESHOLDS if thresholds is None else thresholds)
+        self.log = log
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict] = {}
+
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS semantic_prompts ("
+                " key TEXT PRIMARY KEY, partition TEXT, numbers TEXT, embedding BLOB)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS semantic_prompts_partition ON semantic_prompts (partition)")
+
+    @classmethod
+    def from_env(
+        cls,
+        response_cache: Optional[ResponseCache],
+        embedder_factory: Callable
+    ) -> Optional['SemanticResponseCache']:
+        """
+        Semantic cache configured by environment variables, or None.
+
+        Enabled by LLM_SEMANTIC_CACHE=1 (and only with a response cache);
+        LLM_SEMANTIC_THRESHOLD overrides every scenario's threshold.
+        embedder_factory is only called when enabled, so a disabled cache
+        never loads the embedding model.
+        """
+        if response_cache is None:
+            return None
+        if os.getenv("LLM_SEMANTIC_CACHE", "").lower() not in ("1", "true", "yes"):
+            return None
+
+        thresholds = None
+        if os.getenv("LLM_SEMANTIC_THRESHOLD"):
+            threshold = float(os.getenv("LLM_SEMANTIC_THRESHOLD"))
+            thresholds = {scenario: threshold for scenario in SEMANTIC_THRESHOLDS}
+        return cls(response_cache, embedder_factory(), thresholds=thresholds)
+
+    def enabled_for(self, scenario: Optional[str]) -> bool:
+        """Check whether a scenario uses similarity lookups."""
+        return scenario in self.thresholds and self.response_cache.enabled_for(scenario)
+
+    def get(self, text: str, scenario: str, partition: str) -> Optional[str]:
+        """
+        Cached response of the most similar earlier request, if above the threshold.
+
+        Args:
+            text: User-entered fields of the request (see user_inputs_text),
+                  never the templated prompt
+            scenario: Scenario name
+            partition: partition_key() of the request; requests only match
+                       within their partition
+
+        Returns:
+            Cached response, or None
+        """
+        normalized = normalize_prompt(text)
+        query = self._embed(normalized)
+        now = time.time()
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT s.key, s.embedding, r.response FROM semantic_prompts s"
+                " JOIN responses r ON r.key = s.key"
+                " WHERE s.partition = ? AND s.numbers = ? AND r.expires_at >= ?",
+                (partition, prompt_numbers(normalized), now)
+            ).fetchall()
+
+        best_similarity, best_key, best_response = None, None, None
+        if rows:
+            matrix = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+            similarities = matrix @ query
+            best = int(np.argmax(similarities))
+            best_similarity = float(similarities[best])
+            best_key, best_response = rows[best][0], rows[best][2]
+
+        threshold = self.thresholds[scenario]
+        hit = best_similarity is not None and best_similarity >= threshold
+        if hit:
+            with self._connect() as db:
+                db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, best_key))
+        self._record(scenario, hit, best_similarity, threshold)
+        return best_response if hit else None
+
+    def put(self, key: str, text: str, partition: str):
+        """
+        Index a request's user-entered fields (see get); its response was
+        stored in the response cache under key.
+
+        Index rows whose responses were evicted or expired are dropped here.
+        """
+        normalized = normalize_prompt(text)
+        embedding = self._embed(normalized)
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO semantic_prompts VALUES (?, ?, ?, ?)",
+                (key, partition, prompt_numbers(normalized), embedding.tobytes())
+            )
+            db.execute("DELETE FROM semantic_prompts WHERE key NOT IN (SELECT key FROM responses)")
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-scenario hits, misses, hit_rate, mean_hit_similarity and near_misses."""
+        with self._lock:
+            stats = {}
+            for scenario, counts in self._stats.items():
+                lookups = counts['hits'] + counts['misses']
+                stats[scenario] = {
+                    'hits': counts['hits'],
+                    'misses': counts['misses'],
+                    'hit_rate': counts['hits'] / lookups if lookups else 0.0,
+                    'mean_hit_similarity': (
+                        counts['hit_similarity'] / counts['hits'] if counts['hits'] else None
+                    ),
+                    'near_misses': counts['near_misses'],
+                    'recent_similarities': list(counts['recent_similarities'])
+                }
+            return stats
+
+    def _record(self, scenario: str, hit: bool, similarity: Optional[float], threshold: float):
+        """Update the scenario's counters and log the lookup."""
+        with self._lock:
+            counts = self._stats.setdefault(scenario, {
+                'hits': 0, 'misses': 0, 'hit_similarity': 0.0, 'near_misses': 0,
+                'recent_similarities': deque(maxlen=100)
+            })
+            if hit:
+                counts['hits'] += 1
+                counts['hit_similarity'] += similarity
+            else:
+                counts['misses'] += 1
+                if similarity is not None and similarity >= threshold - NEAR_MISS_MARGIN:
+                    counts['near_misses'] += 1
+            if similarity is not None:
+                counts['recent_similarities'].append(round(similarity, 4))
+            lookups = counts['hits'] + counts['misses']
+            hit_rate = counts['hits'] / lookups
+
+        if self.log:
+            shown = "none" if similarity is None else f"{similarity:.3f}"
+            print(
+                f"Semantic cache {'hit' if hit else 'miss'} [{scenario}]: similarity {shown} "
+                f"(threshold {threshold:.2f}, hit rate {hit_rate:.0%} of {lookups})"
+            )
+
+    def _embed(self, normalized: str) -> np.ndarray:
+        """Unit-length float32 embedding (dot product == cosine similarity)."""
+        vector = np.asarray(self.embedder.embed_text(normalized), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.response_cache.path, timeout=10)
@@ -0,0 +1,170 @@
+"""
+BM25 inverted index for lexical retrieval.
+Complements dense embeddings on exact course codes, subject names and
+acronyms (e.g. "20CS11001", "DBMS"), which MiniLM embeddings match poorly.
+"""
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this
+to was were will with which into their these those can course courses
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens; course codes like 20CS11001 stay whole."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """In-process Okapi BM25 index with JSON persistence."""
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize index.
+
+        Args:
+            path: JSON file the index is persisted to (None = memory only)
+            k1: Term-frequency saturation
+            b: Document-length normalization
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._mtime = None
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def upsert(self, ids: List[str], texts: List[str]):
+        """Index documents, replacing any previous version with the same ID."""
+        with self._lock:
+            for doc_id, text in zip(ids, texts):
+                self._remove(doc_id)
+                terms = Counter(tokenize(text))
+                self._doc_terms[doc_id] = dict(terms)
+                self._doc_lengths[doc_id] = sum(terms.values())
+                self._total_length += self._doc_lengths[doc_id]
+                for term, tf in terms.items():
+                    self._postings.setdefault(term, {})[doc_id] = tf
+
+    def delete(self, ids: Iterable[str]):
+        """Remove documents from the index."""
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def clear(self):
+        """Remove all documents."""
+        with self._lock:
+            self._postings = {}
+            self._doc_terms = {}
+            self._doc_lengths = {}
+            self._total_length = 0
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Score documents against a query.
+
+        Args:
+            query: Free-text query
+            k: Number of results
+
+        Returns:
+            (document ID, BM25 score) pairs, best first
+        """
+        self.reload_if_changed()
+        with self._lock:
+            num_docs = len(self._doc_terms)
+            if not num_docs or k <= 0:
+                return []
+
+            avg_length = self._total_length / num_docs
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1.0 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1.0 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def save(self):
+        """Atomically write the index to its JSON file."""
+        if not self.path:
+            return
+        with self._lock:
+            payload = json.dumps(
+                {'k1': self.k1, 'b': self.b, 'documents': self._doc_terms},
+                separators=(',', ':')
+            )
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def load(self):
+        """Load the index from its JSON file (postings are rebuilt in memory)."""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        mtime = os.stat(self.path).st_mtime_ns
+
+        postings: Dict[str, Dict[str, int]] = {}
+        doc_lengths = {doc_id: sum(terms.values()) for doc_id, terms in data['documents'].items()}
+        for doc_id, terms in data['documents'].items():
+            for term, tf in terms.items():
+                postings.setdefault(term, {})[doc_id] = tf
+
+        with self._lock:
+            self.k1 = data.get('k1', self.k1)
+            self.b = data.get('b', self.b)
+            self._doc_terms = data['documents']
+            self._postings = postings
+            self._doc_lengths = doc_lengths
+            self._total_length = sum(doc_lengths.values())
+            self._mtime = mtime
+
+    def reload_if_changed(self):
+        """Pick up an index file rewritten by another process."""
+        if not self.path:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.load()
+
+    def _remove(self, doc_id: str):
+        """Drop one document (caller holds the lock)."""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._doc_lengths.pop(doc_id, 0)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
@@ -0,0 +1,305 @@
+"""
+Structure-aware chunking for curriculum documents.
+Splits markdown on headings, semester sections and course tables so each
+vector store entry covers one focused part of a program instead of a whole file.
+"""
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+# Markdown headings: "# Title", "## FIRST YEAR I – SEMESTER", ...
+HEADING_PATTERN = re.compile(r'^\s{0,3}(#{1,6})\s+(\S.*)$')
+
+# Semester markers, with or without heading hashes:
+# "FIRST YEAR I - SEMESTER", "## Semester 3 (20 Credits)", "SEMESTER - V"
+SEMESTER_PATTERN = re.compile(
+    r'^\s*(?:#{1,6}\s*)?(?:[A-Z]+\s+YEAR\s+[IV]+\s*[-–]\s*SEMESTER\b|SEMESTER\s*[-–:]?\s*(?:\d+|[IVX]+)\b)',
+    re.IGNORECASE
+)
+
+# Course syllabus headers from the AR22 documents: "20PH11003 – APPLIED PHYSICS"
+COURSE_HEADER_PATTERN = re.compile(r'^\s*(?:#{1,6}\s*)?\d{2}[A-Z]{2}\d{5}\s*[–-]\s*\S')
+
+# Markdown table rows
+TABLE_ROW_PATTERN = re.compile(r'^\s*\|')
+
+
+class MarkdownChunker:
+    """Split markdown curriculum documents into bounded, overlapping chunks."""
+
+    def __init__(
+        self,
+        max_chars: int = 1200,
+        overlap_chars: int = 150,
+        min_chars: int = 300
+    ):
+        """
+        Initialize chunker.
+
+        Args:
+            max_chars: Hard cap on chunk size (excluding overlap)
+            overlap_chars: Characters carried over from the previous chunk
+            min_chars: Sections smaller than this are merged with their neighbours
+        """
+        if max_chars <= 0:
+            raise ValueError("max_chars must be positive")
+        if overlap_chars < 0 or overlap_chars >= max_chars:
+            raise ValueError("overlap_chars must be between 0 and max_chars")
+
+        self.max_chars = max_chars
+        self.overlap_chars = overlap_chars
+        self.min_chars = min(min_chars, max_chars)
+
+    def split_sections(self, text: str) -> List[Dict]:
+        """
+        Split text into structural sections.
+
+        A new section starts at every markdown heading, semester marker and
+        course syllabus header. Markdown tables are kept together as one block.
+
+        Args:
+            text: Markdown document text
+
+        Returns:
+            List of sections with 'title', 'semester' and 'blocks' (list of strings)
+        """
+        sections = []
+        current = {'title': '', 'semester': None, 'blocks': []}
+        paragraph = []
+        table = []
+
+        def flush_paragraph():
+            if paragraph:
+                current['blocks'].append('\n'.join(paragraph))
+                paragraph.clear()
+
+        def flush_table():
+            if table:
+                current['blocks'].append('\n'.join(table))
+                table.clear()
+
+        for line in text.split('\n'):
+            if TABLE_ROW_PATTERN.match(line):
+                flush_paragraph()
+                table.append(line)
+                continue
+            flush_table()
+
+            if self._is_boundary(line):
+                flush_paragraph()
+                if current['blocks']:
+                    sections.append(current)
+
+                title = HEADING_PATTERN.sub(r'\2', line).strip()
+                semester = title if SEMESTER_PATTERN.match(line) else None
+                current = {'title': title, 'semester': semester, 'blocks': [line]}
+                continue
+
+            if not line.strip():
+                flush_paragraph()
+                continue
+
+            paragraph.append(line)
+
+        flush_paragraph()
+        flush_table()
+        if current['blocks']:
+            sections.append(current)
+
+        return sections
+
+    def chunk_text(self, text: str) -> List[Dict]:
+        """
+        Chunk text into bounded pieces that follow section boundaries.
+
+        Args:
+            text: Markdown document text
+
+        Returns:
+            List of dicts with 'content', 'section' and 'semester'
+        """
+        chunks = []
+        buffer = []
+        buffer_len = 0
+        buffer_section = None
+
+        def emit():
+            nonlocal buffer, buffer_len, buffer_section
+            if buffer:
+                chunks.append({
+                    'content': '\n\n'.join(buffer),
+                    'section': buffer_section['title'] if buffer_section else '',
+                    'semester': buffer_section['semester'] if buffer_section else None
+                })
+            buffer = []
+            buffer_len = 0
+            buffer_section = None
+
+        for section in self.split_sections(text):
+            # Start a fresh chunk at a section boundary once the buffer is big enough
+            if buffer_len >= self.min_chars:
+                emit()
+
+            for block in section['blocks']:
+                for piece in self._split_block(block):
+                    added = len(piece) + (2 if buffer else 0)
+                    if buffer and buffer_len + added > self.max_chars:
+                        emit()
+                        added = len(piece)
+                    if buffer_section is None:
+                        buffer_section = section
+                    buffer.append(piece)
+                    buffer_len += added
+
+        emit()
+        return self._apply_overlap(chunks)
+
+    def chunk_document(
+        self,
+        content: str,
+        metadata: Optional[Dict] = None,
+        doc_id: str = "doc"
+    ) -> List[Dict]:
+        """
+        Chunk a document and attach parent-document metadata to each chunk.
+
+        Args:
+            content: Full document text
+            metadata: Metadata of the parent document
+            doc_id: Identifier of the parent document
+
+        Returns:
+            List of chunks with 'id', 'content' and 'metadata'
+        """
+        return self._build_chunks(self.chunk_text(content), metadata or {}, doc_id, 0)
+
+    def chunk_stream(
+        self,
+        windows: Iterable[str],
+        metadata: Optional[Dict] = None,
+        doc_id: str = "doc"
+    ) -> Iterator[Dict]:
+        """
+        Chunk a document arriving as consecutive text windows.
+
+        Used for documents too large to hold whole (see src/rag/loaders.py).
+        Chunk indexes run on across windows, a window that starts mid-section
+        inherits the previous section and semester, and overlap is carried
+        over window boundaries.
+
+        Args:
+            windows: Consecutive pieces of the document text
+            metadata: Metadata of the parent document
+            doc_id: Identifier of the parent document
+
+        Yields:
+            Chunks with 'id', 'content' and 'metadata'
+        """
+        metadata = metadata or {}
+        index = 0
+        previous = None
+        for window in windows:
+            pieces = self.chunk_text(window)
+            if not pieces:
+                continue
+            if previous is not None:
+                for piece in pieces:
+                    if piece['section']:
+                        break
+                    piece['section'] = previous['section']
+                    piece['semester'] = piece['semester'] or previous['semester']
+                pieces = self._apply_overlap([previous] + pieces)[1:]
+            previous = pieces[-1]
+
+            yield from self._build_chunks(pieces, metadata, doc_id, index)
+            index += len(pieces)
+
+    def _build_chunks(self, pieces: List[Dict], metadata: Dict, doc_id: str, start: int) -> List[Dict]:
+        """Chunks with ids and parent metadata for pieces numbered from start."""
+        chunks = []
+        for i, piece in enumerate(pieces, start):
+            chunk_metadata = {
+                **metadata,
+                'parent_id': doc_id,
+                'chunk_index': i,
+                'section': piece['section'][:200]
+            }
+            if piece['semester']:
+                chunk_metadata['semester'] = piece['semester'][:100]
+
+            chunks.append({
+                'id': f"{doc_id}::chunk_{i:04d}",
+                'content': piece['content'],
+                'metadata': chunk_metadata
+            })
+
+        return chunks
+
+    def _is_boundary(self, line: str) -> bool:
+        """Check whether a line starts a new structural section."""
+        return bool(
+            HEADING_PATTERN.match(line)
+            or SEMESTER_PATTERN.match(line)
+            or COURSE_HEADER_PATTERN.match(line)
+        )
+
+    def _split_block(self, block: str) -> List[str]:
+        """
+        Split a block that exceeds max_chars.
+
+        Tables are split by rows and keep their header rows in every piece.
+        Other blocks are split by lines, and overlong lines by characters.
+        """
+        if len(block) <= self.max_chars:
+            return [block]
+
+        lines = block.split('\n')
+        header = []
+        if TABLE_ROW_PATTERN.match(lines[0]) and len(lines) > 2 and set(lines[1].strip()) <= set('|-: '):
+            header = lines[:2]
+            lines = lines[2:]
+        header_len = sum(len(h) + 1 for h in header)
+
+        pieces = []
+        current = list(header)
+        current_len = header_len
+        for line in lines:
+            while len(line) + header_len > self.max_chars:
+                # Overlong single line: hard split
+                room = max(self.max_chars - header_len, 1)
+                if len(current) > len(header):
+                    pieces.append('\n'.join(current))
+                pieces.append('\n'.join(header + [line[:room]]))
+                current = list(header)
+                current_len = header_len
+                line = line[room:]
+            if current_len + len(line) + 1 > self.max_chars and len(current) > len(header):
+                pieces.append('\n'.join(current))
+                current = list(header)
+                current_len = header_len
+            current.append(line)
+            current_len += len(line) + 1
+
+        if len(current) > len(header):
+            pieces.append('\n'.join(current))
+
+        return pieces
+
+    def _apply_overlap(self, chunks: List[Dict]) -> List[Dict]:
+        """Prefix each chunk with the tail of the previous one, snapped to a line or word start."""
+        if not self.overlap_chars or len(chunks) < 2:
+            return chunks
+
+        previous = chunks[0]['content']
+        for chunk in chunks[1:]:
+            tail = previous[-self.overlap_chars:]
+            cut = tail.find('\n')
+            if cut < 0:
+                cut = tail.find(' ')
+            if 0 <= cut < len(tail) - 1:
+                tail = tail[cut + 1:]
+            previous = chunk['content']
+            if tail.strip():
+                chunk['content'] = f"{tail.strip()}\n\n{chunk['content']}"
+
+        return chunks
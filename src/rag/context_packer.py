@@ -0,0 +1,147 @@
+"""
+Token-budgeted packing of retrieved documents into LLM context.
+Whole documents are kept while they fit; larger ones are trimmed at
+section boundaries, and everything left out is reported.
+"""
+import math
+from typing import Dict, List, Optional, Tuple
+from src.rag.chunker import MarkdownChunker
+
+
+# Rough characters-per-token ratio of Gemini/SentencePiece tokenizers on
+# English markdown; tables and course codes tokenize a little denser
+CHARS_PER_TOKEN = 4.0
+TOKENS_PER_WORD = 1.3
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (no tokenizer call).
+
+    Takes the larger of a character-based and a word-based estimate, so
+    both prose and dense tables/course codes are not undercounted.
+    """
+    if not text:
+        return 0
+    return max(
+        math.ceil(len(text) / CHARS_PER_TOKEN),
+        math.ceil(len(text.split()) * TOKENS_PER_WORD)
+    )
+
+
+class ContextPacker:
+    """Greedy token-budget packer for retrieved curriculum examples."""
+
+    HEADER = "Here are some similar curriculum examples for reference:\n"
+
+    def __init__(self, token_budget: int = 8000, chunker: Optional[MarkdownChunker] = None):
+        """
+        Initialize packer.
+
+        Args:
+            token_budget: Maximum estimated tokens of the packed context
+            chunker: Chunker used to find section boundaries
+        """
+        if token_budget <= 0:
+            raise ValueError("token_budget must be positive")
+
+        self.token_budget = token_budget
+        self.chunker = chunker or MarkdownChunker()
+
+    def pack(self, retrieved_docs: List[Dict], token_budget: Optional[int] = None) -> Tuple[str, Dict]:
+        """
+        Pack documents into a context string within the token budget.
+
+        Documents are taken best-first in the order given (the retriever's
+        ranking). A document that does not fit whole is trimmed to its
+        leading sections that do; one whose first section does not fit is
+        dropped, and smaller lower-ranked documents may still fill the rest.
+
+        Args:
+            retrieved_docs: Retrieved documents, best first
+            token_budget: Override of the packer's budget for this call
+
+        Returns:
+            Tuple of (context string, report with 'token_budget',
+            'used_tokens', 'included', 'trimmed' and 'dropped')
+        """
+        budget = token_budget or self.token_budget
+        report = {
+            'token_budget': budget,
+            'used_tokens': 0,
+            'included': [],
+            'trimmed': [],
+            'dropped': []
+        }
+
+        if not retrieved_docs:
+            return "No similar curriculum examples found.", report
+
+        parts = [self.HEADER]
+        used = estimate_tokens(self.HEADER)
+
+        for doc in retrieved_docs:
+            doc_id = doc.get('id') or doc.get('metadata', {}).get('filename', 'unknown')
+            header = self._example_header(len(report['included']) + 1, doc.get('metadata', {}), doc.get('shared_by'))
+            content = doc.get('content', '')
+            header_tokens = estimate_tokens(header)
+            content_tokens = estimate_tokens(content)
+
+            if used + header_tokens + content_tokens <= budget:
+                parts.append(f"{header}\n\n{content}\n")
+                used += header_tokens + content_tokens
+                report['included'].append(doc_id)
+                continue
+
+            kept, kept_tokens, dropped_count = self._trim_to_sections(content, budget - used - header_tokens)
+            if not kept:
+                report['dropped'].append({'id': doc_id, 'tokens': content_tokens})
+                continue
+
+            note = f"[... {dropped_count} more section(s) omitted to fit the context budget]"
+            parts.append(f"{header}\n\n{kept}\n{note}\n")
+            used += header_tokens + kept_tokens + estimate_tokens(note)
+            report['included'].append(doc_id)
+            report['trimmed'].append({
+                'id': doc_id,
+                'sections_dropped': dropped_count,
+                'tokens_dropped': content_tokens - kept_tokens
+            })
+
+        report['used_tokens'] = used
+        if not report['included']:
+            return "No similar curriculum examples found.", report
+        return "\n".join(parts), report
+
+    def _example_header(self, number: int, metadata: Dict, shared_by: Optional[List[str]] = None) -> str:
+        """Header lines describing one example."""
+        lines = [f"\n--- Example {number} ---"]
+        if metadata:
+            lines.append(f"Level: {metadata.get('level', 'N/A')}")
+            lines.append(f"Subject: {metadata.get('subject', 'N/A')}")
+            if metadata.get('section'):
+                lines.append(f"Source: {metadata.get('filename', 'N/A')} - {metadata['section']}")
+        if shared_by:
+            lines.append(f"Also in: {', '.join(shared_by)}")
+        return "\n".join(lines)
+
+    def _trim_to_sections(self, content: str, available: int) -> Tuple[str, int, int]:
+        """
+        Leading sections of content that fit in the available tokens.
+
+        Returns:
+            Tuple of (kept text, its estimated tokens, number of sections dropped)
+        """
+        # Leave room for the omission note
+        available -= 16
+        sections = ["\n\n".join(section['blocks']) for section in self.chunker.split_sections(content)]
+        kept = []
+        kept_tokens = 0
+        for section in sections:
+            tokens = estimate_tokens(section) + 1
+            if kept_tokens + tokens > available:
+                break
+            kept.append(section)
+            kept_tokens += tokens
+
+        return "\n\n".join(kept), kept_tokens, len(sections) - len(kept)
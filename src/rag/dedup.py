@@ -0,0 +1,276 @@
+"""
+Near-duplicate chunk detection with MinHash and locality-sensitive hashing.
+The AR22 department curricula share large identical or near-identical
+blocks (humanities and mandatory courses, regulations); those are stored
+once, and the chunks that repeat them are recorded as references.
+"""
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+MERSENNE_PRIME = (1 << 31) - 1
+DEDUP_INDEX_VERSION = 1
+
+
+class MinHasher:
+    """MinHash signatures over word shingles."""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        """
+        Initialize hasher.
+
+        Args:
+            num_perm: Signature length (number of hash permutations)
+            shingle_size: Words per shingle
+            seed: Seed of the permutation parameters (fixed for persistence)
+        """
+        rng = np.random.RandomState(seed)
+        # (a * h + b) mod p over the field of p = 2**31 - 1; with a, b, h < p
+        # the product stays below 2**62, so uint64 arithmetic is exact
+        self.a = rng.randint(1, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (uint64 array of length num_perm) of a text."""
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        size = min(self.shingle_size, len(tokens)) or 1
+        shingles = {' '.join(tokens[i:i + size]) for i in range(max(len(tokens) - size + 1, 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) % MERSENNE_PRIME for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        return ((np.outer(self.a, hashes) + self.b[:, None]) % np.uint64(MERSENNE_PRIME)).min(axis=1)
+
+
+def estimated_similarity(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float(np.mean(signature_a == signature_b))
+
+
+class NearDuplicateIndex:
+    """
+    LSH index of stored (canonical) chunks plus the duplicates referencing them.
+
+    Persisted as JSON next to the vector data.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = 0.85,
+        num_perm: int = 64,
+        bands: int = 16
+    ):
+        """
+        Initialize index.
+
+        Args:
+            path: JSON file the index is persisted to (None = memory only)
+            threshold: Minimum estimated Jaccard similarity of a near-duplicate
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm / bands rows each); more bands find
+                   candidates at lower similarity, verified against threshold
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.path = path
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm)
+        self._lock = threading.Lock()
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: Dict[tuple, set] = {}
+        # Duplicate chunk id -> {'canonical': chunk id, 'source': source path}
+        self._duplicates: Dict[str, Dict] = {}
+        self._mtime = None
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.hasher.signature(text)
+
+    def find(self, signature: np.ndarray, exclude: Iterable[str] = ()) -> Optional[str]:
+        """
+        Most similar stored chunk at or above the threshold.
+
+        Args:
+            signature: MinHash signature of the new chunk
+            exclude: Chunk ids that must not match (e.g. the chunk itself)
+
+        Returns:
+            Canonical chunk id, or None if the chunk is not a near-duplicate
+        """
+        exclude = set(exclude)
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates |= self._buckets.get(key, set())
+            candidates -= exclude
+
+            best_id, best_score = None, self.threshold
+            for chunk_id in sorted(candidates):
+                score = estimated_similarity(signature, self._signatures[chunk_id])
+                if score >= best_score:
+                    best_id, best_score = chunk_id, score
+            return best_id
+
+    def add(self, chunk_id: str, signature: np.ndarray):
+        """Index a stored chunk (replacing its previous signature)."""
+        with self._lock:
+            self._remove_signature(chunk_id)
+            self._signatures[chunk_id] = signature
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, set()).add(chunk_id)
+
+    def remove(self, chunk_id: str) -> List[str]:
+        """
+        Forget a chunk, stored or duplicate.
+
+        Returns:
+            Sources whose duplicates referenced the chunk (they lost their
+            stored copy and must be re-ingested)
+        """
+        with self._lock:
+            self._duplicates.pop(chunk_id, None)
+            if not self._remove_signature(chunk_id):
+                return []
+            orphans = [dup_id for dup_id, ref in self._duplicates.items() if ref['canonical'] == chunk_id]
+            sources = {self._duplicates.pop(dup_id)['source'] for dup_id in orphans}
+            return sorted(sources)
+
+    def remove_source(self, source: str):
+        """Forget the duplicate records of one source file."""
+        with self._lock:
+            for dup_id in [d for d, ref in self._duplicates.items() if ref['source'] == source]:
+                del self._duplicates[dup_id]
+
+    def is_stored(self, chunk_id: str) -> bool:
+        """Check whether a chunk is indexed as a stored (canonical) chunk."""
+        return chunk_id in self._signatures
+
+    def add_duplicate(self, chunk_id: str, canonical_id: str, source: str):
+        """Record that chunk_id (from source) is stored as canonical_id."""
+        with self._lock:
+            self._remove_signature(chunk_id)
+            self._duplicates[chunk_id] = {'canonical': canonical_id, 'source': source}
+
+    def references(self, canonical_id: str) -> List[Dict]:
+        """Duplicates ({'id', 'source'}) that are stored as canonical_id."""
+        self.reload_if_changed()
+        with self._lock:
+            return [
+                {'id': dup_id, 'source': ref['source']}
+                for dup_id, ref in self._duplicates.items()
+                if ref['canonical'] == canonical_id
+            ]
+
+    def shared_sources(self) -> Dict[str, List[str]]:
+        """Canonical chunk id -> sorted sources of the duplicates referencing it."""
+        shared: Dict[str, set] = {}
+        with self._lock:
+            for ref in self._duplicates.values():
+                shared.setdefault(ref['canonical'], set()).add(ref['source'])
+        return {chunk_id: sorted(sources) for chunk_id, sources in shared.items()}
+
+    def stats(self) -> Dict:
+        """Counts of stored chunks and duplicates."""
+        with self._lock:
+            return {'stored_chunks': len(self._signatures), 'duplicate_chunks': len(self._duplicates)}
+
+    def clear(self):
+        """Remove everything."""
+        with self._lock:
+            self._signatures = {}
+            self._buckets = {}
+            self._duplicates = {}
+
+    def to_dict(self) -> Dict:
+        """Serializable form (also embedded in knowledge base snapshots)."""
+        with self._lock:
+            return {
+                'version': DEDUP_INDEX_VERSION,
+                'params': {
+                    'threshold': self.threshold,
+                    'num_perm': self.hasher.num_perm,
+                    'bands': self.bands,
+                    'shingle_size': self.hasher.shingle_size
+                },
+                'signatures': {chunk_id: sig.tolist() for chunk_id, sig in self._signatures.items()},
+                'duplicates': dict(self._duplicates)
+            }
+
+    def from_dict(self, data: Dict):
+        """Load the serializable form; ignored if the MinHash parameters differ."""
+        params = data.get('params', {})
+        if data.get('version') != DEDUP_INDEX_VERSION or params.get('num_perm') != self.hasher.num_perm \
+                or params.get('shingle_size') != self.hasher.shingle_size:
+            print("WARNING Ignoring near-duplicate index built with different parameters")
+            return
+        self.clear()
+        for chunk_id, signature in data.get('signatures', {}).items():
+            self.add(chunk_id, np.array(signature, dtype=np.uint64))
+        with self._lock:
+            self._duplicates = dict(data.get('duplicates', {}))
+
+    def save(self):
+        """Atomically write the index to its JSON file."""
+        if not self.path:
+            return
+        payload = json.dumps(self.to_dict(), separators=(',', ':'))
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def load(self):
+        """Load the index from its JSON file."""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self._mtime = os.stat(self.path).st_mtime_ns
+        self.from_dict(data)
+
+    def reload_if_changed(self):
+        """Pick up an index file rewritten by another process (e.g. ingestion)."""
+        if not self.path:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.load()
+
+    def _band_keys(self, signature: np.ndarray):
+        """LSH bucket keys: one per band of `rows` signature values."""
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _remove_signature(self, chunk_id: str) -> bool:
+        """Drop a stored chunk's signature (caller holds the lock)."""
+        signature = self._signatures.pop(chunk_id, None)
+        if signature is None:
+            return False
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(chunk_id)
+                if not bucket:
+                    del self._buckets[key]
+        return True
@@ -0,0 +1,156 @@
+"""
+Persistent on-disk embedding cache.
+Embeddings are stored in a memory-mapped float32 matrix per model, with a
+compact index of 16-byte text digests (one per matrix row).
+"""
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process locking only
+    fcntl = None
+
+
+DIGEST_SIZE = 16
+
+
+def text_digest(text: str) -> bytes:
+    """Compact content hash used as cache key."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=DIGEST_SIZE).digest()
+
+
+class EmbeddingCache:
+    """Append-only (model name, text hash) -> embedding cache."""
+
+    def __init__(self, cache_dir: str, model_name: str, dimension: int):
+        """
+        Initialize cache.
+
+        Args:
+            cache_dir: Directory holding cache files
+            model_name: Embedding model (and options) the vectors belong to
+            dimension: Embedding dimension
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+
+        self.dimension = dimension
+        self.matrix_path = os.path.join(cache_dir, f"{safe_name}.f32")
+        self.keys_path = os.path.join(cache_dir, f"{safe_name}.keys")
+        self.lock_path = os.path.join(cache_dir, f"{safe_name}.lock")
+
+        self._lock = threading.Lock()
+        self._index: Dict[bytes, int] = {}
+        self._keys_size = 0
+        self._matrix: Optional[np.memmap] = None
+        self._refresh()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get_many(self, texts: List[str]) -> Tuple[np.ndarray, List[int]]:
+        """
+        Look up embeddings for texts.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            Tuple of (float32 array of shape (len(texts), dimension) with
+            cached rows filled in, indices of texts that were not cached)
+        """
+        with self._lock:
+            if os.path.exists(self.keys_path) and os.path.getsize(self.keys_path) != self._keys_size:
+                self._refresh()
+
+            result = np.zeros((len(texts), self.dimension), dtype=np.float32)
+            missing = []
+            rows = []
+            positions = []
+            for i, text in enumerate(texts):
+                row = self._index.get(text_digest(text))
+                if row is None:
+                    missing.append(i)
+                else:
+                    rows.append(row)
+                    positions.append(i)
+
+            if rows:
+                result[positions] = self._matrix[rows]
+
+        return result, missing
+
+    def put_many(self, texts: List[str], embeddings: np.ndarray):
+        """
+        Store embeddings for texts that are not cached yet.
+
+        Args:
+            texts: Input texts
+            embeddings: Float32 array of shape (len(texts), dimension)
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+        with self._lock, open(self.lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Pick up rows appended by other processes before appending ours
+                self._refresh()
+
+                digests = []
+                new_rows = []
+                seen = set()
+                for i, text in enumerate(texts):
+                    digest = text_digest(text)
+                    if digest in self._index or digest in seen:
+                        continue
+                    seen.add(digest)
+                    digests.append(digest)
+                    new_rows.append(i)
+
+                if not digests:
+                    return
+
+                # Drop rows left behind by an interrupted write so rows stay aligned with keys
+                rows = len(self._index)
+                self._matrix = None
+                for path, size in ((self.matrix_path, rows * self.dimension * 4), (self.keys_path, rows * DIGEST_SIZE)):
+                    if os.path.exists(path) and os.path.getsize(path) > size:
+                        os.truncate(path, size)
+
+                # Matrix first, then keys: a crash in between leaves unused rows only
+                with open(self.matrix_path, 'ab') as f:
+                    f.write(embeddings[new_rows].tobytes())
+                with open(self.keys_path, 'ab') as f:
+                    f.write(b''.join(digests))
+
+                self._refresh()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """Reload the key index and re-map the matrix file."""
+        keys = b''
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, 'rb') as f:
+                keys = f.read()
+        self._keys_size = len(keys)
+
+        row_bytes = self.dimension * 4
+        matrix_rows = os.path.getsize(self.matrix_path) // row_bytes if os.path.exists(self.matrix_path) else 0
+        rows = min(len(keys) // DIGEST_SIZE, matrix_rows)
+
+        self._index = {
+            keys[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE]: i
+            for i in range(rows)
+        }
+        self._matrix = (
+            np.memmap(self.matrix_path, dtype=np.float32, mode='r', shape=(rows, self.dimension))
+            if rows else None
+        )
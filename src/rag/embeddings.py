@@ -2,15 +2,24 @@
 Sentence Transformers embedding service for RAG.
 Uses free, local embeddings - no API calls required.
 """
-from typing import List
+from typing import List, Optional
 from sentence_transformers import SentenceTransformer
 import numpy as np
+from src.rag.embedding_cache import EmbeddingCache
 
 
 class EmbeddingService:
     """Generate embeddings using Sentence Transformers (free, local)."""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        batch_size: int = 64,
+        device: Optional[str] = None,
+        num_threads: Optional[int] = None,
+        normalize: bool = True,
+        cache_dir: Optional[str] = "./data/embedding_cache"
+    ):
         """
         Initialize embedding model.
         
@@ -19,36 +28,91 @@ class EmbeddingService:
                        - 384 dimensions
                        - Fast inference
                        - Good quality for RAG
+            batch_size: Texts encoded per forward pass
+            device: Torch device ("cpu", "cuda", ...); auto-detected if None
+            num_threads: CPU threads for torch (library default if None)
+            normalize: L2-normalize embeddings (dot product == cosine similarity)
+            cache_dir: Directory for the persistent embedding cache (None disables it)
         """
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
+        
         print(f"Loading embedding model: {model_name}...")
-        self.model = SentenceTransformer(model_name)
+        self.model = SentenceTransformer(model_name, device=device)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.normalize = normalize
         print(f"Model loaded successfully (dimension: {self.model.get_sentence_embedding_dimension()})")
+        
+        self.cache = None
+        if cache_dir:
+            cache_name = model_name if normalize else f"{model_name}-unnormalized"
+            self.cache = EmbeddingCache(cache_dir, cache_name, self.get_dimension())
+            print(f"Embedding cache: {cache_dir} ({len(self.cache)} cached vectors)")
     
-    def embed_text(self, text: str) -> List[float]:
+    def embed_text(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text.
         
         Args:
             text: Input text
-            
+        
         Returns:
-            Embedding vector as list of floats
+            Embedding vector as float32 array of shape (dimension,)
         """
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+        return self.embed_batch([text])[0]
     
-    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+    def embed_batch(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+        show_progress_bar: bool = False
+    ) -> np.ndarray:
         """
         Generate embeddings for multiple texts (more efficient).
         
+        Texts already in the embedding cache are not re-encoded.
+        
         Args:
             texts: List of input texts
-            
+            batch_size: Override the service's batch size
+            show_progress_bar: Show encoding progress
+        
         Returns:
-            List of embedding vectors
+            Float32 array of shape (len(texts), dimension)
         """
-        embeddings = self.model.encode(texts, convert_to_numpy=True, show_progress_bar=True)
-        return embeddings.tolist()
+        if not texts:
+            return np.zeros((0, self.get_dimension()), dtype=np.float32)
+        
+        if self.cache is None:
+            return self._encode(texts, batch_size, show_progress_bar)
+        
+        embeddings, missing = self.cache.get_many(texts)
+        if missing:
+            # Encode each distinct missing text once
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            computed = self._encode(unique_texts, batch_size, show_progress_bar)
+            position = {text: i for i, text in enumerate(unique_texts)}
+            embeddings[missing] = computed[[position[texts[i]] for i in missing]]
+            self.cache.put_many(unique_texts, computed)
+        return embeddings
+    
+    def _encode(
+        self,
+        texts: List[str],
+        batch_size: Optional[int],
+        show_progress_bar: bool
+    ) -> np.ndarray:
+        """Run the model on texts."""
+        embeddings = self.model.encode(
+            texts,
+            batch_size=batch_size or self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize,
+            show_progress_bar=show_progress_bar
+        )
+        return np.asarray(embeddings, dtype=np.float32)
     
     def get_dimension(self) -> int:
         """Get embedding dimension."""
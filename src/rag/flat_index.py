@@ -0,0 +1,589 @@
+"""
+In-process exact vector index backed by NumPy.
+Keeps normalized float32 embeddings in one contiguous, memory-mapped matrix
+and answers top-k queries with a matrix product plus argpartition.
+Meant for small knowledge bases (a few thousand chunks), where it beats
+Chroma's client, SQLite layer and HNSW index on both latency and startup.
+Optionally searches a float16 or int8 scalar-quantized copy held in memory
+and re-scores the shortlist exactly against the float32 file on disk.
+Writers, also in other processes, are serialized by a file lock.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within one process
+    fcntl = None
+
+
+RECORDS_FILENAME = "records.json"
+LOCK_FILENAME = "write.lock"
+# Attempts to load records whose embedding file a concurrent writer just replaced
+LOAD_ATTEMPTS = 5
+QUANTIZATION_TYPES = ("none", "float16", "int8")
+
+# Rows converted to float32 at a time when scoring a quantized matrix
+SCORE_BLOCK_ROWS = 8192
+
+
+def quantize(matrix: np.ndarray, kind: str):
+    """
+    Scalar-quantize an embedding matrix.
+
+    Args:
+        matrix: Float32 matrix of shape (rows, dimension)
+        kind: "float16" or "int8"
+
+    Returns:
+        Tuple of (codes, per-dimension scales or None); int8 codes are
+        symmetric per dimension, so code * scale approximates the value
+    """
+    if kind == "float16":
+        return np.asarray(matrix, dtype=np.float16), None
+    if kind == "int8":
+        matrix = np.asarray(matrix, dtype=np.float32)
+        scales = np.abs(matrix).max(axis=0) / 127.0 if len(matrix) else np.zeros(matrix.shape[1], dtype=np.float32)
+        scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+        codes = np.clip(np.rint(matrix / scales), -127, 127).astype(np.int8)
+        return codes, scales
+    raise ValueError(f"Unknown quantization: {kind} (expected one of {QUANTIZATION_TYPES})")
+
+
+def _compare(column: np.ndarray, op: str, value) -> np.ndarray:
+    """Evaluate one Chroma-style comparison on a metadata column."""
+    if op == '$eq':
+        return np.fromiter((v == value for v in column), dtype=bool, count=len(column))
+    if op == '$ne':
+        return np.fromiter((v != value for v in column), dtype=bool, count=len(column))
+    if op in ('$in', '$nin'):
+        values = set(value)
+        mask = np.fromiter((v in values for v in column), dtype=bool, count=len(column))
+        return mask if op == '$in' else ~mask
+    if op in ('$gt', '$gte', '$lt', '$lte'):
+        compare = {
+            '$gt': lambda v: v > value,
+            '$gte': lambda v: v >= value,
+            '$lt': lambda v: v < value,
+            '$lte': lambda v: v <= value,
+        }[op]
+        return np.fromiter(
+            (v is not None and compare(v) for v in column),
+            dtype=bool,
+            count=len(column)
+        )
+    raise ValueError(f"Unsupported metadata filter operator: {op}")
+
+
+class _IndexState:
+    """Immutable snapshot of the index; writers swap in a new one."""
+
+    def __init__(self, ids: List[str], documents: List[str], metadatas: List[Dict], matrix: np.ndarray):
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.matrix = matrix
+        self.id_to_row = {doc_id: row for row, doc_id in enumerate(ids)}
+        self._columns: Dict[str, np.ndarray] = {}
+        self._quantized = {}
+
+    def quantized(self, kind: str):
+        """Quantized copy of the matrix (built on first use per state)."""
+        if kind not in self._quantized:
+            self._quantized[kind] = quantize(self.matrix, kind)
+        return self._quantized[kind]
+
+    def column(self, field: str) -> np.ndarray:
+        """Metadata values of one field for every row (cached)."""
+        column = self._columns.get(field)
+        if column is None:
+            column = np.empty(len(self.metadatas), dtype=object)
+            column[:] = [metadata.get(field) for metadata in self.metadatas]
+            self._columns[field] = column
+        return column
+
+    def mask(self, where: Optional[Dict]) -> Optional[np.ndarray]:
+        """Boolean row mask for a Chroma-style where filter (None = all rows)."""
+        if not where:
+            return None
+
+        mask = np.ones(len(self.ids), dtype=bool)
+        for key, condition in where.items():
+            if key == '$and':
+                for sub in condition:
+                    mask &= self.mask(sub)
+            elif key == '$or':
+                any_mask = np.zeros(len(self.ids), dtype=bool)
+                for sub in condition:
+                    any_mask |= self.mask(sub)
+                mask &= any_mask
+            elif isinstance(condition, dict):
+                for op, value in condition.items():
+                    mask &= _compare(self.column(key), op, value)
+            else:
+                mask &= _compare(self.column(key), '$eq', condition)
+        return mask
+
+
+class _PendingWrites:
+    """Mutable working copy of an index state that writes are applied to before a commit."""
+
+    def __init__(self, state: _IndexState, dimension: Optional[int]):
+        self.ids = list(state.ids)
+        self.documents = list(state.documents)
+        self.metadatas = list(state.metadatas)
+        self.id_to_row = dict(state.id_to_row)
+        # Existing rows are copied once; appended rows are stacked at commit time
+        self.matrix = np.array(state.matrix, dtype=np.float32).reshape(len(state.ids), dimension or 0)
+        self.new_rows: List[np.ndarray] = []
+        self.deleted = set()
+        self.changed = False
+
+    def write(self, ids, documents, embeddings: np.ndarray, metadatas, overwrite: bool):
+        """Add or overwrite rows (existing IDs are skipped unless overwrite)."""
+        written = set()
+        for i, doc_id in enumerate(ids):
+            row = self.id_to_row.get(doc_id)
+            if row is None:
+                self.id_to_row[doc_id] = len(self.ids)
+                self.ids.append(doc_id)
+                self.documents.append(documents[i])
+                self.metadatas.append(metadatas[i])
+                self.new_rows.append(embeddings[i])
+            elif overwrite or doc_id in written:
+                # Duplicate ID within one call: last write wins
+                if row < len(self.matrix):
+                    self.matrix[row] = embeddings[i]
+                else:
+                    self.new_rows[row - len(self.matrix)] = embeddings[i]
+                self.documents[row] = documents[i]
+                self.metadatas[row] = metadatas[i]
+            else:
+                print(f"WARNING Skipping existing document ID: {doc_id}")
+                continue
+            written.add(doc_id)
+            self.changed = True
+
+    def delete(self, ids):
+        """Drop rows by ID (compacted at commit time)."""
+        for doc_id in ids:
+            row = self.id_to_row.pop(doc_id, None)
+            if row is not None:
+                self.deleted.add(row)
+                self.changed = True
+
+    def clear(self, dimension: Optional[int]):
+        """Drop every row."""
+        self.__init__(_IndexState([], [], [], np.zeros((0, dimension or 0), dtype=np.float32)), dimension)
+        self.changed = True
+
+    def result(self):
+        """(ids, documents, metadatas, matrix) to commit."""
+        matrix = self.matrix
+        if self.new_rows:
+            new_rows = np.vstack(self.new_rows)
+            matrix = np.vstack([matrix, new_rows]) if len(matrix) else new_rows
+        if not self.deleted:
+            return self.ids, self.documents, self.metadatas, matrix
+        keep = [row for row in range(len(self.ids)) if row not in self.deleted]
+        return (
+            [self.ids[row] for row in keep],
+            [self.documents[row] for row in keep],
+            [self.metadatas[row] for row in keep],
+            matrix[keep]
+        )
+
+
+class FlatIndexBackend:
+    """Exact cosine-similarity search over a memory-mapped float32 matrix."""
+
+    name = "flat"
+
+    def __init__(
+        self,
+        persist_directory: str,
+        dimension: Optional[int] = None,
+        quantization: str = "none",
+        rescore: bool = True,
+        rescore_factor: int = 4
+    ):
+        """
+        Initialize (or load) the flat index.
+
+        Args:
+            persist_directory: Directory holding the index files
+            dimension: Embedding dimension (taken from the first write if None)
+            quantization: "none", "float16" or "int8"; quantized search keeps
+                          a 2x/4x smaller copy of the matrix in memory
+                          (NumPy widens float16 slowly, so int8 is also
+                          the faster of the two)
+            rescore: Re-score the quantized shortlist with exact float32 scores
+            rescore_factor: Shortlist size per requested result
+        """
+        if quantization not in QUANTIZATION_TYPES:
+            raise ValueError(f"Unknown quantization: {quantization} (expected one of {QUANTIZATION_TYPES})")
+
+        self.quantization = quantization
+        self.rescore = rescore
+        self.rescore_factor = rescore_factor
+        self.index_directory = os.path.join(persist_directory, "flat_index")
+        os.makedirs(self.index_directory, exist_ok=True)
+        self.records_path = os.path.join(self.index_directory, RECORDS_FILENAME)
+        self.lock_path = os.path.join(self.index_directory, LOCK_FILENAME)
+        self.dimension = dimension
+        self._write_lock = threading.Lock()
+        # Working copy while bulk_write() is open
+        self._pending: Optional[_PendingWrites] = None
+        self._state = self._load()
+
+    def count(self) -> int:
+        """Number of stored documents."""
+        return len(self._current_state().ids)
+
+    def add(self, ids: List[str], documents: List[str], embeddings: np.ndarray, metadatas: List[Dict]):
+        """Add documents; IDs that already exist are skipped."""
+        self._write(ids, documents, embeddings, metadatas, overwrite=False)
+
+    def upsert(self, ids: List[str], documents: List[str], embeddings: np.ndarray, metadatas: List[Dict]):
+        """Add documents or overwrite existing ones with the same IDs."""
+        self._write(ids, documents, embeddings, metadatas, overwrite=True)
+
+    def delete(self, ids: List[str]):
+        """Delete documents by ID."""
+        self._apply(lambda pending: pending.delete(ids))
+
+    def clear(self):
+        """Remove all documents."""
+        self._apply(lambda pending: pending.clear(self.dimension))
+
+    @contextmanager
+    def bulk_write(self):
+        """
+        Apply every write inside the block with a single commit.
+
+        The write lock is held for the whole block, so other writers (also
+        in other processes) wait; readers keep seeing the last committed
+        state until the files are rewritten once on exit. Writes made
+        before an exception are still committed.
+        """
+        with self._write_lock:
+            nested = self._pending is not None
+        if nested:
+            yield
+            return
+
+        with self._file_lock():
+            with self._write_lock:
+                self._reload_if_changed()
+                self._pending = _PendingWrites(self._state, self.dimension)
+            try:
+                yield
+            finally:
+                with self._write_lock:
+                    pending, self._pending = self._pending, None
+                    if pending.changed:
+                        self._commit(*pending.result())
+
+    def load_snapshot(self, snapshot):
+        """
+        Replace the index content with a snapshot without copying its matrix.
+
+        The snapshot file is hard-linked into the index directory (copied
+        only if it is on another file system) and its normalized float32
+        matrix is memory-mapped in place. A snapshot later rewritten at the
+        same path does not affect the link.
+
+        Args:
+            snapshot: Snapshot from src.rag.snapshot.read_snapshot(), with
+                      normalized embeddings
+        """
+        linked_file = f"snapshot-{uuid.uuid4().hex[:12]}.snap"
+        linked_path = os.path.join(self.index_directory, linked_file)
+        try:
+            os.link(snapshot.path, linked_path)
+        except OSError:
+            shutil.copyfile(snapshot.path, linked_path)
+
+        with self._file_lock(), self._write_lock:
+            if self._pending is not None:
+                raise RuntimeError("Cannot load a snapshot inside bulk_write()")
+            self.dimension = snapshot.header['dimension']
+            self._publish(
+                list(snapshot.ids),
+                list(snapshot.documents),
+                list(snapshot.metadatas),
+                linked_file,
+                offset=snapshot.matrix_offset
+            )
+
+    def get(self, ids: List[str]) -> List[Dict]:
+        """Fetch stored documents by ID (unknown IDs are skipped)."""
+        state = self._current_state()
+        return [
+            {
+                'content': state.documents[row],
+                'metadata': state.metadatas[row],
+                'id': doc_id
+            }
+            for doc_id in ids
+            for row in [state.id_to_row.get(doc_id)]
+            if row is not None
+        ]
+
+    def get_embeddings(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        """Fetch stored (normalized) embeddings by ID (unknown IDs are skipped)."""
+        state = self._current_state()
+        rows = {doc_id: state.id_to_row[doc_id] for doc_id in ids if doc_id in state.id_to_row}
+        if not rows:
+            return {}
+        matrix = np.asarray(state.matrix[list(rows.values())])
+        return dict(zip(rows, matrix))
+
+    def get_all(self) -> List[Dict]:
+        """Fetch every stored document."""
+        state = self._current_state()
+        return self.get(list(state.ids))
+
+    def query(self, embeddings: np.ndarray, k: int, where: Optional[Dict] = None) -> List[List[Dict]]:
+        """
+        Exact top-k search.
+
+        Args:
+            embeddings: Query embeddings, shape (num_queries, dimension)
+            k: Results per query
+            where: Optional Chroma-style metadata filter, applied as a row mask
+
+        Returns:
+            One result list per query; 'distance' is the squared L2 distance
+            between normalized vectors (2 - 2 * cosine), as in Chroma
+        """
+        state = self._current_state()
+        queries = np.asarray(embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        if not state.ids or k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        mask = state.mask(where)
+        candidates = np.arange(len(state.ids)) if mask is None else np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return [[] for _ in range(len(queries))]
+
+        k = min(k, len(candidates))
+        if self.quantization == "none":
+            matrix = state.matrix if mask is None else state.matrix[candidates]
+            scores = queries @ matrix.T  # (num_queries, num_candidates)
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+        else:
+            top, top_scores = self._quantized_top_k(state, queries, candidates, mask, k)
+
+        all_results = []
+        for q in range(len(queries)):
+            order = np.argsort(-top_scores[q])
+            all_results.append([
+                {
+                    'content': state.documents[candidates[top[q, j]]],
+                    'metadata': state.metadatas[candidates[top[q, j]]],
+                    'distance': float(2.0 - 2.0 * top_scores[q, j]),
+                    'id': state.ids[candidates[top[q, j]]]
+                }
+                for j in order
+            ])
+        return all_results
+
+    def memory_footprint(self) -> Dict[str, int]:
+        """Bytes of the float32 matrix and of the in-memory search matrix."""
+        state = self._current_state()
+        float32_bytes = len(state.ids) * (self.dimension or 0) * 4
+        if self.quantization == "none":
+            return {'float32_bytes': float32_bytes, 'search_bytes': float32_bytes}
+        codes, scales = state.quantized(self.quantization)
+        return {
+            'float32_bytes': float32_bytes,
+            'search_bytes': codes.nbytes + (scales.nbytes if scales is not None else 0)
+        }
+
+    def _quantized_top_k(self, state: _IndexState, queries: np.ndarray, candidates: np.ndarray, mask, k: int):
+        """
+        Top-k over the quantized matrix, optionally re-scored exactly.
+
+        Returns:
+            Tuple of (candidate positions, scores), each (num_queries, k)
+        """
+        codes, scales = state.quantized(self.quantization)
+        if mask is not None:
+            codes = codes[candidates]
+        scaled_queries = queries if scales is None else queries * scales
+
+        # Score block-wise so only SCORE_BLOCK_ROWS rows are widened at once
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            block = codes[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+            scores[:, start:start + SCORE_BLOCK_ROWS] = scaled_queries @ block.T
+
+        shortlist_k = min(len(codes), k * self.rescore_factor) if self.rescore else k
+        shortlist = np.argpartition(-scores, shortlist_k - 1, axis=1)[:, :shortlist_k]
+        if self.rescore:
+            # Exact float32 scores for the shortlist rows only
+            rows = np.asarray(state.matrix[candidates[shortlist.ravel()]])
+            exact = np.einsum('qsd,qd->qs', rows.reshape(len(queries), shortlist_k, -1), queries)
+        else:
+            exact = np.take_along_axis(scores, shortlist, axis=1)
+
+        best = np.argpartition(-exact, k - 1, axis=1)[:, :k]
+        return np.take_along_axis(shortlist, best, axis=1), np.take_along_axis(exact, best, axis=1)
+
+    def _current_state(self) -> _IndexState:
+        """Current state, reloaded if another process rewrote the index."""
+        if self._records_signature() != self._records_version:
+            with self._write_lock:
+                self._reload_if_changed()
+        return self._state
+
+    def _reload_if_changed(self):
+        """Reload the committed state if the records changed (caller holds _write_lock)."""
+        if self._records_signature() != self._records_version:
+            self._state = self._load()
+
+    def _records_signature(self):
+        """Identity of the records file; every commit replaces it with a new inode."""
+        try:
+            stat = os.stat(self.records_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive write lock on the index directory, shared with other processes."""
+        with open(self.lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                # Released when the file is closed
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _apply(self, change):
+        """
+        Apply change(pending) to the working copy of the index.
+
+        Inside bulk_write() the change waits for the block's single commit;
+        otherwise the latest committed state is reloaded, changed and
+        committed under the write lock.
+        """
+        with self._write_lock:
+            if self._pending is not None:
+                change(self._pending)
+                return
+
+        with self._file_lock():
+            with self._write_lock:
+                self._reload_if_changed()
+                pending = _PendingWrites(self._state, self.dimension)
+                change(pending)
+                if pending.changed:
+                    self._commit(*pending.result())
+
+    def _write(self, ids, documents, embeddings, metadatas, overwrite: bool):
+        """Apply an add/upsert."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+        def change(pending: _PendingWrites):
+            if self.dimension is None:
+                self.dimension = embeddings.shape[1]
+            if embeddings.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Embedding dimension {embeddings.shape[1]} does not match index dimension {self.dimension}"
+                )
+            pending.write(ids, documents, embeddings, metadatas, overwrite)
+
+        self._apply(change)
+
+    def _commit(self, ids, documents, metadatas, matrix: np.ndarray):
+        """Persist a new state and make it visible to readers."""
+        new_file = f"embeddings-{uuid.uuid4().hex[:12]}.f32"
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        with open(os.path.join(self.index_directory, new_file), 'wb') as f:
+            f.write(matrix.tobytes())
+        self._publish(ids, documents, metadatas, new_file)
+
+    def _publish(self, ids, documents, metadatas, embeddings_file: str, offset: int = 0):
+        """Swap in records pointing at an embedding file and remove the previous file."""
+        old_file = self._embeddings_file
+
+        # Records are swapped atomically and point at the new embedding file
+        tmp_path = f"{self.records_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'dimension': self.dimension,
+                'embeddings_file': embeddings_file,
+                'embeddings_offset': offset,
+                'ids': ids,
+                'documents': documents,
+                'metadatas': metadatas
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.records_path)
+
+        self._records_version = self._records_signature()
+        self._embeddings_file = embeddings_file
+        self._state = _IndexState(ids, documents, metadatas, self._map_matrix(embeddings_file, len(ids), offset=offset))
+        if old_file and old_file != embeddings_file:
+            try:
+                os.remove(os.path.join(self.index_directory, old_file))
+            except OSError:
+                pass
+
+    def _load(self) -> _IndexState:
+        """Load records and memory-map the embedding matrix."""
+        for attempt in range(LOAD_ATTEMPTS):
+            try:
+                return self._load_records()
+            except FileNotFoundError:
+                # A writer committed between reading the records and mapping
+                # their embedding file, and removed that file; read again
+                if attempt == LOAD_ATTEMPTS - 1:
+                    raise
+                time.sleep(0.05 * (attempt + 1))
+
+    def _load_records(self) -> _IndexState:
+        """One attempt of _load."""
+        self._embeddings_file = None
+        self._records_version = None
+        signature = self._records_signature()
+        if signature is None:
+            return _IndexState([], [], [], np.zeros((0, self.dimension or 0), dtype=np.float32))
+
+        with open(self.records_path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+
+        dimension = records['dimension']
+        matrix = self._map_matrix(
+            records['embeddings_file'], len(records['ids']), dimension, records.get('embeddings_offset', 0)
+        )
+        # Recorded only once the matching embedding file is mapped
+        self._records_version = signature
+        self.dimension = dimension
+        self._embeddings_file = records['embeddings_file']
+        return _IndexState(records['ids'], records['documents'], records['metadatas'], matrix)
+
+    def _map_matrix(self, filename: str, rows: int, dimension: Optional[int] = None, offset: int = 0) -> np.ndarray:
+        """Memory-map an embedding file (the matrix starts at offset) read-only."""
+        dimension = dimension or self.dimension
+        if rows == 0 or not dimension:
+            return np.zeros((0, dimension or 0), dtype=np.float32)
+        return np.memmap(
+            os.path.join(self.index_directory, filename),
+            dtype=np.float32,
+            mode='r',
+            offset=offset,
+            shape=(rows, dimension)
+        )
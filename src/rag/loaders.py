@@ -0,0 +1,152 @@
+"""
+Streaming loaders for PDF and DOCX syllabi.
+Both read one page (PDF) or one paragraph/table (DOCX) at a time and yield
+plain text blocks, so a large syllabus is never held in memory whole;
+iter_text_windows groups the blocks into bounded windows for the chunker.
+"""
+import os
+import zipfile
+import xml.etree.ElementTree as ElementTree
+from typing import Iterable, Iterator
+from PyPDF2 import PdfReader
+
+
+SUPPORTED_EXTENSIONS = ('.md', '.pdf', '.docx')
+
+# Pages between flushes of PyPDF2's parsed-object cache, which otherwise
+# keeps every page's objects alive until the reader is closed
+PDF_CACHE_FLUSH_PAGES = 32
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def iter_pdf_pages(path: str) -> Iterator[str]:
+    """
+    Yield the extracted text of each PDF page, in order.
+
+    Pages are parsed lazily from the open file; pages without a text layer
+    (scans) yield an empty string.
+    """
+    with open(path, 'rb') as f:
+        reader = PdfReader(f)
+        for number, page in enumerate(reader.pages, 1):
+            yield page.extract_text() or ""
+            if number % PDF_CACHE_FLUSH_PAGES == 0:
+                reader.resolved_objects.clear()
+
+
+def iter_docx_blocks(path: str) -> Iterator[str]:
+    """
+    Yield the body of a DOCX file as markdown blocks, in order.
+
+    word/document.xml is parsed incrementally and every paragraph or table
+    is discarded once converted, unlike python-docx, which builds the whole
+    document tree. Heading and Title styles become markdown headings, list
+    paragraphs become bullets and tables become markdown table rows.
+    """
+    with zipfile.ZipFile(path) as archive, archive.open('word/document.xml') as xml_file:
+        depth = 0
+        body = None
+        for event, element in ElementTree.iterparse(xml_file, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == 2:
+                    body = element
+                continue
+            depth -= 1
+            # document > body > paragraph/table: direct children of the body are at depth 2
+            if depth != 2:
+                continue
+            if element.tag == f'{WORD_NAMESPACE}p':
+                text = _docx_paragraph(element)
+            elif element.tag == f'{WORD_NAMESPACE}tbl':
+                text = _docx_table(element)
+            else:
+                text = ""
+            # Drop the converted block from the tree being built
+            body.clear()
+            if text.strip():
+                yield text
+
+
+def iter_document_blocks(path: str) -> Iterator[str]:
+    """Yield text blocks of a supported document (a markdown file is one block)."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.pdf':
+        yield from iter_pdf_pages(path)
+    elif extension == '.docx':
+        yield from iter_docx_blocks(path)
+    elif extension == '.md':
+        with open(path, 'r', encoding='utf-8') as f:
+            yield f.read()
+    else:
+        raise ValueError(f"Unsupported document type: {path}")
+
+
+def iter_text_windows(blocks: Iterable[str], window_chars: int = 20000) -> Iterator[str]:
+    """
+    Group text blocks into windows of about window_chars.
+
+    A full window is cut at its last blank line (else its last line break)
+    and the remainder starts the next window, so sections are not split
+    mid-paragraph. Memory is bounded by the window plus one block.
+    """
+    buffer = ""
+    for block in blocks:
+        buffer = f"{buffer}\n\n{block}" if buffer else block
+        while len(buffer) >= window_chars:
+            cut = buffer.rfind("\n\n", 0, window_chars)
+            if cut <= 0:
+                cut = buffer.rfind("\n", 0, window_chars)
+            if cut <= 0:
+                cut = window_chars
+            window, buffer = buffer[:cut], buffer[cut:].lstrip("\n")
+            if window.strip():
+                yield window
+    if buffer.strip():
+        yield buffer
+
+
+def _docx_text(element) -> str:
+    """Concatenated text runs, tabs and line breaks of a DOCX element."""
+    parts = []
+    for node in element.iter():
+        if node.tag == f'{WORD_NAMESPACE}t':
+            parts.append(node.text or "")
+        elif node.tag == f'{WORD_NAMESPACE}tab':
+            parts.append("\t")
+        elif node.tag in (f'{WORD_NAMESPACE}br', f'{WORD_NAMESPACE}cr'):
+            parts.append("\n")
+    return "".join(parts)
+
+
+def _docx_paragraph(paragraph) -> str:
+    """Markdown for one DOCX paragraph."""
+    text = _docx_text(paragraph).strip()
+    properties = paragraph.find(f'{WORD_NAMESPACE}pPr')
+    if not text or properties is None:
+        return text
+
+    style = properties.find(f'{WORD_NAMESPACE}pStyle')
+    style_id = style.get(f'{WORD_NAMESPACE}val', '') if style is not None else ''
+    if style_id == 'Title':
+        return f"# {text}"
+    if style_id.startswith('Heading') and style_id[7:].isdigit():
+        return f"{'#' * min(int(style_id[7:]), 6)} {text}"
+    if style_id.startswith('List') or properties.find(f'{WORD_NAMESPACE}numPr') is not None:
+        return f"- {text}"
+    return text
+
+
+def _docx_table(table) -> str:
+    """Markdown table for one DOCX table (first row as header)."""
+    rows = []
+    for row in table.iter(f'{WORD_NAMESPACE}tr'):
+        cells = [
+            _docx_text(cell).strip().replace("\n", " ").replace("|", "/")
+            for cell in row.findall(f'{WORD_NAMESPACE}tc')
+        ]
+        rows.append(f"| {' | '.join(cells)} |")
+        if len(rows) == 1:
+            rows.append(f"|{'---|' * len(cells)}")
+    return "\n".join(rows)
@@ -0,0 +1,163 @@
+"""
+Ingestion manifest for incremental knowledge-base updates.
+Records content hashes per source file and per chunk so re-runs only
+embed what actually changed.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+
+MANIFEST_VERSION = 1
+
+
+def hash_text(text: str) -> str:
+    """Return a stable SHA-256 hex digest of a text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def hash_file(path: str, block_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_chunk(content: str, metadata: Optional[Dict] = None) -> str:
+    """Hash chunk content together with its metadata."""
+    payload = json.dumps(metadata or {}, sort_keys=True, ensure_ascii=False)
+    return hash_text(f"{payload}\n{content}")
+
+
+class IngestionManifest:
+    """JSON manifest of ingested files, their hashes and chunk hashes."""
+
+    def __init__(self, path: str):
+        """
+        Initialize manifest.
+
+        Args:
+            path: Location of the manifest JSON file
+        """
+        self.path = path
+        self.config: Dict = {}
+        self.files: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self):
+        """Load manifest from disk (empty manifest if missing or unreadable)."""
+        self.config = {}
+        self.files = {}
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"WARNING Ignoring unreadable manifest {self.path}: {e}")
+            return
+
+        if data.get('version') != MANIFEST_VERSION:
+            return
+        self.config = data.get('config', {})
+        self.files = data.get('files', {})
+
+    def save(self):
+        """Atomically write manifest to disk."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(
+                {'version': MANIFEST_VERSION, 'config': self.config, 'files': self.files},
+                f,
+                indent=1,
+                sort_keys=True
+            )
+        os.replace(tmp_path, self.path)
+
+    def exists(self) -> bool:
+        """Check whether the manifest has been written before."""
+        return os.path.exists(self.path)
+
+    def reset(self, config: Optional[Dict] = None):
+        """Forget all recorded files."""
+        self.config = config or {}
+        self.files = {}
+
+    def diff_files(self, current_hashes: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        Compare current file hashes against the manifest.
+
+        Args:
+            current_hashes: Mapping of source path to content hash
+
+        Returns:
+            Dict with sorted 'added', 'changed', 'removed' and 'unchanged' paths
+        """
+        diff = {'added': [], 'changed': [], 'removed': [], 'unchanged': []}
+
+        for source, file_hash in current_hashes.items():
+            entry = self.files.get(source)
+            if entry is None:
+                diff['added'].append(source)
+            elif entry.get('hash') != file_hash:
+                diff['changed'].append(source)
+            else:
+                diff['unchanged'].append(source)
+
+        diff['removed'] = [s for s in self.files if s not in current_hashes]
+
+        for key in diff:
+            diff[key].sort()
+        return diff
+
+    def diff_chunks(self, source: str, chunks: List[Dict]) -> Dict[str, List]:
+        """
+        Compare a file's new chunks with the chunks recorded for it.
+
+        Args:
+            source: Source path of the file
+            chunks: New chunks with 'id', 'content' and 'metadata'
+
+        Returns:
+            Dict with 'upsert' (chunks to write) and 'delete' (stale chunk ids)
+        """
+        old_chunks = self.files.get(source, {}).get('chunks', {})
+        new_ids = set()
+        upsert = []
+
+        for chunk in chunks:
+            new_ids.add(chunk['id'])
+            if old_chunks.get(chunk['id']) != hash_chunk(chunk['content'], chunk['metadata']):
+                upsert.append(chunk)
+
+        delete = sorted(chunk_id for chunk_id in old_chunks if chunk_id not in new_ids)
+        return {'upsert': upsert, 'delete': delete}
+
+    def record_file(self, source: str, file_hash: str, chunks: List[Dict]):
+        """Record a file and the hashes of its chunks."""
+        self.record_chunk_hashes(source, file_hash, {
+            chunk['id']: hash_chunk(chunk['content'], chunk['metadata'])
+            for chunk in chunks
+        })
+
+    def record_chunk_hashes(self, source: str, file_hash: str, chunk_hashes: Dict[str, str]):
+        """Record a file from precomputed chunk hashes (streamed ingestion)."""
+        self.files[source] = {'hash': file_hash, 'chunks': dict(chunk_hashes)}
+
+    def remove_file(self, source: str) -> List[str]:
+        """
+        Drop a file from the manifest.
+
+        Returns:
+            Chunk ids that were recorded for the file
+        """
+        entry = self.files.pop(source, {})
+        return sorted(entry.get('chunks', {}))
@@ -0,0 +1,120 @@
+"""
+Metadata helpers shared by ingestion and retrieval.
+"""
+import re
+from typing import Dict, Optional
+
+
+# Canonical level -> patterns that identify it in free text
+LEVEL_PATTERNS = {
+    'btech': r'\bb\.?\s?tech\b|\bb\.?\s?e\.(?=\s)|\bbachelor|\bundergraduate\b',
+    'masters': r'\bm\.?\s?tech\b|\bmasters?\b|\bm\.?\s?sc\b|\bpostgraduate\b|\bgraduate\b',
+    'diploma': r'\bdiploma\b',
+    'certification': r'\bcertificat\w*|\bbootcamp\b|\bprofessional\b',
+}
+
+# Degree names only: words like "Professional" or "Graduate" are user-facing
+# levels but appear in every syllabus ("Professional Core Courses")
+DOCUMENT_LEVEL_PATTERNS = {
+    'btech': r'\bb\.?\s?tech\b|\bb\.?\s?e\.(?=\s)|\bbachelor of',
+    'masters': r'\bm\.?\s?tech\b|\bmasters?\b|\bm\.?\s?sc\b',
+    'diploma': r'\bdiploma\b',
+    'certification': r'\bcertificat\w*|\bbootcamp\b',
+}
+
+LEVEL_REGEXES = {level: re.compile(pattern, re.IGNORECASE) for level, pattern in LEVEL_PATTERNS.items()}
+DOCUMENT_LEVEL_REGEXES = {
+    level: re.compile(pattern, re.IGNORECASE) for level, pattern in DOCUMENT_LEVEL_PATTERNS.items()
+}
+
+
+def normalize_level(level: Optional[str]) -> str:
+    """
+    Map a free-form education level to a canonical key.
+
+    "B.Tech", "BTech", "Undergraduate" -> "btech"; "M.Tech", "Masters",
+    "Graduate" -> "masters"; "Bootcamp", "Certificate" -> "certification".
+
+    Args:
+        level: Level as written by a user or a document
+
+    Returns:
+        Canonical key, a slug of the input if no pattern matches, or ""
+        if the input is empty or names several levels
+    """
+    if not level or not str(level).strip():
+        return ""
+
+    text = str(level)
+    matches = [key for key, regex in LEVEL_REGEXES.items() if regex.search(text)]
+    if len(matches) == 1:
+        return matches[0]
+    if matches:
+        # "Postgraduate" also matches "graduate"; prefer the first canonical hit
+        # unless the text genuinely lists alternatives ("BTech/Masters/...")
+        if re.search(r'[/,]|\bor\b', text, re.IGNORECASE):
+            return ""
+        return matches[0]
+
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+
+
+def infer_level(text: str, max_chars: int = 6000) -> str:
+    """
+    Infer the canonical level of a document from its opening text.
+
+    Args:
+        text: Document content
+        max_chars: How much of the document to scan
+
+    Returns:
+        Canonical level key of the most frequent match, or "" if none
+    """
+    head = text[:max_chars]
+    counts = {key: len(regex.findall(head)) for key, regex in DOCUMENT_LEVEL_REGEXES.items()}
+    best = max(counts, key=counts.get)
+    return best if counts[best] else ""
+
+
+def matches_where(metadata: Dict, where: Optional[Dict]) -> bool:
+    """
+    Evaluate a Chroma-style metadata filter against one metadata dict.
+
+    Supports field equality, $eq/$ne/$in/$nin/$gt/$gte/$lt/$lte and $and/$or.
+    """
+    if not where:
+        return True
+
+    for key, condition in where.items():
+        if key == '$and':
+            if not all(matches_where(metadata, sub) for sub in condition):
+                return False
+        elif key == '$or':
+            if not any(matches_where(metadata, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, expected in condition.items():
+                if op == '$eq' and value != expected:
+                    return False
+                if op == '$ne' and value == expected:
+                    return False
+                if op == '$in' and value not in expected:
+                    return False
+                if op == '$nin' and value in expected:
+                    return False
+                if op in ('$gt', '$gte', '$lt', '$lte'):
+                    if value is None:
+                        return False
+                    if op == '$gt' and not value > expected:
+                        return False
+                    if op == '$gte' and not value >= expected:
+                        return False
+                    if op == '$lt' and not value < expected:
+                        return False
+                    if op == '$lte' and not value <= expected:
+                        return False
+        elif metadata.get(key) != condition:
+            return False
+
+    return True
@@ -0,0 +1,235 @@
+"""
+Staged ingestion pipeline.
+Files are parsed and chunked in a process pool, and their chunks are then
+embedded and written in batches on two threads. Bounded queues between
+the stages provide backpressure, and each stage reports its throughput.
+"""
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List
+
+
+class _FileDone:
+    """Queue marker: every batch of a file has been sent."""
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+
+
+_END = object()
+
+
+def _new_stage_stats() -> Dict:
+    return {'items': 0, 'chunks': 0, 'busy_seconds': 0.0, 'wait_seconds': 0.0}
+
+
+class IngestionPipeline:
+    """
+    parse (process pool) -> prepare (calling thread) -> embed (thread) -> write (thread).
+
+    Parse results are consumed in submission order, so files are prepared,
+    written and finished in the order given regardless of which worker
+    finishes first.
+    """
+
+    def __init__(
+        self,
+        vector_store,
+        workers: int = None,
+        batch_size: int = 64,
+        queue_size: int = 4
+    ):
+        """
+        Initialize pipeline.
+
+        Args:
+            vector_store: CurriculumVectorStore written to (its embedder is used)
+            workers: Parse processes (default: CPU count, at most 4)
+            batch_size: Chunks per embedding/write batch
+            queue_size: Batches buffered between stages; files parsed ahead
+                        of the embedder are bounded by workers + queue_size
+        """
+        self.vector_store = vector_store
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+
+    def run(
+        self,
+        tasks: Iterable[tuple],
+        parse: Callable,
+        prepare: Callable[[str, List[Dict]], List[Dict]],
+        finish: Callable[[str], None],
+        on_error: Callable[[str, Exception], None] = None
+    ) -> Dict:
+        """
+        Ingest files through the pipeline.
+
+        Args:
+            tasks: (filepath, *args) tuples; parse(filepath, *args) runs in a
+                   worker process and must be a picklable module-level
+                   function returning the file's chunks
+            prepare: Called on this thread with (filepath, chunks) in task
+                     order; returns the chunks to embed and write
+            finish: Called on the writer thread once all of a file's
+                    chunks are written
+            on_error: Called with (filepath, exception) when parsing fails;
+                      the file is skipped (default: re-raise)
+
+        Returns:
+            Per-stage stats ('parse', 'embed', 'write': items, chunks,
+            busy_seconds, wait_seconds, chunks_per_second) and 'wall_seconds'
+        """
+        stats = {name: _new_stage_stats() for name in STAGES}
+        embed_queue = queue.Queue(maxsize=self.queue_size)
+        write_queue = queue.Queue(maxsize=self.queue_size)
+        errors = []
+        start = time.perf_counter()
+
+        embed_thread = threading.Thread(
+            target=self._embed_loop, args=(embed_queue, write_queue, stats['embed'], errors),
+            name="ingest-embed", daemon=True
+        )
+        write_thread = threading.Thread(
+            target=self._write_loop, args=(write_queue, finish, stats['write'], errors),
+            name="ingest-write", daemon=True
+        )
+        embed_thread.start()
+        write_thread.start()
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                pending = iter(tasks)
+                in_flight = deque()
+                # Parse ahead of the embedder by at most this many files
+                max_in_flight = self.workers + self.queue_size
+
+                while True:
+                    while len(in_flight) < max_in_flight:
+                        task = next(pending, None)
+                        if task is None:
+                            break
+                        in_flight.append((task[0], pool.submit(_timed, parse, *task)))
+                    if not in_flight or errors:
+                        break
+
+                    filepath, future = in_flight.popleft()
+                    try:
+                        chunks, seconds = future.result()
+                    except Exception as e:
+                        if on_error is None:
+                            raise
+                        on_error(filepath, e)
+                        continue
+                    stats['parse']['items'] += 1
+                    stats['parse']['chunks'] += len(chunks)
+                    stats['parse']['busy_seconds'] += seconds
+
+                    upsert = prepare(filepath, chunks)
+                    for offset in range(0, len(upsert), self.batch_size):
+                        self._put(embed_queue, upsert[offset:offset + self.batch_size], stats['parse'])
+                    self._put(embed_queue, _FileDone(filepath), stats['parse'])
+        finally:
+            embed_queue.put(_END)
+            embed_thread.join()
+            write_thread.join()
+
+        if errors:
+            raise errors[0]
+
+        stats['wall_seconds'] = time.perf_counter() - start
+        stats['workers'] = self.workers
+        return _with_throughput(stats)
+
+    def _embed_loop(self, embed_queue, write_queue, stats, errors):
+        """Embed batches; markers pass through in order."""
+        while True:
+            item = embed_queue.get()
+            if item is _END:
+                write_queue.put(_END)
+                return
+            if errors or isinstance(item, _FileDone):
+                if not errors:
+                    self._put(write_queue, item, stats)
+                continue
+            try:
+                started = time.perf_counter()
+                embeddings = self.vector_store.embedder.embed_batch([chunk['content'] for chunk in item])
+                stats['busy_seconds'] += time.perf_counter() - started
+                stats['items'] += 1
+                stats['chunks'] += len(item)
+                self._put(write_queue, (item, embeddings), stats)
+            except Exception as e:
+                # Keep draining so the producer never blocks on a full queue
+                errors.append(e)
+
+    def _write_loop(self, write_queue, finish, stats, errors):
+        """Write embedded batches and finish files."""
+        while True:
+            item = write_queue.get()
+            if item is _END:
+                if not errors:
+                    self.vector_store.lexical_index.save()
+                return
+            if errors:
+                continue
+            try:
+                started = time.perf_counter()
+                if isinstance(item, _FileDone):
+                    finish(item.filepath)
+                else:
+                    batch, embeddings = item
+                    self.vector_store.upsert_embedded(
+                        documents=[chunk['content'] for chunk in batch],
+                        embeddings=embeddings,
+                        metadatas=[chunk['metadata'] for chunk in batch],
+                        ids=[chunk['id'] for chunk in batch],
+                        save_lexical=False
+                    )
+                    stats['items'] += 1
+                    stats['chunks'] += len(batch)
+                stats['busy_seconds'] += time.perf_counter() - started
+            except Exception as e:
+                errors.append(e)
+
+    @staticmethod
+    def _put(target: queue.Queue, item, stats: Dict):
+        """Put with backpressure, counting the time spent blocked."""
+        started = time.perf_counter()
+        target.put(item)
+        stats['wait_seconds'] += time.perf_counter() - started
+
+
+STAGES = ('parse', 'embed', 'write')
+
+
+def merge_stats(first: Dict, second: Dict) -> Dict:
+    """Combine the stats of two pipeline runs (e.g. a re-sync round)."""
+    merged = {name: _new_stage_stats() for name in STAGES}
+    for name in STAGES:
+        for key in merged[name]:
+            merged[name][key] = first[name][key] + second[name][key]
+    merged['wall_seconds'] = first['wall_seconds'] + second['wall_seconds']
+    merged['workers'] = first['workers']
+    return _with_throughput(merged)
+
+
+def _with_throughput(stats: Dict) -> Dict:
+    """Add chunks_per_second (per busy second) to every stage."""
+    for name in STAGES:
+        stage = stats[name]
+        # Parse time is summed over the workers, so divide by their count
+        busy = stage['busy_seconds'] / (stats['workers'] if name == 'parse' else 1)
+        stage['chunks_per_second'] = stage['chunks'] / busy if busy else None
+    return stats
+
+
+def _timed(parse: Callable, *args):
+    """Worker-side wrapper returning (result, seconds)."""
+    started = time.perf_counter()
+    result = parse(*args)
+    return result, time.perf_counter() - started
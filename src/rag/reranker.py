@@ -0,0 +1,118 @@
+"""
+Cross-encoder re-ranking for retrieved chunks.
+A small local cross-encoder reads query and chunk together, which ranks the
+top few candidates more precisely than bi-encoder (embedding) distances.
+"""
+import hashlib
+import os
+import time
+from typing import Dict, List, Optional, Set
+from sentence_transformers import CrossEncoder
+from src.rag.cache import LRUCache
+
+
+def query_digest(query: str) -> str:
+    """Short hash of a normalized query, used in pair-score cache keys."""
+    normalized = " ".join(query.lower().split())
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def rerank_scenarios_from_env() -> Set[str]:
+    """
+    Scenarios whose retrievals are re-ranked, from RERANK_SCENARIOS.
+
+    A comma-separated list of scenario names (e.g. "curriculum"); unset or
+    empty re-ranks nothing, as every re-ranked retrieval pays the
+    cross-encoder's latency (see CrossEncoderReranker.stats()).
+    """
+    return {name.strip() for name in os.getenv("RERANK_SCENARIOS", "").split(",") if name.strip()}
+
+
+class CrossEncoderReranker:
+    """Re-rank top candidates with a local cross-encoder (free, no API calls)."""
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        top_n: int = 12,
+        batch_size: int = 32,
+        max_chars: int = 2000,
+        device: Optional[str] = None,
+        cache_size: int = 4096,
+        cache_ttl: Optional[float] = None
+    ):
+        """
+        Initialize re-ranker.
+
+        Args:
+            model_name: Sentence Transformers cross-encoder model
+            top_n: Candidates scored per query (the rest keep their order)
+            batch_size: Pairs scored per forward pass
+            max_chars: Chunk text passed to the model (it truncates anyway)
+            device: Torch device ("cpu", "cuda", ...); auto-detected if None
+            cache_size: (query hash, chunk id) pair scores kept in memory
+            cache_ttl: Seconds a cached score stays valid (None = no expiry)
+        """
+        print(f"Loading cross-encoder: {model_name}...")
+        self.model = CrossEncoder(model_name, device=device)
+        self.model_name = model_name
+        self.top_n = top_n
+        self.batch_size = batch_size
+        self.max_chars = max_chars
+        self.score_cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+
+        self.calls = 0
+        self.pairs_scored = 0
+        self.total_latency_ms = 0.0
+        self.last_latency_ms = 0.0
+
+    def rerank(self, query: str, candidates: List[Dict]) -> List[Dict]:
+        """
+        Re-order the top candidates by cross-encoder score.
+
+        Uncached (query, chunk) pairs are scored in one batched model call.
+
+        Args:
+            query: Search query
+            candidates: Retrieved chunks with 'id' and 'content', best first
+
+        Returns:
+            The top_n candidates sorted by 'rerank_score', followed by the
+            remaining candidates in their original order
+        """
+        start = time.perf_counter()
+        head = candidates[:self.top_n]
+        digest = query_digest(query)
+
+        scores = [self.score_cache.get((digest, doc['id'])) for doc in head]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            pairs = [(query, head[i].get('content', '')[:self.max_chars]) for i in missing]
+            computed = self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+            for i, score in zip(missing, computed):
+                scores[i] = float(score)
+                self.score_cache.put((digest, head[i]['id']), scores[i])
+            self.pairs_scored += len(missing)
+
+        reranked = [{**doc, 'rerank_score': score} for doc, score in zip(head, scores)]
+        reranked.sort(key=lambda doc: doc['rerank_score'], reverse=True)
+
+        self.last_latency_ms = (time.perf_counter() - start) * 1000
+        self.total_latency_ms += self.last_latency_ms
+        self.calls += 1
+        return reranked + candidates[self.top_n:]
+
+    def clear_cache(self):
+        """Drop cached pair scores (e.g. after the collection changed)."""
+        self.score_cache.clear()
+
+    def stats(self) -> Dict:
+        """Latency and cache counters for deciding whether re-ranking pays off."""
+        return {
+            'model': self.model_name,
+            'calls': self.calls,
+            'pairs_scored': self.pairs_scored,
+            'last_latency_ms': self.last_latency_ms,
+            'avg_latency_ms': self.total_latency_ms / self.calls if self.calls else 0.0,
+            'score_cache': self.score_cache.stats()
+        }
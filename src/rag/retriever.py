@@ -2,82 +2,356 @@
 RAG retriever for curriculum generation.
 Combines vector search with context formatting.
 """
-from typing import List, Dict
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Iterable, List, Dict, Optional
+import numpy as np
 from src.rag.vector_store import CurriculumVectorStore
+from src.rag.cache import LRUCache
+from src.rag.metadata import normalize_level
+from src.rag.context_packer import ContextPacker
+
+if TYPE_CHECKING:
+    from src.rag.reranker import CrossEncoderReranker
+
+
+def _normalize(text: str) -> str:
+    """Case- and whitespace-insensitive form of a user input."""
+    return " ".join(str(text).lower().split())
 
 
 class CurriculumRetriever:
     """RAG retrieval logic for curriculum examples."""
     
-    def __init__(self, vector_store: CurriculumVectorStore):
+    def __init__(
+        self,
+        vector_store: CurriculumVectorStore,
+        cache_size: int = 256,
+        cache_ttl: Optional[float] = 3600.0,
+        overfetch_factor: int = 4,
+        mode: str = "dense",
+        rrf_k: int = 60,
+        context_token_budget: int = 8000,
+        mmr_lambda: Optional[float] = None,
+        mmr_pool_size: int = 24,
+        reranker: Optional["CrossEncoderReranker"] = None,
+        rerank_scenarios: Optional[Iterable[str]] = None
+    ):
         """
         Initialize retriever.
         
         Args:
             vector_store: ChromaDB vector store instance
+            cache_size: Entries kept in the query-embedding and result caches
+            cache_ttl: Seconds a cached entry stays valid (None = no expiry)
+            overfetch_factor: Candidates fetched per requested result, so
+                              level matches can be ranked first in one query
+            mode: "dense" (embeddings only) or "hybrid" (embeddings fused
+                  with BM25 keyword search via reciprocal rank fusion)
+            rrf_k: Rank offset of reciprocal rank fusion (higher = flatter)
+            context_token_budget: Estimated-token budget of the LLM context
+            mmr_lambda: Relevance/diversity trade-off of maximal marginal
+                        relevance re-ranking (1.0 = relevance only);
+                        None (default) keeps the plain relevance order,
+                        0.7 is a reasonable value to opt in with
+            mmr_pool_size: Minimum candidate pool fetched for MMR
+            reranker: Optional cross-encoder re-ranking stage for the top
+                      candidates (its stats() report the added latency)
+            rerank_scenarios: Scenarios whose retrievals use the reranker
+                              (None = every retrieval)
         """
+        if mode not in ("dense", "hybrid"):
+            raise ValueError(f"Unknown retrieval mode: {mode} (expected 'dense' or 'hybrid')")
+        if mmr_lambda is not None and not 0.0 <= mmr_lambda <= 1.0:
+            raise ValueError("mmr_lambda must be between 0 and 1")
+        
         self.vector_store = vector_store
+        self.overfetch_factor = overfetch_factor
+        self.mode = mode
+        self.rrf_k = rrf_k
+        self.mmr_lambda = mmr_lambda
+        self.mmr_pool_size = mmr_pool_size
+        self.reranker = reranker
+        self.rerank_scenarios = None if rerank_scenarios is None else set(rerank_scenarios)
+        self.context_packer = ContextPacker(token_budget=context_token_budget)
+        # Per-thread, so one retriever can be shared by concurrent sessions
+        self._local = threading.local()
+        self.query_embedding_cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self.result_cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self._cache_version = None
     
     def retrieve_similar_curricula(
         self,
         skill: str,
         level: str,
-        k: int = 3
+        k: int = 3,
+        filter_metadata: Optional[Dict] = None,
+        focus_areas: Optional[List[str]] = None,
+        scenario: Optional[str] = None
     ) -> List[Dict]:
         """
         Retrieve similar curriculum examples.
         
+        Results are cached per normalized (skill, level, k, filter, focus
+        areas, re-ranked or not) until the collection content changes.
+        
         Args:
             skill: Subject/skill area
             level: Education level
             k: Number of examples to retrieve
+            filter_metadata: Optional extra metadata filter for every query
+            focus_areas: Optional focus areas; each adds its own query to the
+                         same batched search and results are interleaved
+            scenario: Calling scenario, which decides whether the reranker
+                      runs (see rerank_scenarios)
             
         Returns:
             List of relevant curriculum examples
         """
-        # Construct search query
-        query = f"Create a {level} curriculum for {skill}"
-        
-        # Try to filter by level if possible
-        try:
-            results = self.vector_store.similarity_search(
-                query=query,
-                k=k,
-                filter_metadata={"level": level}
-            )
-            
-            # If no results with filter, search without filter
-            if not results:
-                results = self.vector_store.similarity_search(query=query, k=k)
-        except:
-            # Fallback to unfiltered search
-            results = self.vector_store.similarity_search(query=query, k=k)
+        version = self._check_cache_version()
+        rerank = self.reranks(scenario)
+        cache_key = (
+            version,
+            _normalize(skill),
+            _normalize(level),
+            k,
+            json.dumps(filter_metadata, sort_keys=True),
+            tuple(_normalize(area) for area in focus_areas or []),
+            rerank
+        )
+        self.last_rerank_latency_ms = 0.0
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            return [dict(doc) for doc in cached]
+        
+        # Construct search queries (main query plus one per focus area)
+        queries = [f"Create a {level} curriculum for {skill}"]
+        queries += [f"{area} in a {level} {skill} curriculum" for area in focus_areas or []]
+        embeddings = self._embed_queries(queries)
+        
+        # One over-fetching search instead of a filtered query plus an
+        # unfiltered fallback; level matches are ranked first afterwards
+        fetch_k = max(k * self.overfetch_factor, k)
+        if self.mmr_lambda is not None:
+            fetch_k = max(fetch_k, self.mmr_pool_size)
+        if rerank:
+            fetch_k = max(fetch_k, self.reranker.top_n)
+        candidate_lists = self.vector_store.similarity_search_by_vectors(
+            embeddings,
+            k=fetch_k,
+            filters=filter_metadata
+        )
         
+        if self.mode == "hybrid":
+            # Keyword queries skip the template words of the dense query
+            keyword_queries = [f"{skill} {level}"] + [f"{area} {skill}" for area in focus_areas or []]
+            lexical_lists = [
+                self.vector_store.lexical_search(q, k=fetch_k, filter_metadata=filter_metadata)
+                for q in keyword_queries
+            ]
+            candidates = self._reciprocal_rank_fusion(candidate_lists + lexical_lists)
+        else:
+            candidates = self._interleave(candidate_lists)
+        candidates = self._rank_level_matches_first(candidates, level)
+        if rerank:
+            rerank_query = queries[0]
+            if focus_areas:
+                rerank_query += f" focusing on {', '.join(focus_areas)}"
+            # Only the scored head competes for the final k
+            rerank_start = time.perf_counter()
+            candidates = self.reranker.rerank(rerank_query, candidates)[:self.reranker.top_n]
+            self.last_rerank_latency_ms = (time.perf_counter() - rerank_start) * 1000
+            candidates = self._rank_level_matches_first(candidates, level)
+        if self.mmr_lambda is not None:
+            results = self._max_marginal_relevance(candidates, embeddings, level, k)
+        else:
+            results = candidates[:k]
+        
+        self._annotate_shared_sources(results)
+        
+        self.result_cache.put(cache_key, [dict(doc) for doc in results])
         return results
     
-    def format_context_for_llm(self, retrieved_docs: List[Dict]) -> str:
+    def reranks(self, scenario: Optional[str]) -> bool:
+        """Check whether retrievals for a scenario go through the reranker."""
+        if self.reranker is None:
+            return False
+        return self.rerank_scenarios is None or scenario in self.rerank_scenarios
+    
+    @property
+    def last_context_report(self) -> Optional[Dict]:
+        """Packing report of this thread's last format_context_for_llm call."""
+        return getattr(self._local, 'context_report', None)
+    
+    @last_context_report.setter
+    def last_context_report(self, report: Optional[Dict]):
+        self._local.context_report = report
+    
+    @property
+    def last_rerank_latency_ms(self) -> float:
+        """Re-ranking latency of this thread's last retrieval (0 if cached or disabled)."""
+        return getattr(self._local, 'rerank_latency_ms', 0.0)
+    
+    @last_rerank_latency_ms.setter
+    def last_rerank_latency_ms(self, latency_ms: float):
+        self._local.rerank_latency_ms = latency_ms
+    
+    def _annotate_shared_sources(self, results: List[Dict]):
+        """Add 'shared_by' (other files repeating the chunk) to deduplicated chunks."""
+        for doc in results:
+            references = self.vector_store.duplicate_index.references(doc['id'])
+            if references:
+                doc['shared_by'] = sorted({os.path.basename(ref['source']) for ref in references})
+    
+    def _reciprocal_rank_fusion(self, result_lists: List[List[Dict]]) -> List[Dict]:
+        """
+        Fuse ranked lists: score(d) = sum over lists of 1 / (rrf_k + rank).
+        
+        Rank-based, so dense distances and BM25 scores need no calibration.
+        """
+        fused = {}
+        docs = {}
+        for results in result_lists:
+            for rank, doc in enumerate(results, 1):
+                fused[doc['id']] = fused.get(doc['id'], 0.0) + 1.0 / (self.rrf_k + rank)
+                # Keep the richest copy (dense hits carry 'distance')
+                docs[doc['id']] = {**doc, **docs.get(doc['id'], {})}
+        
+        ranked = sorted(fused, key=fused.get, reverse=True)
+        return [{**docs[doc_id], 'rrf_score': fused[doc_id]} for doc_id in ranked]
+    
+    def _max_marginal_relevance(
+        self,
+        candidates: List[Dict],
+        query_embeddings: np.ndarray,
+        level: str,
+        k: int
+    ) -> List[Dict]:
+        """
+        Pick k diverse candidates by maximal marginal relevance.
+        
+        Each step takes the candidate maximizing
+        lambda * relevance - (1 - lambda) * redundancy, where relevance is the
+        best cosine similarity to any query (or the sigmoid of the
+        cross-encoder score when re-ranked) and redundancy the highest cosine
+        similarity to an already selected chunk. Chunks of programs (source
+        files) not selected yet are preferred, so the examples cover distinct
+        programs while alternatives remain; level matches are still
+        exhausted before other levels.
+        """
+        if len(candidates) <= 1:
+            return candidates[:k]
+        
+        vectors = self.vector_store.get_embeddings([c['id'] for c in candidates])
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        queries = query_embeddings / np.maximum(np.linalg.norm(query_embeddings, axis=1, keepdims=True), 1e-12)
+        
+        if all('rerank_score' in c for c in candidates):
+            relevance = 1.0 / (1.0 + np.exp(-np.array([c['rerank_score'] for c in candidates])))
+        else:
+            relevance = (vectors @ queries.T).max(axis=1)
+        similarity = vectors @ vectors.T
+        
+        level_key = normalize_level(level)
+        tier = np.array([
+            0 if level_key and c.get('metadata', {}).get('level_key') == level_key else 1
+            for c in candidates
+        ])
+        programs = np.array([
+            c.get('metadata', {}).get('filename') or c.get('metadata', {}).get('parent_id') or c['id']
+            for c in candidates
+        ], dtype=object)
+        
+        redundancy = np.zeros(len(candidates))
+        available = np.ones(len(candidates), dtype=bool)
+        seen_program = np.zeros(len(candidates), dtype=bool)
+        selected = []
+        
+        for _ in range(min(k, len(candidates))):
+            priority = tier * 2 + seen_program
+            eligible = available & (priority == priority[available].min())
+            score = self.mmr_lambda * relevance - (1.0 - self.mmr_lambda) * redundancy
+            score[~eligible] = -np.inf
+            best = int(np.argmax(score))
+            
+            selected.append(best)
+            available[best] = False
+            redundancy = np.maximum(redundancy, similarity[best])
+            seen_program |= programs == programs[best]
+        
+        return [candidates[i] for i in selected]
+    
+    def _rank_level_matches_first(self, candidates: List[Dict], level: str) -> List[Dict]:
+        """Stable partition: candidates whose level_key matches come first."""
+        level_key = normalize_level(level)
+        if not level_key:
+            return candidates
+        matches = [c for c in candidates if c.get('metadata', {}).get('level_key') == level_key]
+        others = [c for c in candidates if c.get('metadata', {}).get('level_key') != level_key]
+        return matches + others
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss counters of the caches (and re-ranking latency, if enabled)."""
+        stats = {
+            'query_embeddings': self.query_embedding_cache.stats(),
+            'results': self.result_cache.stats()
+        }
+        if self.reranker is not None:
+            stats['rerank'] = self.reranker.stats()
+        return stats
+    
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed queries in one model call, re-using cached query embeddings."""
+        keys = [_normalize(query) for query in queries]
+        cached = [self.query_embedding_cache.get(key) for key in keys]
+        missing = [i for i, embedding in enumerate(cached) if embedding is None]
+        
+        if missing:
+            computed = self.vector_store.embedder.embed_batch([queries[i] for i in missing])
+            for i, embedding in zip(missing, computed):
+                cached[i] = embedding
+                self.query_embedding_cache.put(keys[i], embedding)
+        
+        return np.vstack(cached)
+    
+    @staticmethod
+    def _interleave(result_lists: List[List[Dict]]) -> List[Dict]:
+        """Merge per-query results rank by rank, dropping duplicate IDs."""
+        merged = []
+        seen = set()
+        for rank in range(max((len(r) for r in result_lists), default=0)):
+            for results in result_lists:
+                if rank < len(results) and results[rank]['id'] not in seen:
+                    seen.add(results[rank]['id'])
+                    merged.append(results[rank])
+        return merged
+    
+    def _check_cache_version(self) -> str:
+        """Drop cached results when the collection content has changed."""
+        version = self.vector_store.get_version()
+        if version != self._cache_version:
+            self.result_cache.clear()
+            if self.reranker is not None:
+                self.reranker.clear_cache()
+            self._cache_version = version
+        return version
+    
+    def format_context_for_llm(self, retrieved_docs: List[Dict], token_budget: Optional[int] = None) -> str:
         """
         Format retrieved documents as context for LLM.
         
+        Documents are packed best-first into the token budget; oversized ones
+        are trimmed at section boundaries. What was trimmed or dropped is
+        kept in self.last_context_report.
+        
         Args:
-            retrieved_docs: Retrieved curriculum examples
+            retrieved_docs: Retrieved curriculum examples, best first
+            token_budget: Override of the retriever's context token budget
             
         Returns:
             Formatted context string
         """
-        if not retrieved_docs:
-            return "No similar curriculum examples found."
-        
-        context_parts = ["Here are some similar curriculum examples for reference:\n"]
-        
-        for i, doc in enumerate(retrieved_docs, 1):
-            metadata = doc.get('metadata', {})
-            content = doc.get('content', '')
-            
-            context_parts.append(f"\n--- Example {i} ---")
-            if metadata:
-                context_parts.append(f"Level: {metadata.get('level', 'N/A')}")
-                context_parts.append(f"Subject: {metadata.get('subject', 'N/A')}")
-            context_parts.append(f"\n{content}\n")
-        
-        return "\n".join(context_parts)
+        context, self.last_context_report = self.context_packer.pack(retrieved_docs, token_budget)
+        return context
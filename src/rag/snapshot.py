@@ -0,0 +1,162 @@
+"""
+Single-file knowledge base snapshots.
+A snapshot holds chunks, metadata, embeddings and index parameters, so a
+fresh deployment can load a ready knowledge base without re-embedding.
+
+Layout (little-endian):
+    8 bytes   magic b"CLKBSNAP"
+    4 bytes   format version (uint32)
+    4 bytes   reserved
+    8 bytes   header length (uint64)
+    header    UTF-8 JSON (ids, documents, metadatas, parameters, manifest,
+              near-duplicate index)
+    padding   up to a 64-byte boundary
+    matrix    float32 embeddings, shape (rows, dimension), row-major
+"""
+import json
+import os
+import struct
+import time
+import uuid
+from typing import Dict, List, Optional
+import numpy as np
+
+
+SNAPSHOT_MAGIC = b"CLKBSNAP"
+SNAPSHOT_VERSION = 1
+PREAMBLE = struct.Struct("<8sIIQ")
+MATRIX_ALIGNMENT = 64
+
+
+class SnapshotError(Exception):
+    """Raised for unreadable or incompatible snapshot files."""
+
+
+class Snapshot:
+    """A loaded snapshot; the embedding matrix is memory-mapped, not read."""
+
+    def __init__(self, path: str, header: Dict, matrix: np.ndarray, matrix_offset: int = 0):
+        self.path = path
+        self.header = header
+        self.matrix = matrix
+        # Byte offset of the matrix in the file, for mapping it elsewhere
+        self.matrix_offset = matrix_offset
+
+    @property
+    def snapshot_id(self) -> str:
+        return self.header['snapshot_id']
+
+    @property
+    def ids(self) -> List[str]:
+        return self.header['ids']
+
+    @property
+    def documents(self) -> List[str]:
+        return self.header['documents']
+
+    @property
+    def metadatas(self) -> List[Dict]:
+        return self.header['metadatas']
+
+    @property
+    def parameters(self) -> Dict:
+        return self.header.get('parameters', {})
+
+    @property
+    def manifest(self) -> Optional[Dict]:
+        return self.header.get('manifest')
+
+    def __len__(self) -> int:
+        return len(self.header['ids'])
+
+
+def write_snapshot(
+    path: str,
+    ids: List[str],
+    documents: List[str],
+    metadatas: List[Dict],
+    embeddings: np.ndarray,
+    parameters: Optional[Dict] = None,
+    manifest: Optional[Dict] = None,
+    near_duplicates: Optional[Dict] = None
+) -> Dict:
+    """
+    Atomically write a snapshot file.
+
+    Args:
+        path: Output file
+        ids: Chunk IDs
+        documents: Chunk texts
+        metadatas: Chunk metadata
+        embeddings: Float32 array of shape (len(ids), dimension)
+        parameters: Index parameters (embedding model, chunker settings, ...)
+        manifest: Ingestion manifest ('config' and 'files') to restore
+        near_duplicates: Serialized NearDuplicateIndex to restore
+
+    Returns:
+        The snapshot header
+    """
+    matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+    if matrix.ndim != 2 or len(matrix) != len(ids):
+        raise ValueError(f"Expected {len(ids)} embedding rows, got shape {matrix.shape}")
+
+    header = {
+        'snapshot_id': uuid.uuid4().hex,
+        'created_at': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        'rows': len(ids),
+        'dimension': int(matrix.shape[1]),
+        'dtype': 'float32',
+        'parameters': parameters or {},
+        'manifest': manifest,
+        'near_duplicates': near_duplicates,
+        'ids': ids,
+        'documents': documents,
+        'metadatas': metadatas
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    matrix_offset = PREAMBLE.size + len(header_bytes)
+    padding = -matrix_offset % MATRIX_ALIGNMENT
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * padding)
+        f.write(matrix.tobytes())
+    os.replace(tmp_path, path)
+    return header
+
+
+def read_snapshot(path: str) -> Snapshot:
+    """
+    Open a snapshot file; the embedding matrix is memory-mapped read-only.
+
+    Raises:
+        SnapshotError: If the file is not a snapshot or has an unknown version
+    """
+    with open(path, 'rb') as f:
+        preamble = f.read(PREAMBLE.size)
+        if len(preamble) < PREAMBLE.size:
+            raise SnapshotError(f"{path} is too short to be a snapshot")
+        magic, version, _, header_length = PREAMBLE.unpack(preamble)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError(f"{path} is not a knowledge base snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version} (expected {SNAPSHOT_VERSION})")
+        header = json.loads(f.read(header_length).decode('utf-8'))
+
+    matrix_offset = PREAMBLE.size + header_length
+    matrix_offset += -matrix_offset % MATRIX_ALIGNMENT
+    rows, dimension = header['rows'], header['dimension']
+    expected_size = matrix_offset + rows * dimension * 4
+    if os.path.getsize(path) < expected_size:
+        raise SnapshotError(f"{path} is truncated ({os.path.getsize(path)} of {expected_size} bytes)")
+
+    if rows:
+        matrix = np.memmap(path, dtype=np.float32, mode='r', offset=matrix_offset, shape=(rows, dimension))
+    else:
+        matrix = np.zeros((0, dimension), dtype=np.float32)
+    return Snapshot(path, header, matrix, matrix_offset)
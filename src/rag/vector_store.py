@@ -1,38 +1,286 @@
 """
-ChromaDB vector store for curriculum knowledge base.
-Persistent, local, free vector database.
+Vector store for curriculum knowledge base.
+Persistent, local, free vector database with pluggable storage backends:
+ChromaDB (default) or an in-process NumPy flat index.
 """
-from typing import List, Dict, Optional
-import chromadb
-from chromadb.config import Settings
+from contextlib import contextmanager, nullcontext
+from typing import List, Dict, Optional, Union
+import numpy as np
+import json
 import os
+import time
 
 
-class CurriculumVectorStore:
-    """ChromaDB-based vector store for curriculum examples."""
+COLLECTION_NAME = "curriculum_knowledge_base"
+
+
+class ChromaBackend:
+    """ChromaDB storage for precomputed embeddings."""
     
-    def __init__(self, persist_directory: str = "./data/vector_db"):
+    name = "chroma"
+    
+    def __init__(self, persist_directory: str):
         """
-        Initialize ChromaDB vector store.
+        Initialize ChromaDB client and collection.
         
         Args:
             persist_directory: Directory for persistent storage
         """
-        self.persist_directory = persist_directory
-        os.makedirs(persist_directory, exist_ok=True)
+        import chromadb
         
         # Initialize ChromaDB client with persistence
         self.client = chromadb.PersistentClient(path=persist_directory)
         
-        # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name="curriculum_knowledge_base",
-            metadata={"description": "Educational curriculum examples and templates"}
+        # Get or create collection (embeddings are always computed by our embedder)
+        self.collection = self._get_or_create_collection()
+    
+    def _get_or_create_collection(self):
+        """Open the curriculum collection without a Chroma-side embedding function."""
+        return self.client.get_or_create_collection(
+            name=COLLECTION_NAME,
+            metadata={"description": "Educational curriculum examples and templates"},
+            embedding_function=None
+        )
+    
+    def count(self) -> int:
+        """Number of stored documents."""
+        return self.collection.count()
+    
+    def add(self, ids: List[str], documents: List[str], embeddings: np.ndarray, metadatas: List[Dict]):
+        """Add documents with precomputed embeddings."""
+        self.collection.add(ids=ids, documents=documents, embeddings=embeddings, metadatas=metadatas)
+    
+    def upsert(self, ids: List[str], documents: List[str], embeddings: np.ndarray, metadatas: List[Dict]):
+        """Add documents or overwrite existing ones with the same IDs."""
+        self.collection.upsert(ids=ids, documents=documents, embeddings=embeddings, metadatas=metadatas)
+    
+    def delete(self, ids: List[str]):
+        """Delete documents by ID."""
+        self.collection.delete(ids=ids)
+    
+    def clear(self):
+        """Remove all documents by recreating the collection."""
+        self.client.delete_collection(name=COLLECTION_NAME)
+        self.collection = self._get_or_create_collection()
+    
+    def bulk_write(self):
+        """No-op: Chroma persists every call incrementally."""
+        return nullcontext()
+    
+    def get(self, ids: List[str]) -> List[Dict]:
+        """Fetch stored documents by ID (unknown IDs are skipped)."""
+        results = self.collection.get(ids=ids)
+        by_id = {
+            doc_id: {'content': doc, 'metadata': metadata or {}, 'id': doc_id}
+            for doc_id, doc, metadata in zip(results['ids'], results['documents'], results['metadatas'])
+        }
+        return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+    
+    def get_embeddings(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        """Fetch stored embeddings by ID (unknown IDs are skipped)."""
+        results = self.collection.get(ids=ids, include=["embeddings"])
+        return {
+            doc_id: np.asarray(embedding, dtype=np.float32)
+            for doc_id, embedding in zip(results['ids'], results['embeddings'])
+        }
+    
+    def get_all(self) -> List[Dict]:
+        """Fetch every stored document."""
+        results = self.collection.get(include=["documents", "metadatas"])
+        return [
+            {'content': doc, 'metadata': metadata or {}, 'id': doc_id}
+            for doc_id, doc, metadata in zip(results['ids'], results['documents'], results['metadatas'])
+        ]
+    
+    def query(self, embeddings: np.ndarray, k: int, where: Optional[Dict] = None) -> List[List[Dict]]:
+        """Top-k search for each query embedding."""
+        results = self.collection.query(
+            query_embeddings=embeddings,
+            n_results=k,
+            where=where
         )
+        return [self._format_results(results, i) for i in range(len(embeddings))]
+    
+    def _format_results(self, results: Dict, query_index: int) -> List[Dict]:
+        """Convert one query's entry of a Chroma result into result dicts."""
+        formatted_results = []
+        documents = results['documents'][query_index] if results['documents'] else []
+        for i, doc in enumerate(documents or []):
+            formatted_results.append({
+                'content': doc,
+                'metadata': results['metadatas'][query_index][i] if results['metadatas'] else {},
+                'distance': results['distances'][query_index][i] if results['distances'] else None,
+                'id': results['ids'][query_index][i] if results['ids'] else None
+            })
+        
+        return formatted_results
+
+
+def create_backend(name: str, persist_directory: str):
+    """
+    Create a storage backend by name.
+    
+    Args:
+        name: "chroma" or "flat" (the flat index honours VECTOR_QUANTIZATION)
+        persist_directory: Directory for persistent storage
+    """
+    if name == "chroma":
+        return ChromaBackend(persist_directory)
+    if name == "flat":
+        from src.rag.flat_index import FlatIndexBackend
+        return FlatIndexBackend(persist_directory, quantization=os.getenv("VECTOR_QUANTIZATION", "none"))
+    raise ValueError(f"Unknown vector store backend: {name} (expected 'chroma' or 'flat')")
+
+
+class CurriculumVectorStore:
+    """Vector store for curriculum examples (ChromaDB or NumPy flat index)."""
+    
+    def __init__(
+        self,
+        persist_directory: str = "./data/vector_db",
+        embedder=None,
+        batch_size: int = 256,
+        backend=None,
+        snapshot_path: Optional[str] = None
+    ):
+        """
+        Initialize vector store.
+        
+        Args:
+            persist_directory: Directory for persistent storage
+            embedder: Object with embed_batch(texts) -> float32 array, e.g.
+                      EmbeddingService (created lazily on first use if None)
+            batch_size: Documents embedded and written per call
+            backend: "chroma", "flat" or a backend instance
+                     (default: VECTOR_BACKEND environment variable, else "chroma")
+            snapshot_path: Knowledge base snapshot loaded at startup unless
+                           already loaded (default: VECTOR_SNAPSHOT
+                           environment variable, else none)
+        """
+        self.persist_directory = persist_directory
+        self.version_path = os.path.join(persist_directory, "collection.version")
+        self.batch_size = batch_size
+        self._embedder = embedder
+        self._lexical_index = None
+        self._duplicate_index = None
+        # Set while bulk_write() defers the BM25 save and version bump
+        self._bulk = False
+        self._bulk_dirty = False
+        os.makedirs(persist_directory, exist_ok=True)
+        
+        if backend is None:
+            backend = os.getenv("VECTOR_BACKEND", "chroma")
+        if isinstance(backend, str):
+            backend = create_backend(backend, persist_directory)
+        self.backend = backend
+        
+        if snapshot_path is None:
+            snapshot_path = os.getenv("VECTOR_SNAPSHOT")
+        if snapshot_path:
+            self._load_snapshot_at_startup(snapshot_path)
+        
+        print(f"Vector store initialized at: {persist_directory}")
+        print(f"  Backend: {self.backend.name}")
+        print(f"  Documents: {self.backend.count()}")
+    
+    @property
+    def embedder(self):
+        """Embedding backend (defaults to a local EmbeddingService)."""
+        if self._embedder is None:
+            from src.rag.embeddings import EmbeddingService
+            self._embedder = EmbeddingService()
+        return self._embedder
+    
+    @property
+    def lexical_index(self):
+        """BM25 index over the same chunks, persisted next to the vector data."""
+        if self._lexical_index is None:
+            from src.rag.bm25 import BM25Index
+            self._lexical_index = BM25Index(
+                os.path.join(self.persist_directory, f"bm25_index.{self.backend.name}.json")
+            )
+        return self._lexical_index
+    
+    @property
+    def duplicate_index(self):
+        """Near-duplicate (MinHash/LSH) index of the stored chunks, maintained at ingestion."""
+        if self._duplicate_index is None:
+            from src.rag.dedup import NearDuplicateIndex
+            self._duplicate_index = NearDuplicateIndex(
+                os.path.join(self.persist_directory, f"near_duplicates.{self.backend.name}.json")
+            )
+        return self._duplicate_index
+    
+    @property
+    def manifest_path(self) -> str:
+        """Ingestion manifest of this store (one per backend, as each keeps its own chunks)."""
+        filename = "ingest_manifest.json" if self.backend.name == "chroma" else f"ingest_manifest.{self.backend.name}.json"
+        return os.path.join(self.persist_directory, filename)
+    
+    def get_version(self) -> str:
+        """
+        Token that changes whenever the collection content changes.
+        
+        Shared through a file in persist_directory, so writes made by other
+        processes (e.g. populate_knowledge_base.py) are picked up too.
+        """
+        try:
+            with open(self.version_path, 'r') as f:
+                return f.read().strip()
+        except OSError:
+            return ""
+    
+    def _bump_version(self):
+        """Record that the collection content changed."""
+        tmp_path = f"{self.version_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(str(time.time_ns()))
+        os.replace(tmp_path, self.version_path)
+    
+    @contextmanager
+    def bulk_write(self):
+        """
+        Group the writes of a whole sync into one commit.
+        
+        The flat backend rewrites its files once when the block exits
+        instead of once per batch; the BM25 index is saved and the version
+        bumped once, so readers never cache results of half-written data.
+        """
+        if self._bulk:
+            yield
+            return
         
-        print(f"ChromaDB initialized at: {persist_directory}")
-        print(f"  Collection: {self.collection.name}")
-        print(f"  Documents: {self.collection.count()}")
+        self._bulk = True
+        try:
+            with self.backend.bulk_write():
+                yield
+        finally:
+            self._bulk = False
+            if self._bulk_dirty:
+                self._bulk_dirty = False
+                self.lexical_index.save()
+                self._bump_version()
+    
+    def _changed(self, save_lexical: bool = True):
+        """Persist the BM25 index and bump the version, or leave both to bulk_write()."""
+        if self._bulk:
+            self._bulk_dirty = True
+            return
+        if save_lexical:
+            self.lexical_index.save()
+        self._bump_version()
+    
+    def _write_batches(self, write, documents: List[str], metadatas: List[Dict], ids: List[str]):
+        """Embed and write documents in batches of batch_size."""
+        for start in range(0, len(documents), self.batch_size):
+            end = start + self.batch_size
+            batch = documents[start:end]
+            write(
+                documents=batch,
+                embeddings=self.embedder.embed_batch(batch),
+                metadatas=metadatas[start:end],
+                ids=ids[start:end]
+            )
     
     def add_documents(
         self,
@@ -50,21 +298,82 @@ class CurriculumVectorStore:
         """
         if ids is None:
             # Auto-generate IDs
-            existing_count = self.collection.count()
+            existing_count = self.backend.count()
             ids = [f"doc_{existing_count + i}" for i in range(len(documents))]
         
         if metadatas is None:
             metadatas = [{}] * len(documents)
         
-        # ChromaDB automatically generates embeddings
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        self._write_batches(self.backend.add, documents, metadatas, ids)
+        self.lexical_index.upsert(ids, documents)
+        self._changed()
         
         print(f"Added {len(documents)} documents to vector store")
     
+    def upsert_documents(
+        self,
+        documents: List[str],
+        metadatas: List[Dict],
+        ids: List[str]
+    ):
+        """
+        Insert new documents or overwrite existing ones with the same IDs.
+        
+        Args:
+            documents: List of curriculum text documents
+            metadatas: Metadata for each document
+            ids: Document IDs
+        """
+        if not documents:
+            return
+        
+        self._write_batches(self.backend.upsert, documents, metadatas, ids)
+        self.lexical_index.upsert(ids, documents)
+        self._changed()
+        
+        print(f"Upserted {len(documents)} documents in vector store")
+    
+    def upsert_embedded(
+        self,
+        documents: List[str],
+        embeddings: np.ndarray,
+        metadatas: List[Dict],
+        ids: List[str],
+        save_lexical: bool = True
+    ):
+        """
+        Upsert documents whose embeddings were already computed (ingestion pipeline).
+        
+        Args:
+            documents: List of curriculum text documents
+            embeddings: Float32 array of shape (len(documents), dimension)
+            metadatas: Metadata for each document
+            ids: Document IDs
+            save_lexical: Persist the BM25 index now; batch writers save it
+                          once at the end instead
+        """
+        if not documents:
+            return
+        
+        self.backend.upsert(ids=ids, documents=documents, embeddings=embeddings, metadatas=metadatas)
+        self.lexical_index.upsert(ids, documents)
+        self._changed(save_lexical)
+    
+    def delete_documents(self, ids: List[str]):
+        """
+        Delete documents by ID.
+        
+        Args:
+            ids: Document IDs to remove
+        """
+        if not ids:
+            return
+        
+        self.backend.delete(ids)
+        self.lexical_index.delete(ids)
+        self._changed()
+        print(f"Deleted {len(ids)} documents from vector store")
+    
     def similarity_search(
         self,
         query: str,
@@ -78,38 +387,305 @@ class CurriculumVectorStore:
             query: Search query
             k: Number of results to return
             filter_metadata: Optional metadata filters
+        
+        Returns:
+            List of matching documents with metadata and scores
+        """
+        return self.similarity_search_by_vector(
+            self.embedder.embed_text(query),
+            k=k,
+            filter_metadata=filter_metadata
+        )
+    
+    def similarity_search_by_vector(
+        self,
+        embedding: np.ndarray,
+        k: int = 3,
+        filter_metadata: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        Search with a precomputed query embedding.
+        
+        Args:
+            embedding: Query embedding from the store's embedder
+            k: Number of results to return
+            filter_metadata: Optional metadata filters
             
         Returns:
             List of matching documents with metadata and scores
         """
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=k,
-            where=filter_metadata
+        embeddings = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        return self.similarity_search_by_vectors(embeddings, k=k, filters=filter_metadata)[0]
+    
+    def similarity_search_batch(
+        self,
+        queries: List[str],
+        k: int = 3,
+        filters: Optional[Union[Dict, List[Optional[Dict]]]] = None
+    ) -> List[List[Dict]]:
+        """
+        Search for several queries at once.
+        
+        All queries are embedded in one model call and searched with one
+        vectorized query per distinct filter.
+        
+        Args:
+            queries: Search queries
+            k: Number of results per query
+            filters: One metadata filter for all queries, or one per query
+            
+        Returns:
+            One result list (as in similarity_search) per query
+        """
+        if not queries:
+            return []
+        return self.similarity_search_by_vectors(self.embedder.embed_batch(queries), k=k, filters=filters)
+    
+    def similarity_search_by_vectors(
+        self,
+        embeddings: np.ndarray,
+        k: int = 3,
+        filters: Optional[Union[Dict, List[Optional[Dict]]]] = None
+    ) -> List[List[Dict]]:
+        """
+        Search with a matrix of precomputed query embeddings.
+        
+        Args:
+            embeddings: Float32 array of shape (num_queries, dimension)
+            k: Number of results per query
+            filters: One metadata filter for all queries, or one per query
+            
+        Returns:
+            One result list per query
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if filters is None or isinstance(filters, dict):
+            filters = [filters] * len(embeddings)
+        if len(filters) != len(embeddings):
+            raise ValueError("filters must have one entry per query")
+        
+        # Group queries sharing a filter so each group is a single backend call
+        groups = {}
+        for i, where in enumerate(filters):
+            key = json.dumps(where, sort_keys=True)
+            groups.setdefault(key, (where, []))[1].append(i)
+        
+        all_results = [[] for _ in range(len(embeddings))]
+        for where, rows in groups.values():
+            results = self.backend.query(embeddings[rows], k, where)
+            for row, row_results in zip(rows, results):
+                all_results[row] = row_results
+        
+        return all_results
+    
+    def get_documents(self, ids: List[str]) -> List[Dict]:
+        """
+        Fetch stored documents by ID.
+        
+        Args:
+            ids: Document IDs (unknown IDs are skipped)
+            
+        Returns:
+            Documents with 'content', 'metadata' and 'id', in the order of ids
+        """
+        if not ids:
+            return []
+        return self.backend.get(ids)
+    
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        """
+        Fetch stored embeddings by ID.
+        
+        Args:
+            ids: Document IDs (all must exist)
+            
+        Returns:
+            Float32 array of shape (len(ids), dimension), in the order of ids
+        """
+        if not ids:
+            return np.zeros((0, 0), dtype=np.float32)
+        by_id = self.backend.get_embeddings(ids)
+        missing = [doc_id for doc_id in ids if doc_id not in by_id]
+        if missing:
+            raise KeyError(f"No stored embedding for IDs: {missing[:5]}")
+        return np.vstack([by_id[doc_id] for doc_id in ids])
+    
+    def lexical_search(
+        self,
+        query: str,
+        k: int = 10,
+        filter_metadata: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        BM25 keyword search over the stored chunks.
+        
+        Args:
+            query: Search query
+            k: Number of results to return
+            filter_metadata: Optional metadata filters
+            
+        Returns:
+            List of matching documents with metadata and 'bm25_score'
+        """
+        from src.rag.metadata import matches_where
+        
+        fetch_k = k * 4 if filter_metadata else k
+        hits = self.lexical_index.search(query, k=fetch_k)
+        scores = dict(hits)
+        
+        results = []
+        for doc in self.get_documents([doc_id for doc_id, _ in hits]):
+            if matches_where(doc['metadata'], filter_metadata):
+                doc['bm25_score'] = scores[doc['id']]
+                results.append(doc)
+        return results[:k]
+    
+    def rebuild_lexical_index(self):
+        """Rebuild the BM25 index from every document in the backend."""
+        documents = self.backend.get_all()
+        self.lexical_index.clear()
+        self.lexical_index.upsert([d['id'] for d in documents], [d['content'] for d in documents])
+        self.lexical_index.save()
+        print(f"Rebuilt lexical index ({len(documents)} documents)")
+    
+    def export_snapshot(self, path: str, parameters: Optional[Dict] = None) -> Dict:
+        """
+        Write every chunk, its metadata and embedding to a snapshot file.
+        
+        Args:
+            path: Output file
+            parameters: Extra index parameters to record (e.g. chunker settings)
+            
+        Returns:
+            The snapshot header
+        """
+        from src.rag.manifest import IngestionManifest
+        from src.rag.snapshot import write_snapshot
+        
+        documents = self.backend.get_all()
+        ids = [d['id'] for d in documents]
+        embeddings = self.get_embeddings(ids) if ids else np.zeros((0, 0), dtype=np.float32)
+        
+        manifest = None
+        if os.path.exists(self.manifest_path):
+            loaded = IngestionManifest(self.manifest_path)
+            manifest = {'config': loaded.config, 'files': loaded.files}
+        
+        header = write_snapshot(
+            path,
+            ids,
+            [d['content'] for d in documents],
+            [d['metadata'] for d in documents],
+            embeddings,
+            parameters={
+                'backend': self.backend.name,
+                'embedding_model': getattr(self._embedder, 'model_name', None),
+                'normalized': True,
+                'bm25': {'k1': self.lexical_index.k1, 'b': self.lexical_index.b},
+                **(parameters or {})
+            },
+            manifest=manifest,
+            near_duplicates=self.duplicate_index.to_dict()
         )
+        print(f"Exported {len(ids)} documents to snapshot {path}")
+        return header
+    
+    def import_snapshot(self, path: str):
+        """
+        Replace the store content with a snapshot, without re-embedding.
         
-        # Format results
-        formatted_results = []
-        if results['documents'] and results['documents'][0]:
-            for i, doc in enumerate(results['documents'][0]):
-                formatted_results.append({
-                    'content': doc,
-                    'metadata': results['metadatas'][0][i] if results['metadatas'] else {},
-                    'distance': results['distances'][0][i] if results['distances'] else None,
-                    'id': results['ids'][0][i] if results['ids'] else None
-                })
+        Also restores the ingestion manifest (so later incremental syncs
+        only embed what changed) and rebuilds the lexical index.
         
-        return formatted_results
+        Args:
+            path: Snapshot file written by export_snapshot()
+        """
+        from src.rag.manifest import IngestionManifest
+        from src.rag.snapshot import read_snapshot
+        
+        snapshot = read_snapshot(path)
+        model = snapshot.parameters.get('embedding_model')
+        current_model = getattr(self._embedder, 'model_name', None)
+        if model and current_model and model != current_model:
+            print(f"WARNING Snapshot embeddings come from {model}, but this store embeds queries with {current_model}")
+        
+        # A half-finished import must not pass for a loaded snapshot
+        if os.path.exists(self._snapshot_marker_path()):
+            os.remove(self._snapshot_marker_path())
+        
+        if hasattr(self.backend, 'load_snapshot') and snapshot.parameters.get('normalized'):
+            # The flat index maps the snapshot's matrix in place
+            self.backend.load_snapshot(snapshot)
+        else:
+            with self.backend.bulk_write():
+                self.backend.clear()
+                for start in range(0, len(snapshot), self.batch_size):
+                    end = start + self.batch_size
+                    self.backend.upsert(
+                        ids=snapshot.ids[start:end],
+                        documents=snapshot.documents[start:end],
+                        embeddings=np.asarray(snapshot.matrix[start:end]),
+                        metadatas=snapshot.metadatas[start:end]
+                    )
+        
+        self.lexical_index.clear()
+        self.lexical_index.upsert(snapshot.ids, snapshot.documents)
+        self.lexical_index.save()
+        
+        self.duplicate_index.clear()
+        if snapshot.header.get('near_duplicates'):
+            self.duplicate_index.from_dict(snapshot.header['near_duplicates'])
+        self.duplicate_index.save()
+        
+        if snapshot.manifest is not None:
+            manifest = IngestionManifest(self.manifest_path)
+            manifest.config = snapshot.manifest.get('config', {})
+            manifest.files = snapshot.manifest.get('files', {})
+            manifest.save()
+        
+        with open(self._snapshot_marker_path(), 'w') as f:
+            f.write(snapshot.snapshot_id)
+        self._bump_version()
+        print(f"Imported {len(snapshot)} documents from snapshot {path} ({snapshot.header['created_at']})")
+    
+    def _snapshot_marker_path(self) -> str:
+        """File recording which snapshot the store was last loaded from."""
+        return os.path.join(self.persist_directory, f"snapshot.{self.backend.name}.id")
+    
+    def _load_snapshot_at_startup(self, path: str):
+        """
+        Import a snapshot unless this exact snapshot is already loaded.
+        
+        A store loaded from the snapshot and updated by incremental syncs
+        since then is kept as it is, rather than rebuilt on every start.
+        """
+        from src.rag.snapshot import read_snapshot
+        
+        if not os.path.exists(path):
+            print(f"WARNING Snapshot {path} not found; starting with the existing store")
+            return
+        
+        snapshot = read_snapshot(path)
+        try:
+            with open(self._snapshot_marker_path(), 'r') as f:
+                loaded_id = f.read().strip()
+        except OSError:
+            loaded_id = None
+        
+        if loaded_id == snapshot.snapshot_id and (self.backend.count() > 0 or len(snapshot) == 0):
+            return
+        self.import_snapshot(path)
     
     def get_count(self) -> int:
         """Get total number of documents in vector store."""
-        return self.collection.count()
+        return self.backend.count()
     
     def clear(self):
         """Clear all documents from vector store."""
-        self.client.delete_collection(name="curriculum_knowledge_base")
-        self.collection = self.client.create_collection(
-            name="curriculum_knowledge_base",
-            metadata={"description": "Educational curriculum examples and templates"}
-        )
+        self.backend.clear()
+        self.lexical_index.clear()
+        self.lexical_index.save()
+        self.duplicate_index.clear()
+        self.duplicate_index.save()
+        self._bump_version()
         print("Vector store cleared")
@@ -0,0 +1,113 @@
+"""
+Polling watcher for the knowledge base folder.
+Detects added, modified and removed curriculum files by their modification
+time and size, waits until the folder has been quiet for a debounce period
+(a committee copying twenty files triggers one sync, not twenty) and then
+hands the changed paths to a callback, typically an incremental sync.
+"""
+import glob
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+
+class KnowledgeBaseWatcher:
+    """Debounced change detection by polling file stats (portable, no inotify needed)."""
+
+    def __init__(
+        self,
+        path: str,
+        on_change: Callable[[Set[str]], None],
+        extensions: Iterable[str] = ('.md',),
+        interval: float = 2.0,
+        debounce: float = 3.0
+    ):
+        """
+        Initialize watcher.
+
+        Args:
+            path: Folder watched recursively
+            on_change: Called with the set of added/modified/removed paths
+                       once changes have settled; if it raises, the same
+                       changes are reported again on the next poll
+            extensions: File extensions to watch
+            interval: Seconds between polls
+            debounce: Seconds without further changes before on_change runs
+        """
+        self.path = path
+        self.on_change = on_change
+        self.extensions = tuple(extensions)
+        self.interval = interval
+        self.debounce = debounce
+        self._snapshot = self.scan()
+        self._pending: Set[str] = set()
+        self._last_change: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.syncs = 0
+        self.failures = 0
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """Current (mtime_ns, size) of every watched file."""
+        snapshot = {}
+        for extension in self.extensions:
+            for filepath in glob.glob(f"{self.path}/**/*{extension}", recursive=True):
+                try:
+                    stat = os.stat(filepath)
+                except OSError:
+                    continue
+                snapshot[filepath] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, now: Optional[float] = None) -> Optional[Set[str]]:
+        """
+        Check the folder once.
+
+        Returns:
+            The changed paths if they have settled and on_change ran
+            successfully, else None
+        """
+        now = time.monotonic() if now is None else now
+        current = self.scan()
+        changed = {
+            filepath for filepath in current.keys() | self._snapshot.keys()
+            if current.get(filepath) != self._snapshot.get(filepath)
+        }
+        if changed:
+            self._pending |= changed
+            self._last_change = now
+            self._snapshot = current
+
+        if not self._pending or now - self._last_change < self.debounce:
+            return None
+
+        changed, self._pending = self._pending, set()
+        try:
+            self.on_change(changed)
+        except Exception as e:
+            self.failures += 1
+            print(f"WARNING Knowledge base sync failed, retrying on the next poll: {e}")
+            self._pending |= changed
+            return None
+        self.syncs += 1
+        return changed
+
+    def run(self):
+        """Poll until stop() is called."""
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def start(self) -> threading.Thread:
+        """Poll on a daemon thread (no-op if already running)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="knowledge-base-watcher", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """Stop polling and wait for a running sync to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,67 @@
+"""
+Streamlit helpers shared by the generation pages.
+"""
+import time
+from itertools import chain
+
+import streamlit as st
+
+from src.llm.rate_limiter import format_wait
+
+
+def show_queue_notice(wait: float, limit: str):
+    """Tell the user their request is queued behind the Gemini rate limit (GeminiClient on_wait)."""
+    st.info(f"⏳ Gemini {limit} limit reached: your request is queued and starts in ~{format_wait(wait)}")
+
+
+def stream_response(
+    llm_client,
+    prompt: str,
+    spinner_text: str = "Generating...",
+    language: str = "json",
+    refresh_seconds: float = 0.15,
+    **kwargs
+) -> str:
+    """
+    Show a response while it is generated, then remove the preview.
+
+    Users see output after the time to first token instead of staring at a
+    spinner until the whole response has arrived: the spinner is only shown
+    until the first chunk, so pages must not wrap this call in their own.
+
+    Args:
+        llm_client: GeminiClient
+        prompt: Input prompt
+        spinner_text: Shown until the first chunk arrives
+        language: Syntax highlighting of the live preview
+        refresh_seconds: Minimum time between preview redraws (each redraw
+                         resends the whole text to the browser)
+        **kwargs: Passed to generate_stream (temperature, scenario, semantic_text, ...)
+
+    Returns:
+        The full response text
+    """
+    kwargs.setdefault("on_wait", show_queue_notice)
+    status = st.empty()
+    preview = st.empty()
+    parts = []
+    started = time.perf_counter()
+    last_drawn = 0.0
+
+    try:
+        chunks = iter(llm_client.generate_stream(prompt, **kwargs))
+        with st.spinner(spinner_text):
+            first = next(chunks, None)
+        for chunk in chain([] if first is None else [first], chunks):
+            parts.append(chunk)
+            now = time.perf_counter()
+            if now - last_drawn >= refresh_seconds:
+                status.caption(f"Receiving response... {sum(len(part) for part in parts):,} characters "
+                               f"({now - started:.1f}s)")
+                preview.code("".join(parts), language=language)
+                last_drawn = now
+    finally:
+        # Pages render the parsed result (or the error) instead
+        status.empty()
+        preview.empty()
+    return "".join(parts)
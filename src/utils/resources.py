@@ -0,0 +1,204 @@
+"""
+Process-wide registry of heavy shared resources.
+Streamlit re-runs page scripts for every interaction and every session, but
+imports modules once per server process; resources kept here (embedding
+model, vector store, LLM client) are created once and shared by all pages
+and sessions.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class ResourceRegistry:
+    """Lazily initialized, thread-safe named singletons."""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._init_seconds: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self._warm_up_started = False
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """
+        Register how to build a resource (replaces any existing instance).
+
+        Args:
+            name: Resource name
+            factory: Zero-argument callable creating the resource
+        """
+        with self._registry_lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        """
+        Return the shared instance, creating it on first use.
+
+        Concurrent first calls block until the single creation finishes;
+        a failed creation is not cached, so the next call retries.
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._registry_lock:
+            if name not in self._factories:
+                raise KeyError(f"Unknown resource: {name}")
+            lock = self._locks[name]
+            factory = self._factories[name]
+
+        with lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                start = time.perf_counter()
+                instance = factory()
+                self._init_seconds[name] = time.perf_counter() - start
+                self._instances[name] = instance
+        return instance
+
+    def is_initialized(self, name: str) -> bool:
+        """Check whether a resource has been created."""
+        return name in self._instances
+
+    def warm_up(self, names: Iterable[str], background: bool = True) -> Optional[threading.Thread]:
+        """
+        Create resources ahead of the first request (at most once per process).
+
+        Failures are printed, not raised; the resource is retried on first use.
+
+        Args:
+            names: Resources to create, in order
+            background: Run in a daemon thread instead of blocking the caller
+
+        Returns:
+            The warm-up thread (None when run in the foreground or already started)
+        """
+        names = list(names)
+        with self._registry_lock:
+            if self._warm_up_started:
+                return None
+            self._warm_up_started = True
+
+        def run():
+            for name in names:
+                try:
+                    self.get(name)
+                    print(f"Warmed up {name} in {self._init_seconds.get(name, 0.0):.1f}s")
+                except Exception as e:
+                    print(f"WARNING Warm-up of {name} failed: {e}")
+
+        if not background:
+            run()
+            return None
+
+        thread = threading.Thread(target=run, name="resource-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> Dict[str, Dict]:
+        """Which resources exist and how long each took to create."""
+        with self._registry_lock:
+            names = list(self._factories)
+        return {
+            name: {
+                'initialized': name in self._instances,
+                'init_seconds': self._init_seconds.get(name)
+            }
+            for name in names
+        }
+
+
+def _create_embedder():
+    from src.rag.embeddings import EmbeddingService
+    embedder = EmbeddingService()
+    # First encode initializes tokenizer and kernels; pay it here, not per request
+    embedder.embed_batch(["warm-up"])
+    return embedder
+
+
+def _create_vector_store():
+    from src.rag.vector_store import CurriculumVectorStore
+    return CurriculumVectorStore(embedder=registry.get("embedder"))
+
+
+def _create_retriever():
+    from src.rag.retriever import CurriculumRetriever
+    from src.rag.reranker import CrossEncoderReranker, rerank_scenarios_from_env
+    scenarios = rerank_scenarios_from_env()
+    # The cross-encoder is only loaded if some scenario re-ranks
+    reranker = CrossEncoderReranker() if scenarios else None
+    return CurriculumRetriever(registry.get("vector_store"), reranker=reranker, rerank_scenarios=scenarios)
+
+
+def _create_knowledge_base_watcher():
+    from populate_knowledge_base import create_watcher, sync_knowledge_base
+    from src.rag.manifest import IngestionManifest
+    vector_store = registry.get("vector_store")
+    manifest = IngestionManifest(vector_store.manifest_path)
+    # Catch up on changes made while the server was down, then follow live
+    # ones; syncs stay serial so no worker processes are forked from the server
+    sync_knowledge_base(vector_store, manifest)
+    watcher = create_watcher(vector_store, manifest)
+    watcher.start()
+    return watcher
+
+
+def _create_llm_client():
+    from src.llm.client import GeminiClient
+    from src.llm.rate_limiter import RateLimiter
+    from src.llm.response_cache import ResponseCache
+    from src.llm.semantic_cache import SemanticResponseCache
+    response_cache = ResponseCache.from_env()
+    return GeminiClient(
+        response_cache=response_cache,
+        semantic_cache=SemanticResponseCache.from_env(response_cache, lambda: registry.get("embedder")),
+        rate_limiter=RateLimiter.from_env(),
+        max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+    )
+
+
+registry = ResourceRegistry()
+registry.register("embedder", _create_embedder)
+registry.register("vector_store", _create_vector_store)
+registry.register("retriever", _create_retriever)
+registry.register("llm_client", _create_llm_client)
+registry.register("knowledge_base_watcher", _create_knowledge_base_watcher)
+
+# Created when the server starts (see app.py): only what the pages use. The
+# pages call get_llm_client(), which also loads the embedder if the semantic
+# cache is on; the vector store and retriever are created on first use.
+# KNOWLEDGE_BASE_WATCH=1 also syncs data/knowledge_base into the shared
+# store whenever it changes
+WARM_UP_RESOURCES = ("llm_client",)
+if os.getenv("KNOWLEDGE_BASE_WATCH", "").lower() in ("1", "true", "yes"):
+    WARM_UP_RESOURCES += ("knowledge_base_watcher",)
+
+
+def warm_up(background: bool = True) -> Optional[threading.Thread]:
+    """Create the shared resources ahead of the first request."""
+    return registry.warm_up(WARM_UP_RESOURCES, background=background)
+
+
+def get_embedder():
+    """Shared EmbeddingService."""
+    return registry.get("embedder")
+
+
+def get_vector_store():
+    """Shared CurriculumVectorStore (uses the shared embedder)."""
+    return registry.get("vector_store")
+
+
+def get_retriever():
+    """Shared CurriculumRetriever (its caches are shared across sessions too)."""
+    return registry.get("retriever")
+
+
+def get_llm_client():
+    """Shared GeminiClient."""
+    return registry.get("llm_client")
@@ -0,0 +1,36 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from benchmark_retrieval import evaluate_query
+import unittest
+
+
+def result(filename, section=''):
+    return {'metadata': {'filename': f"data/knowledge_base/x/{filename}", 'section': section}}
+
+
+class TestEvaluateQuery(unittest.TestCase):
+    def test_recall_and_reciprocal_rank(self):
+        query = {'expected_files': ['a.md', 'b.md']}
+        metrics = evaluate_query(query, [result('c.md'), result('a.md'), result('b.md')], [1, 3])
+
+        self.assertEqual(metrics['reciprocal_rank'], 0.5)
+        self.assertEqual(metrics['recall@1'], 0.0)
+        self.assertEqual(metrics['recall@3'], 1.0)
+        self.assertNotIn('section_hit@1', metrics)
+
+    def test_section_hits(self):
+        query = {'expected_files': ['a.md'], 'expected_sections': ['Surveying']}
+        metrics = evaluate_query(query, [result('a.md', 'Intro'), result('a.md', '20CE21001- Surveying')], [1, 2])
+
+        self.assertEqual(metrics['section_hit@1'], 0.0)
+        self.assertEqual(metrics['section_hit@2'], 1.0)
+
+    def test_no_relevant_results(self):
+        metrics = evaluate_query({'expected_files': ['a.md']}, [result('b.md')], [1])
+        self.assertEqual(metrics['reciprocal_rank'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.bm25 import BM25Index, tokenize
+import tempfile
+import unittest
+
+
+class TestBM25Index(unittest.TestCase):
+    def test_tokenize_keeps_course_codes(self):
+        self.assertEqual(tokenize("The 20CS11001 DBMS course"), ['20cs11001', 'dbms'])
+
+    def test_exact_terms_rank_first(self):
+        index = BM25Index()
+        index.upsert(
+            ['a', 'b', 'c'],
+            ["Database Management Systems DBMS lab",
+             "Operating systems and computer networks",
+             "Machine learning with Python"]
+        )
+
+        results = index.search("DBMS", k=2)
+        self.assertEqual([doc_id for doc_id, _ in results], ['a'])
+
+    def test_upsert_replaces_and_delete_removes(self):
+        index = BM25Index()
+        index.upsert(['a'], ["compiler design"])
+        index.upsert(['a'], ["cloud computing"])
+        self.assertEqual(index.search("compiler"), [])
+        self.assertEqual(index.search("cloud")[0][0], 'a')
+
+        index.delete(['a'])
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.search("cloud"), [])
+
+    def test_persistence_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bm25.json')
+            index = BM25Index(path)
+            index.upsert(['a', 'b'], ["data structures", "digital logic"])
+            index.save()
+
+            loaded = BM25Index(path)
+            self.assertEqual(len(loaded), 2)
+            self.assertEqual(loaded.search("logic")[0][0], 'b')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.chunker import MarkdownChunker
+import unittest
+
+
+SAMPLE = """# BTech in Artificial Intelligence
+
+**Level:** BTech
+
+## Semester 1 (20 Credits)
+- **CS101** - Programming Fundamentals (4 credits) - Core
+- **MA101** - Calculus I (4 credits) - Core
+
+## Semester 2 (20 Credits)
+- **CS201** - Data Structures (4 credits) - Core
+
+| Code | Course | Credits |
+|------|--------|---------|
+| CS202 | Digital Logic Design | 3 |
+| CS203L | Data Structures Lab | 3 |
+"""
+
+
+class TestMarkdownChunker(unittest.TestCase):
+    def test_splits_on_semester_sections(self):
+        chunker = MarkdownChunker(max_chars=200, overlap_chars=0, min_chars=50)
+        sections = chunker.split_sections(SAMPLE)
+
+        titles = [s['title'] for s in sections]
+        self.assertIn('Semester 1 (20 Credits)', titles)
+        self.assertIn('Semester 2 (20 Credits)', titles)
+        semester_2 = sections[titles.index('Semester 2 (20 Credits)')]
+        self.assertEqual(semester_2['semester'], 'Semester 2 (20 Credits)')
+        # The course table stays together as one block
+        self.assertTrue(any(b.startswith('| Code') and 'CS203L' in b for b in semester_2['blocks']))
+
+    def test_chunks_are_capped_and_carry_parent_metadata(self):
+        chunker = MarkdownChunker(max_chars=120, overlap_chars=30, min_chars=40)
+        chunks = chunker.chunk_document(SAMPLE * 5, {'source': 'btech_ai.md', 'level': 'BTech'}, 'ml_btech_ai')
+
+        self.assertGreater(len(chunks), 5)
+        for i, chunk in enumerate(chunks):
+            self.assertEqual(chunk['id'], f"ml_btech_ai::chunk_{i:04d}")
+            self.assertEqual(chunk['metadata']['parent_id'], 'ml_btech_ai')
+            self.assertEqual(chunk['metadata']['source'], 'btech_ai.md')
+            self.assertEqual(chunk['metadata']['chunk_index'], i)
+            self.assertLessEqual(len(chunk['content']), 120 + 30 + 2)
+
+    def test_large_table_keeps_header_in_every_piece(self):
+        rows = "\n".join(f"| 20CS{i:05d} | Course {i} | 3 |" for i in range(60))
+        table = "| Code | Course | Credits |\n|---|---|---|\n" + rows
+        chunker = MarkdownChunker(max_chars=300, overlap_chars=0)
+        chunks = chunker.chunk_text(table)
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertTrue(chunk['content'].startswith("| Code | Course | Credits |\n|---|---|---|"))
+            self.assertLessEqual(len(chunk['content']), 300)
+
+    def test_overlap_repeats_tail_of_previous_chunk(self):
+        chunker = MarkdownChunker(max_chars=100, overlap_chars=40, min_chars=10)
+        text = "\n".join(f"line number {i} of the syllabus" for i in range(20))
+        chunks = chunker.chunk_text(text)
+
+        self.assertGreater(len(chunks), 1)
+        last_line_of_first = chunks[0]['content'].split('\n')[-1]
+        self.assertIn(last_line_of_first, chunks[1]['content'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.llm.client import GeminiClient
+from src.llm.response_cache import ResponseCache
+import asyncio
+import tempfile
+import unittest
+import weakref
+from unittest import mock
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class StreamingModels:
+    def __init__(self, chunks, failures=0, fail_after=None):
+        self.chunks = chunks
+        self.failures = failures
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def generate_content_stream(self, model, contents, config):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("connection reset")
+        for index, text in enumerate(self.chunks):
+            if index == self.fail_after:
+                raise ConnectionError("stream interrupted")
+            yield Chunk(text)
+
+
+class AsyncModels:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content(self, model, contents, config):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("connection reset")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return Chunk(f"answer to {contents}")
+
+
+def make_client(models, cache=None, aio_models=None, max_concurrency=4):
+    client = GeminiClient.__new__(GeminiClient)
+    client.model_name = "models/test"
+    client.client = type('Client', (), {'models': models, 'aio': type('Aio', (), {'models': aio_models})()})()
+    client.response_cache = cache
+    client.semantic_cache = None
+    client.rate_limiter = None
+    client.max_concurrency = max_concurrency
+    client._semaphores = weakref.WeakKeyDictionary()
+    return client
+
+
+class TestGenerateStream(unittest.TestCase):
+    def test_chunks_are_yielded_and_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            models = StreamingModels(['{"weeks": ', '', '[1, 2]', '}'])
+            client = make_client(models, ResponseCache(os.path.join(tmp, 'responses.sqlite3')))
+
+            chunks = list(client.generate_stream("plan", scenario="course_structure"))
+            self.assertEqual(chunks, ['{"weeks": ', '[1, 2]', '}'])
+
+            self.assertEqual(list(client.generate_stream("plan", scenario="course_structure")), ['{"weeks": [1, 2]}'])
+            self.assertEqual(models.calls, 1)
+
+    @mock.patch('src.llm.client.time.sleep')
+    def test_retries_only_before_the_first_chunk(self, sleep):
+        client = make_client(StreamingModels(['a', 'b'], failures=2))
+        self.assertEqual("".join(client.generate_stream("plan")), 'ab')
+        self.assertEqual(sleep.call_count, 2)
+
+        client = make_client(StreamingModels(['a', 'b'], fail_after=1))
+        received = []
+        with self.assertRaises(Exception):
+            for chunk in client.generate_stream("plan"):
+                received.append(chunk)
+        self.assertEqual(received, ['a'])
+        self.assertEqual(client.client.models.calls, 1)
+
+
+class TestAsyncGenerate(unittest.TestCase):
+    def test_concurrency_is_bounded(self):
+        aio_models = AsyncModels()
+        client = make_client(None, aio_models=aio_models, max_concurrency=3)
+
+        async def run_batch():
+            return await asyncio.gather(*(client.agenerate(f"prompt {i}") for i in range(10)))
+
+        responses = asyncio.run(run_batch())
+        self.assertEqual(responses, [f"answer to prompt {i}" for i in range(10)])
+        self.assertEqual(aio_models.max_in_flight, 3)
+
+        # A new event loop gets its own semaphore
+        self.assertEqual(len(asyncio.run(run_batch())), 10)
+
+    def test_async_retry_and_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            aio_models = AsyncModels(failures=1)
+            client = make_client(None, ResponseCache(os.path.join(tmp, 'responses.sqlite3')), aio_models)
+
+            async def run():
+                with mock.patch('src.llm.client.asyncio.sleep', new=mock.AsyncMock()) as sleep:
+                    first = await client.agenerate_with_retry("plan", scenario="project_ideas")
+                    second = await client.agenerate_with_retry("plan", scenario="project_ideas")
+                # The fake API's own short sleeps are patched too; keep the backoffs
+                return first, second, [c.args[0] for c in sleep.await_args_list if c.args[0] >= 1]
+
+            first, second, backoffs = asyncio.run(run())
+            self.assertEqual(first, second)
+            self.assertEqual(backoffs, [1])
+            self.assertEqual(aio_models.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.context_packer import ContextPacker, estimate_tokens
+import unittest
+
+
+def make_doc(doc_id, sections, words_per_section=50):
+    content = "\n\n".join(
+        f"## Section {i}\n\n" + " ".join(["word"] * words_per_section)
+        for i in range(sections)
+    )
+    return {'id': doc_id, 'content': content, 'metadata': {'filename': f"{doc_id}.md"}}
+
+
+class TestContextPacker(unittest.TestCase):
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertGreaterEqual(estimate_tokens("a " * 100), 100)
+        self.assertEqual(estimate_tokens("x" * 400), 100)
+
+    def test_small_documents_fit_whole(self):
+        packer = ContextPacker(token_budget=2000)
+        context, report = packer.pack([make_doc('a', 2), make_doc('b', 2)])
+
+        self.assertEqual(report['included'], ['a', 'b'])
+        self.assertEqual(report['trimmed'], [])
+        self.assertEqual(report['dropped'], [])
+        self.assertIn("Example 2", context)
+        self.assertLessEqual(report['used_tokens'], 2000)
+
+    def test_large_document_trimmed_at_section_boundary(self):
+        packer = ContextPacker(token_budget=300)
+        context, report = packer.pack([make_doc('big', 10)])
+
+        self.assertEqual(report['included'], ['big'])
+        self.assertEqual(len(report['trimmed']), 1)
+        self.assertGreater(report['trimmed'][0]['sections_dropped'], 0)
+        self.assertIn("## Section 0", context)
+        self.assertNotIn("## Section 9", context)
+        self.assertLessEqual(report['used_tokens'], 300)
+
+    def test_documents_past_budget_are_dropped(self):
+        packer = ContextPacker(token_budget=150)
+        _, report = packer.pack([make_doc('a', 1, words_per_section=60), make_doc('b', 1, words_per_section=200)])
+
+        self.assertEqual(report['included'], ['a'])
+        self.assertEqual([entry['id'] for entry in report['dropped']], ['b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
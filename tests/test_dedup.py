@@ -0,0 +1,63 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.dedup import MinHasher, NearDuplicateIndex, estimated_similarity
+import tempfile
+import unittest
+
+
+BLOCK = " ".join(
+    f"HS{i}01 English for professional communication {i} credits covering writing speaking and reading"
+    for i in range(12)
+)
+
+
+class TestMinHash(unittest.TestCase):
+    def test_similarity_tracks_overlap(self):
+        hasher = MinHasher()
+        base = hasher.signature(BLOCK)
+        self.assertEqual(estimated_similarity(base, hasher.signature(BLOCK)), 1.0)
+        self.assertGreater(estimated_similarity(base, hasher.signature(BLOCK + " lab")), 0.85)
+        unrelated = hasher.signature("Neural networks backpropagation convolution transformers attention")
+        self.assertLess(estimated_similarity(base, unrelated), 0.2)
+
+    def test_partial_overlap_is_not_a_duplicate(self):
+        hasher = MinHasher()
+        words = BLOCK.split()
+        half = hasher.signature(" ".join(words[:len(words) // 2]) + " data structures algorithms graphs")
+        self.assertLess(estimated_similarity(hasher.signature(BLOCK), half), 0.85)
+
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    def test_find_and_orphaned_sources(self):
+        index = NearDuplicateIndex()
+        index.add('cse::0', index.signature(BLOCK))
+
+        signature = index.signature(BLOCK + " lab")
+        self.assertEqual(index.find(signature), 'cse::0')
+        self.assertIsNone(index.find(signature, exclude=['cse::0']))
+        self.assertIsNone(index.find(index.signature("Thermodynamics and fluid mechanics")))
+
+        index.add_duplicate('ece::3', 'cse::0', 'ece.md')
+        self.assertEqual(index.references('cse::0'), [{'id': 'ece::3', 'source': 'ece.md'}])
+        self.assertEqual(index.remove('cse::0'), ['ece.md'])
+        self.assertEqual(index.references('cse::0'), [])
+        self.assertEqual(len(index), 0)
+
+    def test_persistence_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'near_duplicates.json')
+            index = NearDuplicateIndex(path)
+            index.add('cse::0', index.signature(BLOCK))
+            index.add_duplicate('me::1', 'cse::0', 'me.md')
+            index.save()
+
+            reloaded = NearDuplicateIndex(path)
+            self.assertTrue(reloaded.is_stored('cse::0'))
+            self.assertEqual(reloaded.find(reloaded.signature(BLOCK)), 'cse::0')
+            self.assertEqual(reloaded.shared_sources(), {'cse::0': ['me.md']})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.embedding_cache import EmbeddingCache
+import numpy as np
+import tempfile
+import unittest
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip_across_instances(self):
+        cache = EmbeddingCache(self.tmpdir.name, 'all-MiniLM-L6-v2', 4)
+        vectors = np.arange(8, dtype=np.float32).reshape(2, 4)
+        cache.put_many(['alpha', 'beta'], vectors)
+
+        reopened = EmbeddingCache(self.tmpdir.name, 'all-MiniLM-L6-v2', 4)
+        embeddings, missing = reopened.get_many(['beta', 'gamma', 'alpha'])
+
+        self.assertEqual(missing, [1])
+        np.testing.assert_array_equal(embeddings[0], vectors[1])
+        np.testing.assert_array_equal(embeddings[2], vectors[0])
+
+    def test_models_do_not_share_entries(self):
+        EmbeddingCache(self.tmpdir.name, 'model-a', 4).put_many(['alpha'], np.ones((1, 4), dtype=np.float32))
+
+        _, missing = EmbeddingCache(self.tmpdir.name, 'model-b', 4).get_many(['alpha'])
+
+        self.assertEqual(missing, [0])
+
+    def test_interrupted_write_does_not_misalign_rows(self):
+        cache = EmbeddingCache(self.tmpdir.name, 'all-MiniLM-L6-v2', 4)
+        cache.put_many(['alpha'], np.zeros((1, 4), dtype=np.float32))
+        # Simulate a crash after the matrix append but before the key append
+        with open(cache.matrix_path, 'ab') as f:
+            f.write(np.full((1, 4), 9, dtype=np.float32).tobytes())
+
+        cache.put_many(['beta'], np.ones((1, 4), dtype=np.float32))
+        embeddings, missing = EmbeddingCache(self.tmpdir.name, 'all-MiniLM-L6-v2', 4).get_many(['beta'])
+
+        self.assertEqual(missing, [])
+        np.testing.assert_array_equal(embeddings[0], np.ones(4, dtype=np.float32))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.vector_store import CurriculumVectorStore
+import importlib
+import numpy as np
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+
+class StubSentenceTransformer:
+    """Stands in for the real model: no download, deterministic float64 output."""
+
+    def __init__(self, model_name, device=None):
+        self.encoded = []
+        self.normalize_flags = []
+
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+    def encode(self, texts, batch_size, convert_to_numpy, normalize_embeddings, show_progress_bar):
+        self.encoded.extend(texts)
+        self.normalize_flags.append(normalize_embeddings)
+        vectors = np.array([[len(t), t.count('a'), 1.0] for t in texts], dtype=np.float64)
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+def load_embedding_service():
+    stub = types.ModuleType('sentence_transformers')
+    stub.SentenceTransformer = StubSentenceTransformer
+    # patch.dict also drops the module imported here once the block ends
+    with mock.patch.dict(sys.modules, {'sentence_transformers': stub}):
+        sys.modules.pop('src.rag.embeddings', None)
+        return importlib.import_module('src.rag.embeddings').EmbeddingService
+
+
+class TestEmbeddingService(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        EmbeddingService = load_embedding_service()
+        self.embedder = EmbeddingService(cache_dir=os.path.join(self.tmpdir.name, 'cache'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_normalized_float32_embeddings_reach_the_store(self):
+        store = CurriculumVectorStore(os.path.join(self.tmpdir.name, 'store'), embedder=self.embedder, backend="flat")
+        texts = ["data structures and algorithms", "banana", "compilers"]
+        ids = ['a', 'b', 'c']
+        store.upsert_documents(documents=texts, metadatas=[{}] * 3, ids=ids)
+
+        expected = np.array([[len(t), t.count('a'), 1.0] for t in texts])
+        expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+        stored = store.backend.get_embeddings(ids)
+        for i, doc_id in enumerate(ids):
+            self.assertEqual(stored[doc_id].dtype, np.float32)
+            np.testing.assert_allclose(stored[doc_id], expected[i], rtol=1e-6)
+        self.assertEqual(self.embedder.model.normalize_flags, [True])
+
+    def test_cached_texts_are_not_encoded_again(self):
+        self.embedder.embed_batch(["alpha", "beta"])
+        embeddings = self.embedder.embed_batch(["beta", "gamma", "beta"])
+
+        self.assertEqual(self.embedder.model.encoded, ["alpha", "beta", "gamma"])
+        self.assertEqual(embeddings.dtype, np.float32)
+        np.testing.assert_array_equal(embeddings[0], embeddings[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
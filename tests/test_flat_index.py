@@ -0,0 +1,160 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.flat_index import FlatIndexBackend
+import numpy as np
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+
+class TestFlatIndexBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.embeddings = np.eye(4, dtype=np.float32)
+        self.backend = FlatIndexBackend(self.tmpdir.name)
+        self.backend.add(
+            ['a', 'b', 'c', 'd'],
+            ['doc a', 'doc b', 'doc c', 'doc d'],
+            self.embeddings,
+            [{'level_key': 'btech'}, {'level_key': 'masters'}, {'level_key': 'btech'}, {'level_key': 'masters'}]
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_exact_top_k(self):
+        query = np.array([[0.9, 0.1, 0.0, 0.0]], dtype=np.float32)
+        results = self.backend.query(query, k=2)[0]
+
+        self.assertEqual([r['id'] for r in results], ['a', 'b'])
+        self.assertLess(results[0]['distance'], results[1]['distance'])
+
+    def test_metadata_filter_is_applied_before_ranking(self):
+        query = np.array([[1.0, 0.0, 0.0, 0.0]], dtype=np.float32)
+        results = self.backend.query(query, k=3, where={'level_key': 'masters'})[0]
+
+        self.assertEqual(sorted(r['id'] for r in results), ['b', 'd'])
+
+    def test_upsert_delete_and_reload(self):
+        self.backend.upsert(['b', 'e'], ['new b', 'doc e'], self.embeddings[:2], [{}, {}])
+        self.backend.delete(['c'])
+
+        reloaded = FlatIndexBackend(self.tmpdir.name)
+        self.assertEqual(reloaded.count(), 4)
+        self.assertEqual([d['content'] for d in reloaded.get(['b', 'c', 'e'])], ['new b', 'doc e'])
+        top = reloaded.query(self.embeddings[0], k=1)[0][0]
+        self.assertIn(top['id'], ['a', 'b', 'e'])
+
+
+class TestFlatIndexWrites(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.embeddings = np.eye(4, dtype=np.float32)
+        self.backend = FlatIndexBackend(self.tmpdir.name)
+        self.backend.add(['a', 'b'], ['doc a', 'doc b'], self.embeddings[:2], [{}, {}])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_bulk_write_commits_once(self):
+        reader = FlatIndexBackend(self.tmpdir.name)
+        with mock.patch.object(self.backend, '_commit', wraps=self.backend._commit) as commit:
+            with self.backend.bulk_write():
+                self.backend.upsert(['c'], ['doc c'], self.embeddings[2:3], [{}])
+                self.backend.upsert(['a', 'd'], ['new a', 'doc d'], self.embeddings[2:4], [{}, {}])
+                self.backend.delete(['b', 'c'])
+                self.backend.add(['c'], ['doc c again'], self.embeddings[1:2], [{}])
+                # Readers see the last committed state until the block exits
+                self.assertEqual(reader.count(), 2)
+            self.assertEqual(commit.call_count, 1)
+
+        for index in (reader, FlatIndexBackend(self.tmpdir.name)):
+            self.assertEqual(sorted(d['id'] for d in index.get_all()), ['a', 'c', 'd'])
+            self.assertEqual([d['content'] for d in index.get(['a', 'c'])], ['new a', 'doc c again'])
+            self.assertEqual(index.query(self.embeddings[1], k=1)[0][0]['id'], 'c')
+            self.assertEqual(index.query(self.embeddings[2], k=1)[0][0]['id'], 'a')
+        self.assertEqual(len([f for f in os.listdir(self.backend.index_directory) if f.endswith('.f32')]), 1)
+
+    def test_writers_wait_for_an_open_bulk_write(self):
+        other = FlatIndexBackend(self.tmpdir.name)
+        done = threading.Event()
+
+        def write():
+            other.upsert(['e'], ['doc e'], self.embeddings[3:4], [{}])
+            done.set()
+
+        with self.backend.bulk_write():
+            self.backend.upsert(['c'], ['doc c'], self.embeddings[2:3], [{}])
+            writer = threading.Thread(target=write)
+            writer.start()
+            self.assertFalse(done.wait(0.2))
+        writer.join(5)
+
+        # The waiting writer reloaded the committed state instead of overwriting it
+        self.assertEqual(sorted(d['id'] for d in FlatIndexBackend(self.tmpdir.name).get_all()), ['a', 'b', 'c', 'e'])
+
+    def test_load_retries_when_embedding_file_was_replaced(self):
+        reader = FlatIndexBackend(self.tmpdir.name)
+        self.backend.upsert(['c'], ['doc c'], self.embeddings[2:3], [{}])
+
+        map_matrix = reader._map_matrix
+        calls = []
+
+        def vanishing_once(*args):
+            calls.append(args)
+            if len(calls) == 1:
+                # Another writer committed and removed the file the records named
+                raise FileNotFoundError(args[0])
+            return map_matrix(*args)
+
+        with mock.patch.object(reader, '_map_matrix', side_effect=vanishing_once), \
+                mock.patch('src.rag.flat_index.time.sleep'):
+            self.assertEqual(reader.count(), 3)
+        self.assertEqual(len(calls), 2)
+
+
+class TestQuantizedFlatIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.embeddings = rng.standard_normal((200, 16)).astype(np.float32)
+        self.queries = rng.standard_normal((5, 16)).astype(np.float32)
+        self.ids = [f"doc_{i}" for i in range(200)]
+        self.metadatas = [{'level_key': 'btech' if i % 2 else 'masters'} for i in range(200)]
+
+        exact = FlatIndexBackend(self.tmpdir.name)
+        exact.add(self.ids, [''] * 200, self.embeddings, self.metadatas)
+        self.expected = [[r['id'] for r in results] for results in exact.query(self.queries, k=5)]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_rescored_results_match_exact_search(self):
+        for quantization in ('float16', 'int8'):
+            index = FlatIndexBackend(self.tmpdir.name, quantization=quantization)
+            results = index.query(self.queries, k=5)
+            self.assertEqual([[r['id'] for r in r_list] for r_list in results], self.expected)
+
+    def test_quantized_filtered_search(self):
+        index = FlatIndexBackend(self.tmpdir.name, quantization='int8')
+        results = index.query(self.queries, k=5, where={'level_key': 'btech'})
+        for r_list in results:
+            self.assertEqual(len(r_list), 5)
+            self.assertTrue(all(int(r['id'].split('_')[1]) % 2 for r in r_list))
+
+    def test_memory_footprint(self):
+        index = FlatIndexBackend(self.tmpdir.name, quantization='int8')
+        footprint = index.memory_footprint()
+        self.assertEqual(footprint['float32_bytes'], 200 * 16 * 4)
+        self.assertEqual(footprint['search_bytes'], 200 * 16 + 16 * 4)
+
+    def test_unknown_quantization_rejected(self):
+        with self.assertRaises(ValueError):
+            FlatIndexBackend(self.tmpdir.name, quantization='int4')
+
+
+if __name__ == '__main__':
+    unittest.main()
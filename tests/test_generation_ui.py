@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import contextlib
+import importlib
+import types
+import unittest
+from unittest import mock
+
+
+class RecordingStreamlit(types.ModuleType):
+    """Stands in for streamlit: records whether a spinner is showing."""
+
+    def __init__(self):
+        super().__init__('streamlit')
+        self.spinning = False
+
+    @contextlib.contextmanager
+    def spinner(self, text):
+        self.spinning = True
+        try:
+            yield
+        finally:
+            self.spinning = False
+
+    def empty(self):
+        return mock.Mock()
+
+
+def load_generation_ui(streamlit):
+    with mock.patch.dict(sys.modules, {'streamlit': streamlit}):
+        sys.modules.pop('src.utils.generation_ui', None)
+        return importlib.import_module('src.utils.generation_ui')
+
+
+class TestStreamResponse(unittest.TestCase):
+    def test_spinner_is_only_shown_until_the_first_chunk(self):
+        streamlit = RecordingStreamlit()
+        generation_ui = load_generation_ui(streamlit)
+        spinning = []
+
+        class Client:
+            def generate_stream(self, prompt, **kwargs):
+                for chunk in ("{", '"a": 1', "}"):
+                    spinning.append(streamlit.spinning)
+                    yield chunk
+
+        text = generation_ui.stream_response(Client(), "prompt", spinner_text="Working...", scenario="test")
+        self.assertEqual(text, '{"a": 1}')
+        self.assertEqual(spinning, [True, False, False])
+
+    def test_empty_stream(self):
+        generation_ui = load_generation_ui(RecordingStreamlit())
+        client = mock.Mock()
+        client.generate_stream.return_value = iter([])
+        self.assertEqual(generation_ui.stream_response(client, "prompt"), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
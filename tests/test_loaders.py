@@ -0,0 +1,102 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.chunker import MarkdownChunker
+from src.rag.loaders import iter_docx_blocks, iter_pdf_pages, iter_text_windows
+from populate_knowledge_base import iter_batches, iter_curriculum_chunks
+import tempfile
+import unittest
+import zipfile
+
+
+DOCUMENT_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+    '<w:p><w:pPr><w:pStyle w:val="Title"/></w:pPr><w:r><w:t>B.Tech Computer Science</w:t></w:r></w:p>'
+    '<w:p><w:pPr><w:pStyle w:val="Heading2"/></w:pPr><w:r><w:t>FIRST YEAR I - SEMESTER</w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>Core courses of the first semester.</w:t></w:r></w:p>'
+    '<w:p><w:pPr><w:pStyle w:val="ListBullet"/></w:pPr><w:r><w:t>Applied Physics</w:t></w:r></w:p>'
+    '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>Code</w:t></w:r></w:p></w:tc><w:tc><w:p><w:r><w:t>Title</w:t></w:r></w:p></w:tc></w:tr>'
+    '<w:tr><w:tc><w:p><w:r><w:t>20PH11003</w:t></w:r></w:p></w:tc><w:tc><w:p><w:r><w:t>Applied Physics</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+    '<w:sectPr/></w:body></w:document>'
+)
+
+
+class TestTextWindows(unittest.TestCase):
+    def test_windows_are_bounded_and_lossless(self):
+        blocks = [f"Paragraph {i} " + "word " * 40 for i in range(100)]
+        windows = list(iter_text_windows(blocks, window_chars=1000))
+
+        self.assertGreater(len(windows), 10)
+        self.assertTrue(all(len(w) <= 1000 for w in windows))
+        self.assertEqual(
+            [b.strip() for b in "\n\n".join(windows).split("\n\n")],
+            [b.strip() for b in blocks]
+        )
+
+
+class TestChunkStream(unittest.TestCase):
+    def test_ids_continue_and_sections_carry_over(self):
+        text = "## Semester 1\n\n" + "\n\n".join(f"Course {i} " + "topic " * 30 for i in range(40))
+        chunker = MarkdownChunker(max_chars=600, overlap_chars=50)
+        chunks = list(chunker.chunk_stream(iter_text_windows([text], window_chars=2000), doc_id="syl"))
+
+        self.assertEqual([c['id'] for c in chunks], [f"syl::chunk_{i:04d}" for i in range(len(chunks))])
+        self.assertTrue(all(c['metadata']['section'] == 'Semester 1' for c in chunks))
+        self.assertTrue(all(c['metadata']['semester'] == 'Semester 1' for c in chunks))
+
+
+class TestDocumentLoaders(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmpdir.name, 'syllabi')
+        os.makedirs(self.folder)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_docx_blocks_as_markdown(self):
+        path = os.path.join(self.folder, 'cse.docx')
+        with zipfile.ZipFile(path, 'w') as archive:
+            archive.writestr('word/document.xml', DOCUMENT_XML)
+
+        blocks = list(iter_docx_blocks(path))
+        self.assertEqual(blocks[:4], [
+            "# B.Tech Computer Science",
+            "## FIRST YEAR I - SEMESTER",
+            "Core courses of the first semester.",
+            "- Applied Physics"
+        ])
+        self.assertEqual(blocks[4], "| Code | Title |\n|---|---|\n| 20PH11003 | Applied Physics |")
+
+        chunks = list(iter_curriculum_chunks(path, MarkdownChunker()))
+        self.assertEqual(chunks[0]['id'], "syllabi_cse_docx::chunk_0000")
+        self.assertEqual(chunks[0]['metadata']['title'], "B.Tech Computer Science")
+        self.assertEqual(chunks[0]['metadata']['level_key'], "btech")
+
+    def test_pdf_pages_stream_in_batches(self):
+        from reportlab.pdfgen import canvas
+
+        path = os.path.join(self.folder, 'ece.pdf')
+        pdf = canvas.Canvas(path)
+        for page in range(20):
+            for line in range(40):
+                pdf.drawString(40, 800 - line * 18, f"Page {page} line {line} signal processing course topics")
+            pdf.showPage()
+        pdf.save()
+
+        pages = list(iter_pdf_pages(path))
+        self.assertEqual(len(pages), 20)
+        self.assertIn("Page 7 line 3", pages[7])
+
+        chunks = iter_curriculum_chunks(path, MarkdownChunker(), window_chars=4000)
+        batches = list(iter_batches(chunks, 8))
+        self.assertTrue(all(len(batch) <= 8 for batch in batches))
+        ids = [chunk['id'] for batch in batches for chunk in batch]
+        self.assertEqual(ids, [f"syllabi_ece_pdf::chunk_{i:04d}" for i in range(len(ids))])
+        self.assertEqual(batches[0][0]['metadata']['title'], "Page 0 line 0 signal processing course topics")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.manifest import IngestionManifest, hash_text
+import tempfile
+import unittest
+
+
+def make_chunks(doc_id, texts):
+    return [
+        {'id': f"{doc_id}::chunk_{i:04d}", 'content': text, 'metadata': {'parent_id': doc_id}}
+        for i, text in enumerate(texts)
+    ]
+
+
+class TestIngestionManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'manifest.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_diff_files_classifies_changes(self):
+        manifest = IngestionManifest(self.path)
+        manifest.record_file('a.md', hash_text('a'), make_chunks('a', ['a']))
+        manifest.record_file('b.md', hash_text('b'), make_chunks('b', ['b']))
+        manifest.record_file('c.md', hash_text('c'), make_chunks('c', ['c']))
+        manifest.save()
+
+        reloaded = IngestionManifest(self.path)
+        diff = reloaded.diff_files({
+            'a.md': hash_text('a'),
+            'b.md': hash_text('b changed'),
+            'd.md': hash_text('d')
+        })
+
+        self.assertEqual(diff['unchanged'], ['a.md'])
+        self.assertEqual(diff['changed'], ['b.md'])
+        self.assertEqual(diff['added'], ['d.md'])
+        self.assertEqual(diff['removed'], ['c.md'])
+
+    def test_diff_chunks_only_returns_changed_chunks(self):
+        manifest = IngestionManifest(self.path)
+        manifest.record_file('a.md', 'h1', make_chunks('a', ['one', 'two', 'three']))
+
+        changes = manifest.diff_chunks('a.md', make_chunks('a', ['one', 'TWO']))
+
+        self.assertEqual([c['id'] for c in changes['upsert']], ['a::chunk_0001'])
+        self.assertEqual(changes['delete'], ['a::chunk_0002'])
+
+    def test_remove_file_returns_recorded_chunk_ids(self):
+        manifest = IngestionManifest(self.path)
+        manifest.record_file('a.md', 'h1', make_chunks('a', ['one', 'two']))
+
+        self.assertEqual(manifest.remove_file('a.md'), ['a::chunk_0000', 'a::chunk_0001'])
+        self.assertEqual(manifest.files, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.metadata import infer_level, normalize_level
+import unittest
+
+
+class TestNormalizeLevel(unittest.TestCase):
+    def test_spellings_map_to_canonical_keys(self):
+        spellings = {
+            'btech': ['B.Tech', 'BTech', 'b tech', 'B.E. ', 'Undergraduate', 'Bachelor of Engineering'],
+            'masters': ['M.Tech', 'Masters', 'Master', 'M.Sc', 'Postgraduate', 'Graduate'],
+            'diploma': ['Diploma', 'diploma in engineering'],
+            'certification': ['Certificate', 'Certification', 'Bootcamp', 'Professional'],
+        }
+        for expected, levels in spellings.items():
+            for level in levels:
+                with self.subTest(level=level):
+                    self.assertEqual(normalize_level(level), expected)
+
+    def test_empty_and_unknown_levels(self):
+        self.assertEqual(normalize_level(None), "")
+        self.assertEqual(normalize_level("   "), "")
+        self.assertEqual(normalize_level("PhD Research"), "phd_research")
+
+    def test_listed_alternatives_are_ambiguous(self):
+        for level in ['BTech/Masters', 'B.Tech, M.Tech', 'Undergraduate or Masters']:
+            with self.subTest(level=level):
+                self.assertEqual(normalize_level(level), "")
+
+    def test_qualified_level_keeps_first_match(self):
+        self.assertEqual(normalize_level("B.Tech Professional"), "btech")
+
+
+class TestInferLevel(unittest.TestCase):
+    def test_most_frequent_degree_wins(self):
+        text = "B.Tech in Computer Science. Regulations for the B.Tech programme. M.Tech electives."
+        self.assertEqual(infer_level(text), "btech")
+
+    def test_generic_words_do_not_count(self):
+        self.assertEqual(infer_level("Professional Core Courses. Graduate attributes."), "")
+
+    def test_only_the_opening_text_is_scanned(self):
+        self.assertEqual(infer_level("x" * 7000 + " M.Tech"), "")
+        self.assertEqual(infer_level("x" * 7000 + " M.Tech", max_chars=8000), "masters")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.manifest import IngestionManifest
+from src.rag.pipeline import IngestionPipeline
+from src.rag.vector_store import CurriculumVectorStore
+from populate_knowledge_base import sync_knowledge_base
+import populate_knowledge_base
+import builtins
+import numpy as np
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+
+class BatchRecordingEmbedder:
+    model_name = "test-embedder"
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def embed_batch(self, texts):
+        self.batch_sizes.append(len(texts))
+        return np.array([[len(t), t.count('e'), 1.0] for t in texts], dtype=np.float32)
+
+
+def parse_numbered(filepath, count):
+    if count < 0:
+        raise ValueError("unreadable")
+    return [
+        {'id': f"{filepath}::{i}", 'content': f"{filepath} chunk {i}", 'metadata': {'source': filepath}}
+        for i in range(count)
+    ]
+
+
+class TestIngestionPipeline(unittest.TestCase):
+    def test_batches_order_and_errors(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            embedder = BatchRecordingEmbedder()
+            store = CurriculumVectorStore(tmp, embedder=embedder, backend="flat")
+            finished = []
+            failed = []
+
+            pipeline = IngestionPipeline(store, workers=2, batch_size=4, queue_size=1)
+            stats = pipeline.run(
+                [('a', 10), ('bad', -1), ('b', 3), ('c', 0)],
+                parse_numbered,
+                prepare=lambda filepath, chunks: chunks,
+                finish=finished.append,
+                on_error=lambda filepath, error: failed.append(filepath)
+            )
+
+            self.assertEqual(finished, ['a', 'b', 'c'])
+            self.assertEqual(failed, ['bad'])
+            self.assertEqual(store.get_count(), 13)
+            self.assertTrue(all(size <= 4 for size in embedder.batch_sizes))
+            self.assertEqual(stats['embed']['chunks'], 13)
+            self.assertEqual(stats['write']['chunks'], 13)
+            self.assertEqual(len(store.lexical_index), 13)
+
+
+class TestPipelinedSync(unittest.TestCase):
+    def test_matches_serial_sync(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            knowledge_base = os.path.join(tmp, 'kb')
+            for folder in ('cse_courses', 'ece_courses'):
+                os.makedirs(os.path.join(knowledge_base, folder))
+                for n in range(3):
+                    with open(os.path.join(knowledge_base, folder, f'program_{n}.md'), 'w') as f:
+                        f.write(f"# {folder} program {n}\n\n**Level:** BTech\n\n## Semester 1\n\n"
+                                + "\n\n".join(f"Course {folder} {n} {i} covers topic {i * n}" for i in range(30)))
+
+            stores = []
+            for workers in (1, 2):
+                directory = os.path.join(tmp, f'store_{workers}')
+                store = CurriculumVectorStore(directory, embedder=BatchRecordingEmbedder(), backend="flat")
+                manifest = IngestionManifest(store.manifest_path)
+                stats = sync_knowledge_base(store, manifest, knowledge_base_path=knowledge_base, workers=workers)
+                stores.append((store, manifest, stats))
+
+            (serial, serial_manifest, serial_stats), (piped, piped_manifest, piped_stats) = stores
+            self.assertIn('pipeline', piped_stats)
+            self.assertEqual(serial_stats['chunks_upserted'], piped_stats['chunks_upserted'])
+            self.assertEqual(serial_manifest.files, piped_manifest.files)
+            self.assertEqual(
+                {d['id']: d['content'] for d in serial.backend.get_all()},
+                {d['id']: d['content'] for d in piped.backend.get_all()}
+            )
+
+    def test_documents_are_streamed_not_sent_to_workers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            knowledge_base = os.path.join(tmp, 'kb')
+            os.makedirs(os.path.join(knowledge_base, 'cse_courses'))
+            with open(os.path.join(knowledge_base, 'cse_courses', 'program.md'), 'w') as f:
+                f.write("# Program\n\nCourse covers compilers and networks")
+            docx_path = os.path.join(knowledge_base, 'cse_courses', 'syllabus.docx')
+            with zipfile.ZipFile(docx_path, 'w') as archive:
+                archive.writestr('word/document.xml', (
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+                    '<w:p><w:r><w:t>B.Tech syllabus with operating systems</w:t></w:r></w:p>'
+                    '<w:sectPr/></w:body></w:document>'
+                ))
+
+            store = CurriculumVectorStore(os.path.join(tmp, 'store'), embedder=BatchRecordingEmbedder(), backend="flat")
+            manifest = IngestionManifest(store.manifest_path)
+            pipelined = populate_knowledge_base.ingest_files_pipelined
+            with mock.patch.object(populate_knowledge_base, 'ingest_files_pipelined', wraps=pipelined) as pipeline:
+                stats = sync_knowledge_base(store, manifest, knowledge_base_path=knowledge_base, workers=2)
+
+            sent = [path for call in pipeline.call_args_list for path in call.args[2]]
+            self.assertEqual([os.path.basename(path) for path in sent], ['program.md'])
+            self.assertEqual(stats['files_added'], 2)
+            self.assertIn(docx_path, manifest.files)
+            self.assertTrue(any(d['metadata'].get('source') == docx_path for d in store.backend.get_all()))
+
+
+
+class TestSyncKnowledgeBase(unittest.TestCase):
+    def test_unreadable_file_is_kept(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            knowledge_base = os.path.join(tmp, 'kb', 'cse_courses')
+            os.makedirs(knowledge_base)
+            paths = []
+            for name in ('a', 'b'):
+                paths.append(os.path.join(knowledge_base, f'{name}.md'))
+                with open(paths[-1], 'w') as f:
+                    f.write(f"# Program {name}\n\nCourse {name} covers compilers and networks")
+
+            store = CurriculumVectorStore(os.path.join(tmp, 'store'), embedder=BatchRecordingEmbedder(), backend="flat")
+            manifest = IngestionManifest(store.manifest_path)
+            sync_knowledge_base(store, manifest, knowledge_base_path=os.path.dirname(knowledge_base))
+            count = store.get_count()
+
+            def locked_open(path, *args, **kwargs):
+                if path == paths[0]:
+                    raise PermissionError("file is locked")
+                return builtins.open(path, *args, **kwargs)
+
+            with mock.patch('populate_knowledge_base.open', side_effect=locked_open, create=True):
+                stats = sync_knowledge_base(store, manifest, knowledge_base_path=os.path.dirname(knowledge_base))
+
+            self.assertEqual(stats['files_removed'], 0)
+            self.assertEqual(store.get_count(), count)
+            self.assertIn(paths[0], manifest.files)
+
+    def test_sync_commits_the_flat_index_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            knowledge_base = os.path.join(tmp, 'kb', 'cse_courses')
+            os.makedirs(knowledge_base)
+            for name in ('a', 'b', 'c'):
+                with open(os.path.join(knowledge_base, f'{name}.md'), 'w') as f:
+                    f.write(f"# Program {name}\n\nCourse {name} covers compilers and networks")
+
+            store = CurriculumVectorStore(os.path.join(tmp, 'store'), embedder=BatchRecordingEmbedder(), backend="flat")
+            manifest = IngestionManifest(store.manifest_path)
+            with mock.patch.object(store.backend, '_commit', wraps=store.backend._commit) as commit:
+                sync_knowledge_base(store, manifest, knowledge_base_path=os.path.dirname(knowledge_base), batch_size=1)
+            self.assertEqual(commit.call_count, 1)
+            self.assertEqual(store.get_count(), 3)
+            self.assertEqual(len(IngestionManifest(store.manifest_path).files), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.llm.rate_limiter import RateLimiter, RateLimitExceeded
+import multiprocessing
+import sqlite3
+import tempfile
+import time
+import unittest
+
+
+def acquire_many(path, count, results):
+    limiter = RateLimiter(path, requests_per_minute=10, requests_per_day=None, max_wait=0.0)
+    admitted = 0
+    for _ in range(count):
+        try:
+            limiter.acquire()
+            admitted += 1
+        except RateLimitExceeded:
+            pass
+    results.put(admitted)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'limits.sqlite3')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def log_request(self, age, tokens=0):
+        with sqlite3.connect(self.path) as db:
+            db.execute("INSERT INTO requests VALUES (?, 1, ?)", (time.time() - age, tokens))
+
+    def test_requests_per_minute(self):
+        limiter = RateLimiter(self.path, requests_per_minute=3, requests_per_day=None, max_wait=5.0)
+        for _ in range(3):
+            self.assertEqual(limiter.acquire(), 0.0)
+
+        self.assertGreater(limiter.expected_wait(), 55.0)
+        with self.assertRaises(RateLimitExceeded) as raised:
+            limiter.acquire()
+        self.assertEqual(raised.exception.limit, 'requests/minute')
+
+    def test_queued_caller_waits_for_a_slot(self):
+        limiter = RateLimiter(self.path, requests_per_minute=2, requests_per_day=100, max_wait=5.0)
+        self.log_request(age=59.8)
+        self.log_request(age=1.0)
+        notices = []
+
+        waited = limiter.acquire(on_wait=lambda wait, limit: notices.append((wait, limit)))
+
+        self.assertGreater(waited, 0.1)
+        self.assertEqual(len(notices), 1)
+        self.assertEqual(notices[0][1], 'requests/minute')
+        self.assertEqual(limiter.stats()['limits']['requests/day']['used'], 3)
+
+    def test_tokens_per_minute(self):
+        limiter = RateLimiter(self.path, requests_per_minute=None, requests_per_day=None, tokens_per_minute=100)
+        limiter.acquire(tokens=80)
+        self.assertGreater(limiter.expected_wait(tokens=30), 0.0)
+        limiter.record_tokens(-50)
+        self.assertEqual(limiter.expected_wait(tokens=30), 0.0)
+
+    def test_budget_is_shared_across_processes(self):
+        results = multiprocessing.Queue()
+        RateLimiter(self.path)
+        workers = [
+            multiprocessing.Process(target=acquire_many, args=(self.path, 5, results)) for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(sum(results.get() for _ in workers), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.retriever import CurriculumRetriever
+from src.rag.vector_store import CurriculumVectorStore
+import importlib
+import numpy as np
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+
+class StubCrossEncoder:
+    """Scores a pair by the chunk's length, so longer chunks rank first."""
+
+    def __init__(self, model_name, device=None):
+        self.predicted = []
+
+    def predict(self, pairs, batch_size, show_progress_bar):
+        self.predicted.extend(pairs)
+        return np.array([float(len(content)) for _, content in pairs], dtype=np.float32)
+
+
+def load_reranker_module():
+    stub = types.ModuleType('sentence_transformers')
+    stub.CrossEncoder = StubCrossEncoder
+    # patch.dict also drops the module imported here once the block ends
+    with mock.patch.dict(sys.modules, {'sentence_transformers': stub}):
+        sys.modules.pop('src.rag.reranker', None)
+        return importlib.import_module('src.rag.reranker')
+
+
+def candidate(doc_id, content):
+    return {'id': doc_id, 'content': content, 'metadata': {}}
+
+
+class TestCrossEncoderReranker(unittest.TestCase):
+    def setUp(self):
+        self.module = load_reranker_module()
+        self.candidates = [candidate('a', 'x'), candidate('b', 'xxx'), candidate('c', 'xx'), candidate('d', 'xxxx')]
+
+    def test_reorders_by_score(self):
+        reranker = self.module.CrossEncoderReranker(top_n=4)
+        results = reranker.rerank("query", self.candidates)
+        self.assertEqual([r['id'] for r in results], ['d', 'b', 'c', 'a'])
+        self.assertEqual([r['rerank_score'] for r in results], [4.0, 3.0, 2.0, 1.0])
+
+    def test_only_top_n_are_scored(self):
+        reranker = self.module.CrossEncoderReranker(top_n=2)
+        results = reranker.rerank("query", self.candidates)
+        self.assertEqual([r['id'] for r in results], ['b', 'a', 'c', 'd'])
+        self.assertEqual(reranker.model.predicted, [("query", 'x'), ("query", 'xxx')])
+        self.assertNotIn('rerank_score', results[2])
+
+    def test_scores_are_cached_per_query(self):
+        reranker = self.module.CrossEncoderReranker(top_n=4)
+        reranker.rerank("Query", self.candidates)
+        reranker.rerank("  query ", self.candidates)
+        self.assertEqual(reranker.stats()['pairs_scored'], 4)
+
+        reranker.clear_cache()
+        reranker.rerank("query", self.candidates)
+        self.assertEqual(reranker.stats()['pairs_scored'], 8)
+
+    def test_latency_is_recorded(self):
+        reranker = self.module.CrossEncoderReranker(top_n=4)
+        with mock.patch.object(self.module.time, 'perf_counter', side_effect=[1.0, 1.25, 2.0, 2.05]):
+            reranker.rerank("query", self.candidates)
+            reranker.rerank("other query", self.candidates)
+
+        stats = reranker.stats()
+        self.assertEqual(stats['calls'], 2)
+        self.assertAlmostEqual(stats['last_latency_ms'], 50.0)
+        self.assertAlmostEqual(stats['avg_latency_ms'], 150.0)
+
+    def test_scenarios_from_env(self):
+        with mock.patch.dict(os.environ, {'RERANK_SCENARIOS': 'curriculum, course_structure,'}):
+            self.assertEqual(self.module.rerank_scenarios_from_env(), {'curriculum', 'course_structure'})
+        with mock.patch.dict(os.environ, {'RERANK_SCENARIOS': ''}):
+            self.assertEqual(self.module.rerank_scenarios_from_env(), set())
+
+
+class KeywordEmbedder:
+    model_name = "keyword-embedder"
+
+    def embed_batch(self, texts):
+        return np.array([[t.lower().count('python'), 1.0] for t in texts], dtype=np.float32)
+
+
+class TestRerankScenarios(unittest.TestCase):
+    def test_reranker_runs_only_for_enabled_scenarios(self):
+        reranker = load_reranker_module().CrossEncoderReranker(top_n=3)
+        with tempfile.TemporaryDirectory() as tmp:
+            store = CurriculumVectorStore(tmp, embedder=KeywordEmbedder(), backend="flat")
+            store.add_documents(
+                documents=["python", "python notes on python", "labs"],
+                metadatas=[{'level_key': 'btech'}] * 3,
+                ids=['p1', 'p2', 'l1']
+            )
+            retriever = CurriculumRetriever(store, reranker=reranker, rerank_scenarios=['curriculum'])
+
+            plain = retriever.retrieve_similar_curricula("Python", "BTech", k=1, scenario="course_structure")
+            self.assertEqual(reranker.calls, 0)
+            self.assertNotIn('rerank_score', plain[0])
+
+            reranked = retriever.retrieve_similar_curricula("Python", "BTech", k=1, scenario="curriculum")
+            self.assertEqual(reranker.calls, 1)
+            self.assertEqual(reranked[0]['id'], 'p2')
+            self.assertIn('rerank_score', reranked[0])
+
+            # Every scenario re-ranks when no list is given
+            self.assertTrue(CurriculumRetriever(store, reranker=reranker).reranks(None))
+            self.assertFalse(CurriculumRetriever(store).reranks("curriculum"))
+
+
+if __name__ == '__main__':
+    unittest.main()
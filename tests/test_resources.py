@@ -0,0 +1,69 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.utils.resources import WARM_UP_RESOURCES, ResourceRegistry
+import threading
+import time
+import unittest
+
+
+class TestResourceRegistry(unittest.TestCase):
+    def test_concurrent_first_use_creates_once(self):
+        registry = ResourceRegistry()
+        created = []
+
+        def factory():
+            time.sleep(0.05)
+            created.append(object())
+            return created[-1]
+
+        registry.register('model', factory)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get('model'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(created), 1)
+        self.assertTrue(all(result is created[0] for result in results))
+
+    def test_failed_creation_is_retried(self):
+        registry = ResourceRegistry()
+        attempts = []
+
+        def factory():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("not ready")
+            return 'ready'
+
+        registry.register('client', factory)
+        with self.assertRaises(RuntimeError):
+            registry.get('client')
+        self.assertEqual(registry.get('client'), 'ready')
+
+    def test_warm_up_runs_once(self):
+        registry = ResourceRegistry()
+        calls = []
+        registry.register('store', lambda: calls.append(1) or 'store')
+
+        thread = registry.warm_up(['store'])
+        thread.join()
+        self.assertIsNone(registry.warm_up(['store']))
+        self.assertTrue(registry.status()['store']['initialized'])
+        self.assertEqual(len(calls), 1)
+
+    def test_warm_up_covers_only_what_pages_use(self):
+        self.assertEqual(WARM_UP_RESOURCES[0], 'llm_client')
+        self.assertNotIn('retriever', WARM_UP_RESOURCES)
+        self.assertNotIn('vector_store', WARM_UP_RESOURCES)
+
+    def test_unknown_resource(self):
+        with self.assertRaises(KeyError):
+            ResourceRegistry().get('missing')
+
+
+if __name__ == '__main__':
+    unittest.main()
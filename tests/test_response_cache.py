@@ -0,0 +1,84 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.llm.client import GeminiClient
+from src.llm.response_cache import ResponseCache, request_key
+import tempfile
+import time
+import unittest
+
+
+class FakeModels:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, model, contents, config):
+        self.calls += 1
+        return type('Response', (), {'text': f"answer {self.calls} to {contents}"})()
+
+
+def make_client(cache):
+    client = GeminiClient.__new__(GeminiClient)
+    client.model_name = "models/test"
+    client.client = type('Client', (), {'models': FakeModels()})()
+    client.response_cache = cache
+    client.semantic_cache = None
+    client.rate_limiter = None
+    return client
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'responses.sqlite3')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_covers_request_parameters(self):
+        key = request_key("m", "prompt", 0.5, None)
+        self.assertEqual(key, request_key("m", "prompt", 0.5, None))
+        self.assertNotEqual(key, request_key("m", "prompt", 0.4, None))
+        self.assertNotEqual(key, request_key("m", "prompt", 0.5, 1024))
+        self.assertNotEqual(key, request_key("other", "prompt", 0.5, None))
+
+    def test_repeat_requests_skip_the_api(self):
+        client = make_client(ResponseCache(self.path))
+        first = client.generate_with_retry(prompt="plan", temperature=0.5, scenario="project_ideas")
+        second = client.generate_with_retry(prompt="plan", temperature=0.5, scenario="project_ideas")
+
+        self.assertEqual(first, second)
+        self.assertEqual(client.client.models.calls, 1)
+        self.assertEqual(client.response_cache.stats()['scenarios']['project_ideas'], {'hits': 1, 'misses': 1})
+
+        # Persisted: a new client (e.g. after a restart) still hits
+        restarted = make_client(ResponseCache(self.path))
+        self.assertEqual(restarted.generate(prompt="plan", temperature=0.5, scenario="project_ideas"), first)
+        self.assertEqual(restarted.client.models.calls, 0)
+
+    def test_scenarios_opt_in(self):
+        client = make_client(ResponseCache(self.path, scenario_ttls={'project_ideas': 60}))
+        client.generate(prompt="plan", scenario="job_opportunities")
+        client.generate(prompt="plan", scenario="job_opportunities")
+        client.generate(prompt="plan")
+        self.assertEqual(client.client.models.calls, 3)
+        self.assertEqual(client.response_cache.stats()['entries'], 0)
+
+    def test_expiry_and_eviction(self):
+        cache = ResponseCache(self.path, max_entries=2, scenario_ttls={'short': 0.05, 'long': 60})
+        cache.put('expiring', 'short', 'm', 'x')
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('expiring', 'short'))
+
+        for key in ('a', 'b'):
+            cache.put(key, 'long', 'm', key)
+        self.assertEqual(cache.get('a', 'long'), 'a')
+        cache.put('c', 'long', 'm', 'c')
+        self.assertIsNone(cache.get('b', 'long'))
+        self.assertEqual(cache.get('a', 'long'), 'a')
+        self.assertEqual(cache.stats()['entries'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.retriever import CurriculumRetriever
+from src.rag.vector_store import CurriculumVectorStore
+import numpy as np
+import tempfile
+import unittest
+
+
+class KeywordEmbedder:
+    model_name = "keyword-embedder"
+
+    def embed_batch(self, texts):
+        return np.array(
+            [[t.lower().count('python'), t.lower().count('curriculum'), 1.0] for t in texts], dtype=np.float32
+        )
+
+
+def doc(doc_id, level_key):
+    return {'id': doc_id, 'metadata': {'level_key': level_key}}
+
+
+class TestLevelFirstRanking(unittest.TestCase):
+    def setUp(self):
+        self.retriever = CurriculumRetriever.__new__(CurriculumRetriever)
+
+    def test_stable_partition_by_level(self):
+        candidates = [doc('m1', 'masters'), doc('b1', 'btech'), doc('d1', 'diploma'), doc('b2', 'btech')]
+        ranked = self.retriever._rank_level_matches_first(candidates, 'B.Tech')
+        self.assertEqual([c['id'] for c in ranked], ['b1', 'b2', 'm1', 'd1'])
+
+    def test_ambiguous_level_keeps_order(self):
+        candidates = [doc('m1', 'masters'), doc('b1', 'btech')]
+        ranked = self.retriever._rank_level_matches_first(candidates, 'BTech/Masters')
+        self.assertEqual([c['id'] for c in ranked], ['m1', 'b1'])
+
+    def test_level_matches_lead_the_overfetched_set(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = CurriculumVectorStore(tmp, embedder=KeywordEmbedder(), backend="flat")
+            # Masters chunks are closer to the query than the BTech ones
+            store.add_documents(
+                documents=["python curriculum", "python curriculum outline", "python notes", "python labs"],
+                metadatas=[{'level_key': 'masters'}, {'level_key': 'masters'},
+                           {'level_key': 'btech'}, {'level_key': 'btech'}],
+                ids=['m1', 'm2', 'b1', 'b2']
+            )
+
+            retriever = CurriculumRetriever(store, overfetch_factor=4, mmr_lambda=None)
+            results = retriever.retrieve_similar_curricula("Python", "BTech", k=2)
+            self.assertEqual({r['id'] for r in results}, {'b1', 'b2'})
+
+            # Without over-fetching only the closer masters chunks are seen
+            retriever = CurriculumRetriever(store, overfetch_factor=1, mmr_lambda=None)
+            results = retriever.retrieve_similar_curricula("Python", "BTech", k=2)
+            self.assertEqual({r['id'] for r in results}, {'m1', 'm2'})
+
+
+class TestInterleave(unittest.TestCase):
+    def test_rank_by_rank_without_duplicates(self):
+        lists = [
+            [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}],
+            [{'id': 'b'}, {'id': 'd'}],
+            [],
+            [{'id': 'e'}, {'id': 'a'}, {'id': 'f'}, {'id': 'g'}],
+        ]
+        merged = CurriculumRetriever._interleave(lists)
+        self.assertEqual([r['id'] for r in merged], ['a', 'b', 'e', 'd', 'c', 'f', 'g'])
+        self.assertEqual(CurriculumRetriever._interleave([]), [])
+
+    def test_batched_search_interleaves_per_query_results(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = CurriculumVectorStore(tmp, embedder=KeywordEmbedder(), backend="flat")
+            store.add_documents(
+                documents=["python curriculum", "python notes", "curriculum outline", "labs"],
+                metadatas=[{'level_key': 'btech'}] * 4,
+                ids=['p1', 'p2', 'c1', 'l1']
+            )
+            queries = ["python", "curriculum"]
+            embeddings = KeywordEmbedder().embed_batch(queries)
+            batched = store.similarity_search_by_vectors(embeddings, k=3)
+            per_query = [store.similarity_search_by_vector(e, k=3) for e in embeddings]
+
+            self.assertEqual(
+                [r['id'] for r in CurriculumRetriever._interleave(batched)],
+                [r['id'] for r in CurriculumRetriever._interleave(per_query)]
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.retriever import CurriculumRetriever
+import numpy as np
+import unittest
+
+
+class FakeStore:
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def get_embeddings(self, ids):
+        return np.vstack([self.vectors[doc_id] for doc_id in ids])
+
+
+def candidate(doc_id, filename, level_key='btech'):
+    return {'id': doc_id, 'content': doc_id, 'metadata': {'filename': filename, 'level_key': level_key}}
+
+
+class TestMaximalMarginalRelevance(unittest.TestCase):
+    def setUp(self):
+        self.query = np.array([[1.0, 0.0, 0.0]], dtype=np.float32)
+        self.vectors = {
+            'a1': np.array([1.0, 0.0, 0.0], dtype=np.float32),
+            'a2': np.array([0.99, 0.1, 0.0], dtype=np.float32),
+            'b1': np.array([0.8, 0.0, 0.6], dtype=np.float32),
+            'c1': np.array([0.7, 0.7, 0.0], dtype=np.float32),
+        }
+        self.candidates = [
+            candidate('a1', 'a.md'),
+            candidate('a2', 'a.md'),
+            candidate('b1', 'b.md'),
+            candidate('c1', 'c.md', level_key='masters'),
+        ]
+
+    def make_retriever(self, mmr_lambda):
+        retriever = CurriculumRetriever.__new__(CurriculumRetriever)
+        retriever.vector_store = FakeStore(self.vectors)
+        retriever.mmr_lambda = mmr_lambda
+        return retriever
+
+    def test_prefers_distinct_programs(self):
+        results = self.make_retriever(0.7)._max_marginal_relevance(self.candidates, self.query, 'BTech', 2)
+        self.assertEqual([r['id'] for r in results], ['a1', 'b1'])
+
+    def test_repeats_program_only_when_no_other_remains(self):
+        results = self.make_retriever(1.0)._max_marginal_relevance(self.candidates, self.query, 'BTech', 3)
+        self.assertEqual([r['id'] for r in results], ['a1', 'b1', 'a2'])
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(CurriculumRetriever(FakeStore(self.vectors)).mmr_lambda)
+
+    def test_level_matches_exhausted_first(self):
+        results = self.make_retriever(0.0)._max_marginal_relevance(self.candidates, self.query, 'BTech', 4)
+        self.assertEqual(results[-1]['id'], 'c1')
+
+
+if __name__ == '__main__':
+    unittest.main()
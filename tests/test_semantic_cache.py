@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.llm.client import GeminiClient
+from src.llm.response_cache import ResponseCache
+from src.llm.semantic_cache import SemanticResponseCache, prompt_numbers, user_inputs_text
+import numpy as np
+import tempfile
+import unittest
+
+
+class FakeModels:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, model, contents, config):
+        self.calls += 1
+        return type('Response', (), {'text': f"answer {self.calls}"})()
+
+
+class WordCountEmbedder:
+    vocabulary = ['career', 'plan', 'data', 'scientist', 'role', 'chef', 'months', 'years', 'roadmap', 'student']
+
+    def embed_text(self, text):
+        words = text.split()
+        return np.array([words.count(w) for w in self.vocabulary] + [1.0], dtype=np.float32)
+
+
+class TestSemanticResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        response_cache = ResponseCache(os.path.join(self.tmpdir.name, 'responses.sqlite3'))
+        semantic_cache = SemanticResponseCache(
+            response_cache, WordCountEmbedder(), thresholds={'career_path_planner': 0.9}, log=False
+        )
+        self.client = GeminiClient.__new__(GeminiClient)
+        self.client.model_name = "models/test"
+        self.client.client = type('Client', (), {'models': FakeModels()})()
+        self.client.response_cache = response_cache
+        self.client.semantic_cache = semantic_cache
+        self.client.rate_limiter = None
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def ask(self, prompt, **kwargs):
+        kwargs.setdefault('scenario', 'career_path_planner')
+        kwargs.setdefault('semantic_text', prompt)
+        return self.client.generate(prompt=prompt, temperature=0.5, **kwargs)
+
+    def test_similar_prompts_share_a_response(self):
+        first = self.ask("Career plan for a Data Scientist in 2 years")
+        self.assertEqual(self.ask("career plan for a data  scientist role in 2 years"), first)
+        self.assertEqual(self.client.client.models.calls, 1)
+
+        stats = self.client.semantic_cache.stats()['career_path_planner']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertGreaterEqual(stats['mean_hit_similarity'], 0.9)
+
+    def test_dissimilar_or_different_settings_miss(self):
+        self.ask("Career plan for a Data Scientist in 2 years")
+        self.ask("Career plan for a chef in 2 years")
+        self.ask("Career plan for a Data Scientist in 5 years")
+        self.client.generate(prompt="Career plan for a Data Scientist in 2 years", temperature=0.9,
+                             scenario='career_path_planner')
+        self.ask("Career plan for a data scientist role in 2 years", scenario='project_ideas')
+        self.assertEqual(self.client.client.models.calls, 5)
+
+    def test_only_user_inputs_are_compared(self):
+        template = "Career plan roadmap for a student. " * 200 + "Target role: {role}"
+        for role in ("Data Scientist", "chef"):
+            self.ask(template.format(role=role), semantic_text=user_inputs_text({'target_role': role}))
+        self.assertEqual(self.client.client.models.calls, 2)
+
+        # Without the user inputs the semantic cache is not consulted
+        self.ask(template.format(role="data scientist role"), semantic_text=None)
+        self.assertEqual(self.client.client.models.calls, 3)
+        stats = self.client.semantic_cache.stats()['career_path_planner']
+        self.assertEqual(stats['hits'] + stats['misses'], 2)
+
+    def test_numbers_must_match(self):
+        self.assertEqual(prompt_numbers("12 weeks, 3.5 credits"), "12 3.5")
+        self.assertNotEqual(prompt_numbers("6 months"), prompt_numbers("5 years"))
+
+
+if __name__ == '__main__':
+    unittest.main()
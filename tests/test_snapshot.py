@@ -0,0 +1,113 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.snapshot import SnapshotError, read_snapshot, write_snapshot
+from src.rag.vector_store import CurriculumVectorStore
+import numpy as np
+import tempfile
+import unittest
+
+
+class CountingEmbedder:
+    model_name = "test-embedder"
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_batch(self, texts):
+        self.calls += 1
+        return np.array([[len(t), t.count('a'), 1.0] for t in texts], dtype=np.float32)
+
+
+class TestSnapshotFile(unittest.TestCase):
+    def test_round_trip_is_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'kb.snap')
+            embeddings = np.arange(12, dtype=np.float32).reshape(3, 4)
+            write_snapshot(path, ['a', 'b', 'c'], ['x', 'y', 'z'], [{}, {'k': 1}, {}], embeddings, {'p': 1})
+
+            snapshot = read_snapshot(path)
+            self.assertEqual(snapshot.ids, ['a', 'b', 'c'])
+            self.assertEqual(snapshot.metadatas[1], {'k': 1})
+            self.assertEqual(snapshot.parameters, {'p': 1})
+            self.assertIsInstance(snapshot.matrix, np.memmap)
+            np.testing.assert_array_equal(snapshot.matrix, embeddings)
+
+    def test_rejects_other_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'not_a_snapshot')
+            with open(path, 'wb') as f:
+                f.write(b"x" * 64)
+            with self.assertRaises(SnapshotError):
+                read_snapshot(path)
+
+
+class TestStoreSnapshot(unittest.TestCase):
+    def test_export_then_load_at_startup_without_embedding(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = CurriculumVectorStore(os.path.join(tmp, 'source'), embedder=CountingEmbedder(), backend='flat')
+            source.add_documents(['alpha', 'beta', 'gamma'], [{'n': 1}, {'n': 2}, {'n': 3}], ['a', 'b', 'c'])
+            path = os.path.join(tmp, 'kb.snap')
+            source.export_snapshot(path)
+
+            embedder = CountingEmbedder()
+            target = CurriculumVectorStore(
+                os.path.join(tmp, 'target'), embedder=embedder, backend='flat', snapshot_path=path
+            )
+            self.assertEqual(embedder.calls, 0)
+            self.assertEqual(target.get_count(), 3)
+            self.assertEqual(target.get_documents(['b'])[0]['metadata'], {'n': 2})
+            np.testing.assert_allclose(target.get_embeddings(['a', 'c']), source.get_embeddings(['a', 'c']))
+            self.assertEqual(target.lexical_search('gamma', k=1)[0]['id'], 'c')
+
+            # A second startup with the same snapshot does not re-import
+            version = target.get_version()
+            again = CurriculumVectorStore(os.path.join(tmp, 'target'), embedder=embedder, backend='flat', snapshot_path=path)
+            self.assertEqual(again.get_version(), version)
+
+    def test_flat_index_maps_the_snapshot_in_place(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = CurriculumVectorStore(os.path.join(tmp, 'source'), embedder=CountingEmbedder(), backend='flat')
+            source.add_documents(['alpha', 'beta', 'gamma'], [{}, {}, {}], ['a', 'b', 'c'])
+            path = os.path.join(tmp, 'kb.snap')
+            source.export_snapshot(path)
+            expected = source.get_embeddings(['a', 'b', 'c'])
+
+            target = CurriculumVectorStore(os.path.join(tmp, 'target'), embedder=CountingEmbedder(), backend='flat')
+            target.import_snapshot(path)
+            index_files = os.listdir(target.backend.index_directory)
+            self.assertFalse([f for f in index_files if f.endswith('.f32')])
+            linked = os.path.join(target.backend.index_directory, target.backend._embeddings_file)
+            self.assertEqual(os.stat(linked).st_ino, os.stat(path).st_ino)
+
+            # Rewriting the snapshot file does not touch the loaded index
+            source.add_documents(['delta'], [{}], ['d'])
+            source.export_snapshot(path)
+            reopened = CurriculumVectorStore(os.path.join(tmp, 'target'), embedder=CountingEmbedder(), backend='flat')
+            self.assertEqual(reopened.get_count(), 3)
+            np.testing.assert_allclose(reopened.get_embeddings(['a', 'b', 'c']), expected)
+
+            # The first write moves the matrix into the index's own file
+            reopened.add_documents(['epsilon'], [{}], ['e'])
+            self.assertFalse(os.path.exists(linked))
+            self.assertTrue(os.path.exists(path))
+            np.testing.assert_allclose(reopened.get_embeddings(['a', 'b', 'c']), expected)
+
+    def test_synced_store_is_not_rebuilt_at_startup(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = CurriculumVectorStore(os.path.join(tmp, 'source'), embedder=CountingEmbedder(), backend='flat')
+            source.add_documents(['alpha', 'beta'], [{}, {}], ['a', 'b'])
+            path = os.path.join(tmp, 'kb.snap')
+            source.export_snapshot(path)
+
+            target_dir = os.path.join(tmp, 'target')
+            target = CurriculumVectorStore(target_dir, embedder=CountingEmbedder(), backend='flat', snapshot_path=path)
+            target.add_documents(['gamma'], [{}], ['c'])
+
+            restarted = CurriculumVectorStore(target_dir, embedder=CountingEmbedder(), backend='flat', snapshot_path=path)
+            self.assertEqual(sorted(d['id'] for d in restarted.backend.get_all()), ['a', 'b', 'c'])
+
+
+if __name__ == '__main__':
+    unittest.main()
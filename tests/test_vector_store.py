@@ -0,0 +1,94 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.vector_store import CurriculumVectorStore
+import numpy as np
+import tempfile
+import unittest
+
+
+class KeywordEmbedder:
+    model_name = "keyword-embedder"
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_batch(self, texts):
+        self.calls += 1
+        return np.array(
+            [[t.count('python'), t.count('data'), t.count('web'), 1.0] for t in texts], dtype=np.float32
+        )
+
+    def embed_text(self, text):
+        return self.embed_batch([text])[0]
+
+
+class TestBatchedSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.embedder = KeywordEmbedder()
+        self.store = CurriculumVectorStore(self.tmpdir.name, embedder=self.embedder, backend="flat")
+        documents = ["python basics", "python data", "data science", "web apps", "python web", "data web"]
+        levels = ['btech', 'masters', 'btech', 'diploma', 'btech', 'masters']
+        self.store.add_documents(
+            documents=documents,
+            metadatas=[{'level_key': level} for level in levels],
+            ids=[f"doc{i}" for i in range(len(documents))]
+        )
+        self.queries = ["python", "data data", "web python", "python"]
+
+        self.backend_calls = []
+        query = self.store.backend.query
+
+        def counting_query(embeddings, k, where=None):
+            self.backend_calls.append(len(embeddings))
+            return query(embeddings, k, where)
+
+        self.store.backend.query = counting_query
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def assertSameResults(self, batched, single):
+        # Batched matrix products may differ from single ones in the last bits
+        self.assertEqual([r['id'] for r in batched], [r['id'] for r in single])
+        self.assertEqual([r['metadata'] for r in batched], [r['metadata'] for r in single])
+        for b, s in zip(batched, single):
+            self.assertAlmostEqual(b['distance'], s['distance'], places=5)
+
+    def test_batch_equals_per_query_results(self):
+        batched = self.store.similarity_search_batch(self.queries, k=3)
+        self.assertEqual(self.backend_calls, [4])
+        self.assertEqual(self.embedder.calls, 2)
+
+        for query, results in zip(self.queries, batched):
+            self.assertSameResults(results, self.store.similarity_search(query, k=3))
+
+    def test_mixed_filters_match_per_query_results(self):
+        filters = [{'level_key': 'btech'}, None, {'level_key': 'masters'}, {'level_key': 'btech'}]
+        batched = self.store.similarity_search_batch(self.queries, k=2, filters=filters)
+        # One backend call per distinct filter
+        self.assertEqual(sorted(self.backend_calls), [1, 1, 2])
+
+        for query, where, results in zip(self.queries, filters, batched):
+            self.assertSameResults(results, self.store.similarity_search(query, k=2, filter_metadata=where))
+            if where:
+                self.assertTrue(all(r['metadata']['level_key'] == where['level_key'] for r in results))
+
+    def test_by_vectors_matches_by_vector(self):
+        embeddings = self.embedder.embed_batch(self.queries)
+        batched = self.store.similarity_search_by_vectors(embeddings, k=3, filters={'level_key': 'btech'})
+        for embedding, results in zip(embeddings, batched):
+            self.assertSameResults(
+                results, self.store.similarity_search_by_vector(embedding, k=3, filter_metadata={'level_key': 'btech'})
+            )
+
+    def test_filter_count_must_match_queries(self):
+        with self.assertRaises(ValueError):
+            self.store.similarity_search_batch(self.queries, filters=[None])
+        self.assertEqual(self.store.similarity_search_batch([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from src.rag.watcher import KnowledgeBaseWatcher
+import tempfile
+import unittest
+
+
+class TestKnowledgeBaseWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = self.tmpdir.name
+        self.calls = []
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, text):
+        with open(os.path.join(self.path, name), 'w') as f:
+            f.write(text)
+
+    def test_changes_are_debounced_into_one_call(self):
+        self.write('a.md', 'a')
+        watcher = KnowledgeBaseWatcher(self.path, self.calls.append, debounce=5.0)
+
+        self.write('b.md', 'b')
+        self.assertIsNone(watcher.poll(now=100.0))
+        self.write('c.md', 'c')
+        self.write('ignored.txt', 'x')
+        self.assertIsNone(watcher.poll(now=103.0))
+        self.assertIsNone(watcher.poll(now=107.0))
+
+        changed = watcher.poll(now=108.5)
+        names = {os.path.basename(p) for p in changed}
+        self.assertEqual(names, {'b.md', 'c.md'})
+        self.assertEqual(len(self.calls), 1)
+        self.assertIsNone(watcher.poll(now=120.0))
+
+    def test_removal_and_retry_after_failure(self):
+        self.write('a.md', 'a')
+        failures = []
+
+        def flaky(changed):
+            if not failures:
+                failures.append(changed)
+                raise RuntimeError("store busy")
+            self.calls.append(changed)
+
+        watcher = KnowledgeBaseWatcher(self.path, flaky, debounce=0.0)
+        os.remove(os.path.join(self.path, 'a.md'))
+
+        self.assertIsNone(watcher.poll(now=1.0))
+        self.assertEqual(watcher.failures, 1)
+        changed = watcher.poll(now=2.0)
+        self.assertEqual({os.path.basename(p) for p in changed}, {'a.md'})
+        self.assertEqual(watcher.syncs, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()